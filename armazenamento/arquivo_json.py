@@ -0,0 +1,239 @@
+"""Armazenamento em arquivo JSON.
+
+No modo diário (padrão), cada mudança é anexada ao diário de mudanças
+em vez de reescrever o arquivo inteiro. O diário é reaplicado ao
+carregar os dados e, quando passa de `limite_diario` bytes, é
+compactado em um novo arquivo de dados.
+
+O arquivo de dados nunca é truncado no lugar: ele é sempre substituído
+de forma atômica (veja `gravar_atomicamente`).
+"""
+
+import json
+import os
+import shutil
+from classes.lista import ListaDeTarefas
+from classes.tarefa import Tarefa
+from armazenamento.base import Armazenamento, restaurar_ids_das_listas
+from armazenamento.diario import Diario
+from armazenamento.escritor import EscritorEmSegundoPlano, gravar_atomicamente
+from armazenamento.leitor_json import LeitorJSON
+
+LIMITE_DIARIO: int = 1024 * 1024 # Tamanho (em bytes) a partir do qual o diário é compactado
+
+
+class ArmazenamentoJSON(Armazenamento):
+    """Dados em um único arquivo JSON, com diário de mudanças opcional.
+
+    Com `em_segundo_plano` (padrão), as gravações são feitas por um
+    `EscritorEmSegundoPlano`, e o programa não espera pelo disco.
+    """
+
+    binario: bool = False # Se o arquivo de dados é aberto em modo binário
+
+    def __init__(self, caminho: str, modo_diario: bool = True,
+                 limite_diario: int = LIMITE_DIARIO,
+                 em_segundo_plano: bool = True) -> None:
+        self.caminho = caminho
+        self.modo_diario = modo_diario
+        self.limite_diario = limite_diario
+        self.diario = Diario(caminho + ".diario")
+        self.arquivo_de_buscas = caminho + ".buscas"
+        self.tamanho_diario: int = 0 # inclui linhas ainda não gravadas
+        self.listas: list[ListaDeTarefas] = []
+        self.lote: list[bytes] | None = None # linhas do lote em andamento
+        self.escritor: EscritorEmSegundoPlano | None = None
+        if em_segundo_plano:
+            self.escritor = EscritorEmSegundoPlano(caminho, self.diario)
+
+    def salvar_tudo(self, listas: list[ListaDeTarefas]) -> None:
+        """Salva os dados das listas de tarefas em um arquivo JSON.
+
+        Os dados são escritos primeiro em um arquivo temporário; o diário só
+        é apagado depois que o temporário está completo no disco, e só então
+        o temporário substitui o arquivo de dados.
+        """
+        self.listas = listas
+        conteudo: bytes = self.serializar(listas)
+        self.tamanho_diario = 0
+        if self.escritor:
+            self.escritor.substituir(conteudo)
+        else:
+            gravar_atomicamente(self.caminho, conteudo, self.diario.apagar)
+
+    def serializar(self, listas: list[ListaDeTarefas]) -> bytes:
+        """Retorna o conteúdo completo do arquivo de dados."""
+        dados = {}
+        for l in listas:
+            dados[l.titulo] = {"id": l.id, "tarefas": [t.para_dicio() for t in l.tarefas]}
+        return json.dumps(dados, indent=4).encode("utf-8")
+
+    def ler_arquivo(self, f) -> list[ListaDeTarefas]:
+        """Lê todas as listas do arquivo de dados já aberto (sem o diário)."""
+        listas: list[ListaDeTarefas] = []
+        ids_salvos: list[int | None] = []
+        # Recria as listas e tarefas conforme o arquivo é lido,
+        # sem montar antes o dicionário com todos os dados
+        nova_lista: ListaDeTarefas
+        for tipo, valor in LeitorJSON(f).eventos():
+            if tipo == "lista":
+                nova_lista = ListaDeTarefas(valor)
+                listas.append(nova_lista)
+                ids_salvos.append(None)
+            elif tipo == "id":
+                ids_salvos[-1] = valor
+            else:
+                if ids_salvos[-1] is None:
+                    ids_salvos[-1] = valor.get("lista_associada")
+                nova_lista.adicionar_tarefa(Tarefa.de_dicio(valor))
+        restaurar_ids_das_listas(listas, ids_salvos)
+        return listas
+
+    def recuperar_compactacao(self) -> None:
+        """Conclui uma compactação interrompida por uma queda do programa.
+
+        Se o arquivo temporário existe mas o diário não, o temporário já
+        estava completo (o diário só é apagado depois disso) e contém os
+        dados mais recentes. Se o diário ainda existe, o temporário pode
+        estar pela metade e é descartado.
+        """
+        temporario: str = self.caminho + ".tmp"
+        if not os.path.exists(temporario):
+            return
+        if os.path.exists(self.diario.caminho):
+            os.remove(temporario)
+        else:
+            os.replace(temporario, self.caminho)
+
+    def carregar(self) -> list[ListaDeTarefas]:
+        self.recuperar_compactacao()
+        try:
+            with open(self.caminho, "rb" if self.binario else "r") as f:
+                self.listas = self.ler_arquivo(f)
+        except FileNotFoundError:
+            self.listas = []
+        except ValueError:
+            # Não sobrescreve dados que não conseguimos ler: guarda o
+            # arquivo à parte para que o usuário possa recuperá-lo
+            self.listas = []
+            self.corrompido = self.caminho + ".corrompido"
+            os.replace(self.caminho, self.corrompido)
+
+        # Reaplica as mudanças feitas desde o último salvamento completo
+        self.registros_ignorados = 0
+        for registro in self.diario.ler():
+            try:
+                self.aplicar_registro(registro)
+            except (KeyError, IndexError, TypeError, ValueError):
+                # O registro não se encaixa nos dados (por exemplo, cita uma
+                # lista que não existe): é pulado, e os seguintes são aplicados
+                self.registros_ignorados += 1
+        self.tamanho_diario = self.diario.tamanho()
+        if self.registros_ignorados:
+            # Guarda o diário original e o incorpora aos dados, para que os
+            # registros pulados não sejam reaplicados a cada início
+            self.diario_ignorado = self.diario.caminho + ".corrompido"
+            shutil.copyfile(self.diario.caminho, self.diario_ignorado)
+            self.salvar_tudo(self.listas)
+        elif self.tamanho_diario > self.limite_diario:
+            self.salvar_tudo(self.listas)
+        return self.listas
+
+    def aplicar_registro(self, registro: dict) -> None:
+        """Reaplica um registro do diário sobre as listas carregadas."""
+        por_titulo = {l.titulo: l for l in self.listas}
+        match registro["op"]:
+            case "adicionar_tarefa":
+                por_titulo[registro["lista"]].adicionar_tarefa(Tarefa.de_dicio(registro["tarefa"]))
+            case "editar_tarefa":
+                lista = por_titulo[registro["lista"]]
+                tarefa = Tarefa.de_dicio(registro["tarefa"])
+                tarefa.id = self.id_no_registro(lista, registro)
+                lista.substituir_tarefa(tarefa)
+            case "remover_tarefa":
+                lista = por_titulo[registro["lista"]]
+                lista.remover_tarefa(self.id_no_registro(lista, registro))
+            case "adicionar_lista":
+                lista = ListaDeTarefas(registro["titulo"])
+                if "id" in registro:
+                    lista.restaurar_id(registro["id"])
+                self.listas.append(lista)
+            case "editar_lista":
+                por_titulo[registro["titulo"]].titulo = registro["novo"]
+            case "remover_lista":
+                self.listas.remove(por_titulo[registro["titulo"]])
+
+    @staticmethod
+    def id_no_registro(lista: ListaDeTarefas, registro: dict) -> int:
+        """ID da tarefa de um registro do diário. Registros antigos
+        indicam a tarefa pela sua posição na lista."""
+        if "id" in registro:
+            return registro["id"]
+        return list(lista.tarefas)[registro["pos"]].id
+
+    def registrar(self, registro: dict) -> None:
+        """Persiste uma mudança: anexa o registro ao diário ou, fora do
+        modo diário, salva todos os dados. Durante um lote, o registro só
+        é guardado, para ser persistido com os demais em `concluir_lote`.
+        """
+        if self.lote is not None:
+            self.lote.append(Diario.codificar(registro))
+        elif not self.modo_diario:
+            self.salvar_tudo(self.listas)
+        else:
+            self._anexar(Diario.codificar(registro))
+
+    def _anexar(self, linhas: bytes) -> None:
+        self.tamanho_diario += len(linhas)
+        if self.escritor:
+            self.escritor.anexar(linhas)
+        else:
+            self.diario.gravar(linhas)
+        if self.tamanho_diario > self.limite_diario:
+            self.salvar_tudo(self.listas)
+
+    def iniciar_lote(self) -> None:
+        self.lote = []
+
+    def concluir_lote(self) -> None:
+        """Anexa os registros do lote ao diário em uma só gravação."""
+        linhas, self.lote = self.lote, None
+        if not linhas:
+            return
+        if self.modo_diario:
+            self._anexar(b"".join(linhas))
+        else:
+            self.salvar_tudo(self.listas)
+
+    def descartar_lote(self) -> None:
+        self.lote = None
+
+    def tarefa_adicionada(self, lista: ListaDeTarefas, tarefa: Tarefa) -> None:
+        self.registrar({"op": "adicionar_tarefa", "lista": lista.titulo, "tarefa": tarefa.para_dicio()})
+
+    def tarefa_editada(self, lista: ListaDeTarefas, tarefa: Tarefa) -> None:
+        self.registrar({"op": "editar_tarefa", "lista": lista.titulo,
+                        "id": tarefa.id, "tarefa": tarefa.para_dicio()})
+
+    def tarefa_removida(self, lista: ListaDeTarefas, tarefa: Tarefa) -> None:
+        self.registrar({"op": "remover_tarefa", "lista": lista.titulo, "id": tarefa.id})
+
+    def lista_adicionada(self, lista: ListaDeTarefas) -> None:
+        self.registrar({"op": "adicionar_lista", "titulo": lista.titulo, "id": lista.id})
+
+    def lista_renomeada(self, titulo_antigo: str, lista: ListaDeTarefas) -> None:
+        self.registrar({"op": "editar_lista", "titulo": titulo_antigo, "novo": lista.titulo})
+
+    def lista_removida(self, lista: ListaDeTarefas) -> None:
+        self.registrar({"op": "remover_lista", "titulo": lista.titulo})
+
+    def descarregar(self) -> None:
+        if self.escritor:
+            self.escritor.descarregar()
+
+    def fechar(self) -> None:
+        try:
+            if self.escritor:
+                self.escritor.fechar()
+        finally:
+            self.diario.fechar()
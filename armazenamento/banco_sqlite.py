@@ -0,0 +1,249 @@
+"""Armazenamento em banco de dados SQLite.
+
+Cada tarefa é uma linha da tabela `tarefas`, então uma mudança atualiza
+apenas as linhas afetadas. As colunas usadas pelos filtros de busca são
+indexadas, o que permite resolver esses filtros diretamente em SQL.
+As buscas salvas ficam na tabela `buscas`.
+
+Aqui os IDs de listas e tarefas são as chaves primárias do banco, então
+se mantêm entre uma execução e outra.
+
+As ocorrências das tarefas repetíveis não são linhas: a busca por ENTRE
+calcula se uma série tem alguma ocorrência no intervalo com a função
+`ocorre_entre`, registrada na conexão.
+"""
+
+from contextlib import nullcontext
+from datetime import date
+import sqlite3
+from classes.lista import ListaDeTarefas
+from classes.recorrencia import ocorrencias
+from classes.tarefa import Tarefa
+from armazenamento.base import Armazenamento
+
+ESQUEMA: str = """
+CREATE TABLE IF NOT EXISTS listas (
+    id INTEGER PRIMARY KEY,
+    titulo TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS tarefas (
+    id INTEGER PRIMARY KEY,
+    lista INTEGER NOT NULL REFERENCES listas(id) ON DELETE CASCADE,
+    titulo TEXT NOT NULL,
+    nota TEXT NOT NULL,
+    data INTEGER,
+    lista_associada INTEGER NOT NULL,
+    prioridade INTEGER NOT NULL,
+    repeticao INTEGER NOT NULL,
+    concluida INTEGER NOT NULL,
+    inicio INTEGER
+);
+CREATE TABLE IF NOT EXISTS tags (
+    tag TEXT NOT NULL,
+    tarefa INTEGER NOT NULL REFERENCES tarefas(id) ON DELETE CASCADE,
+    PRIMARY KEY (tag, tarefa)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS buscas (
+    nome TEXT PRIMARY KEY,
+    consulta TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tarefas_lista ON tarefas(lista);
+CREATE INDEX IF NOT EXISTS idx_tarefas_lista_associada ON tarefas(lista_associada);
+CREATE INDEX IF NOT EXISTS idx_tarefas_data ON tarefas(data);
+CREATE INDEX IF NOT EXISTS idx_tarefas_prioridade ON tarefas(prioridade);
+CREATE INDEX IF NOT EXISTS idx_tarefas_concluida ON tarefas(concluida);
+CREATE INDEX IF NOT EXISTS idx_tags_tarefa ON tags(tarefa);
+"""
+
+
+def ocorre_entre(inicio: int, repeticao: int, de: int, ate: int) -> bool:
+    """Se a série que começa em `inicio` tem alguma ocorrência de `de` até
+    `ate` (todos ordinais de datas)."""
+    return next(ocorrencias(date.fromordinal(inicio), repeticao,
+                            date.fromordinal(de), date.fromordinal(ate)), None) is not None
+
+
+class ArmazenamentoSQLite(Armazenamento):
+    """Dados em um banco SQLite, com uma linha por tarefa."""
+
+    def __init__(self, caminho: str) -> None:
+        self.caminho = caminho
+        self.conexao = sqlite3.connect(caminho)
+        self.conexao.execute("PRAGMA foreign_keys = ON")
+        self.conexao.execute("PRAGMA journal_mode = WAL")
+        self.conexao.executescript(ESQUEMA)
+        colunas: set[str] = {coluna for _, coluna, *_ in
+                             self.conexao.execute("PRAGMA table_info(tarefas)")}
+        if "inicio" not in colunas:
+            # Banco criado antes das séries de tarefas repetíveis
+            with self.conexao:
+                self.conexao.execute("ALTER TABLE tarefas ADD COLUMN inicio INTEGER")
+        self.conexao.create_function("ocorre_entre", 4, ocorre_entre, deterministic=True)
+        self.tarefas: dict[int, Tarefa] = {} # id -> tarefa carregada
+        self.em_lote: bool = False # se as mudanças esperam por `concluir_lote`
+
+    def carregar(self) -> list[ListaDeTarefas]:
+        listas: dict[int, ListaDeTarefas] = {}
+        for id_lista, titulo in self.conexao.execute("SELECT id, titulo FROM listas ORDER BY id"):
+            lista = ListaDeTarefas(titulo)
+            lista.id = id_lista
+            listas[id_lista] = lista
+
+        tags: dict[int, set[str]] = {}
+        for tag, id_tarefa in self.conexao.execute("SELECT tag, tarefa FROM tags"):
+            tags.setdefault(id_tarefa, set()).add(tag)
+
+        self.tarefas = {}
+        linhas = self.conexao.execute(
+            "SELECT id, lista, titulo, nota, data, lista_associada, prioridade,"
+            " repeticao, concluida, inicio FROM tarefas ORDER BY id")
+        for (id_tarefa, id_lista, titulo, nota, data, lista_associada,
+                prioridade, repeticao, concluida, inicio) in linhas:
+            tarefa = Tarefa(
+                titulo=titulo,
+                lista_associada=lista_associada,
+                nota=nota,
+                data=date.fromordinal(data) if data is not None else None,
+                tags=tags.get(id_tarefa, set()),
+                prioridade=prioridade,
+                repeticao=repeticao,
+                concluida=bool(concluida),
+                id=id_tarefa,
+                inicio=date.fromordinal(inicio) if inicio is not None else None,
+            )
+            listas[id_lista].adicionar_tarefa(tarefa)
+            self.tarefas[id_tarefa] = tarefa
+
+        # Novas listas não podem reaproveitar IDs já salvos no banco
+        ListaDeTarefas.id_count = max(ListaDeTarefas.id_count, max(listas, default=-1) + 1)
+        return list(listas.values())
+
+    def salvar_tudo(self, listas: list[ListaDeTarefas]) -> None:
+        with self.conexao:
+            self.conexao.execute("DELETE FROM listas")
+            self.tarefas = {}
+            for lista in listas:
+                self._inserir_lista(lista)
+                for tarefa in lista.tarefas:
+                    self._inserir_tarefa(lista, tarefa)
+
+    def _inserir_lista(self, lista: ListaDeTarefas) -> None:
+        self.conexao.execute("INSERT INTO listas (id, titulo) VALUES (?, ?)",
+                             (lista.id, lista.titulo))
+
+    def _inserir_tarefa(self, lista: ListaDeTarefas, tarefa: Tarefa) -> None:
+        self.conexao.execute(
+            "INSERT INTO tarefas (id, lista, titulo, nota, data, lista_associada,"
+            " prioridade, repeticao, concluida, inicio) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (tarefa.id, lista.id, tarefa.titulo, tarefa.nota,
+             tarefa.data.toordinal() if tarefa.data else None,
+             tarefa.lista_associada, tarefa.prioridade, tarefa.repeticao,
+             int(tarefa.concluida), tarefa.inicio.toordinal() if tarefa.inicio else None))
+        self.conexao.executemany("INSERT INTO tags (tag, tarefa) VALUES (?, ?)",
+                                 ((tag, tarefa.id) for tag in tarefa.tags))
+        self.tarefas[tarefa.id] = tarefa
+
+    def _transacao(self):
+        """Transação de uma mudança; dentro de um lote, a do lote inteiro."""
+        return nullcontext() if self.em_lote else self.conexao
+
+    def iniciar_lote(self) -> None:
+        self.em_lote = True
+
+    def concluir_lote(self) -> None:
+        self.em_lote = False
+        self.conexao.commit()
+
+    def descartar_lote(self) -> None:
+        self.em_lote = False
+        self.conexao.rollback()
+
+    def tarefa_adicionada(self, lista: ListaDeTarefas, tarefa: Tarefa) -> None:
+        with self._transacao():
+            self._inserir_tarefa(lista, tarefa)
+
+    def tarefa_editada(self, lista: ListaDeTarefas, tarefa: Tarefa) -> None:
+        with self._transacao():
+            self.conexao.execute(
+                "UPDATE tarefas SET titulo = ?, nota = ?, data = ?, lista_associada = ?,"
+                " prioridade = ?, repeticao = ?, concluida = ?, inicio = ? WHERE id = ?",
+                (tarefa.titulo, tarefa.nota,
+                 tarefa.data.toordinal() if tarefa.data else None,
+                 tarefa.lista_associada, tarefa.prioridade, tarefa.repeticao,
+                 int(tarefa.concluida), tarefa.inicio.toordinal() if tarefa.inicio else None,
+                 tarefa.id))
+            self.conexao.execute("DELETE FROM tags WHERE tarefa = ?", (tarefa.id,))
+            self.conexao.executemany("INSERT INTO tags (tag, tarefa) VALUES (?, ?)",
+                                     ((tag, tarefa.id) for tag in tarefa.tags))
+
+    def tarefa_removida(self, lista: ListaDeTarefas, tarefa: Tarefa) -> None:
+        with self._transacao():
+            self.conexao.execute("DELETE FROM tarefas WHERE id = ?", (tarefa.id,))
+        self.tarefas.pop(tarefa.id, None)
+
+    def lista_adicionada(self, lista: ListaDeTarefas) -> None:
+        with self._transacao():
+            self._inserir_lista(lista)
+
+    def lista_renomeada(self, titulo_antigo: str, lista: ListaDeTarefas) -> None:
+        with self._transacao():
+            self.conexao.execute("UPDATE listas SET titulo = ? WHERE id = ?",
+                                 (lista.titulo, lista.id))
+
+    def lista_removida(self, lista: ListaDeTarefas) -> None:
+        with self._transacao():
+            self.conexao.execute("DELETE FROM listas WHERE id = ?", (lista.id,))
+        for tarefa in lista.tarefas:
+            self.tarefas.pop(tarefa.id, None)
+
+    def carregar_buscas(self) -> dict[str, str]:
+        return dict(self.conexao.execute("SELECT nome, consulta FROM buscas ORDER BY nome"))
+
+    def salvar_buscas(self, buscas: dict[str, str]) -> None:
+        with self.conexao:
+            self.conexao.execute("DELETE FROM buscas")
+            self.conexao.executemany("INSERT INTO buscas (nome, consulta) VALUES (?, ?)",
+                                     buscas.items())
+
+    def buscar(self, condicoes: list[tuple]) -> list[Tarefa] | None:
+        """Traduz as condições de busca para SQL.
+
+        Condições suportadas: ("LISTA_ID", id), ("TAGS", [tags]),
+        ("ATE", data), ("ENTRE", (início, fim)) e ("CONCLUIDA", bool).
+        """
+        clausulas: list[str] = []
+        parametros: list = []
+        for tipo, valor in condicoes:
+            match tipo:
+                case "LISTA_ID":
+                    clausulas.append("lista_associada = ?")
+                    parametros.append(valor)
+                case "TAGS":
+                    for tag in valor:
+                        clausulas.append("id IN (SELECT tarefa FROM tags WHERE tag = ?)")
+                        parametros.append(tag)
+                case "ATE":
+                    clausulas.append("data IS NOT NULL AND data <= ?")
+                    parametros.append(valor.toordinal())
+                case "ENTRE":
+                    # Uma série atrasada entra se uma das próximas ocorrências cai no intervalo
+                    clausulas.append(
+                        "data IS NOT NULL AND (data BETWEEN ? AND ? OR (repeticao != 0"
+                        " AND concluida = 0 AND data < ? AND ocorre_entre(COALESCE(inicio, data),"
+                        " repeticao, ?, ?)))")
+                    inicio, fim = (d.toordinal() for d in valor)
+                    parametros.extend((inicio, fim, inicio, inicio, fim))
+                case "CONCLUIDA":
+                    clausulas.append("concluida = ?")
+                    parametros.append(int(valor))
+                case _:
+                    return None
+
+        consulta: str = "SELECT id FROM tarefas"
+        if clausulas:
+            consulta += " WHERE " + " AND ".join(clausulas)
+        return [self.tarefas[id_tarefa]
+                for (id_tarefa,) in self.conexao.execute(consulta, parametros)]
+
+    def fechar(self) -> None:
+        self.conexao.close()
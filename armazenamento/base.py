@@ -0,0 +1,138 @@
+"""Interface comum dos mecanismos de armazenamento.
+
+Cada mecanismo sabe carregar todas as listas, salvar tudo de uma vez e
+persistir mudanças individuais (uma tarefa ou lista por vez).
+
+As buscas salvas (nome -> texto da busca) ficam junto dos dados: por
+padrão, em um arquivo JSON ao lado do arquivo de dados.
+"""
+
+from abc import ABC, abstractmethod
+import json
+from armazenamento.escritor import gravar_atomicamente
+from classes.lista import ListaDeTarefas
+from classes.tarefa import Tarefa
+
+
+def restaurar_ids_das_listas(listas: list[ListaDeTarefas], ids_salvos: list[int | None]) -> None:
+    """Dá a cada lista o ID com que ela foi salva.
+
+    Os arquivos salvos antes de o ID da lista fazer parte do formato só o
+    têm no campo `lista_associada` das suas tarefas, e nesse caso ele é
+    deduzido da primeira tarefa. Uma lista sem ID (vazia em um arquivo
+    antigo), ou cujo ID já foi usado por outra, recebe um ID novo.
+    """
+    sem_id: list[ListaDeTarefas] = []
+    usados: set[int] = set()
+    for lista, id_salvo in zip(listas, ids_salvos):
+        if id_salvo is None or id_salvo in usados:
+            sem_id.append(lista)
+        else:
+            lista.restaurar_id(id_salvo)
+            usados.add(id_salvo)
+    for lista in sem_id:
+        lista.id = ListaDeTarefas.id_count
+        ListaDeTarefas.id_count += 1
+    for lista in listas:
+        if lista.carregada:
+            for tarefa in lista.tarefas:
+                tarefa.lista_associada = lista.id
+
+
+class Armazenamento(ABC):
+    """Classe base dos mecanismos de armazenamento.
+
+    Os métodos abstratos (carregar, salvar tudo e os avisos de cada
+    mudança) são obrigatórios; os demais têm um padrão que não faz nada.
+    """
+
+    # Caminho para onde um arquivo de dados ilegível foi movido ao carregar
+    corrompido: str | None = None
+    # Registros do diário de mudanças que não puderam ser reaplicados ao
+    # carregar, e a cópia do diário guardada com eles
+    registros_ignorados: int = 0
+    diario_ignorado: str | None = None
+    # Arquivo JSON com as buscas salvas (None se o mecanismo não as guarda)
+    arquivo_de_buscas: str | None = None
+
+    @abstractmethod
+    def carregar(self) -> list[ListaDeTarefas]:
+        """Carrega e retorna todas as listas salvas (vazio se não houver)."""
+
+    @abstractmethod
+    def salvar_tudo(self, listas: list[ListaDeTarefas]) -> None:
+        """Substitui todos os dados salvos pelas listas fornecidas."""
+
+    @abstractmethod
+    def tarefa_adicionada(self, lista: ListaDeTarefas, tarefa: Tarefa) -> None:
+        pass
+
+    @abstractmethod
+    def tarefa_editada(self, lista: ListaDeTarefas, tarefa: Tarefa) -> None:
+        pass
+
+    @abstractmethod
+    def tarefa_removida(self, lista: ListaDeTarefas, tarefa: Tarefa) -> None:
+        """Chamada antes da tarefa ser retirada de `lista`."""
+
+    @abstractmethod
+    def lista_adicionada(self, lista: ListaDeTarefas) -> None:
+        pass
+
+    @abstractmethod
+    def lista_renomeada(self, titulo_antigo: str, lista: ListaDeTarefas) -> None:
+        pass
+
+    @abstractmethod
+    def lista_removida(self, lista: ListaDeTarefas) -> None:
+        pass
+
+    def iniciar_lote(self) -> None:
+        """Começa um lote: as mudanças seguintes só são persistidas (todas
+        juntas) em `concluir_lote`, ou são descartadas em `descartar_lote`."""
+        pass
+
+    def concluir_lote(self) -> None:
+        pass
+
+    def descartar_lote(self) -> None:
+        pass
+
+    def buscar(self, condicoes: list[tuple]) -> list[Tarefa] | None:
+        """Resolve as condições de busca diretamente no armazenamento.
+
+        Retorna None quando o mecanismo não sabe fazer isso; nesse caso
+        a busca percorre as tarefas na memória.
+        """
+        return None
+
+    def lista_da_tarefa(self, id_tarefa: int) -> int | None:
+        """ID da lista que contém a tarefa, sem ler as tarefas das listas.
+
+        Retorna None quando o mecanismo não sabe; nesse caso quem procura
+        a tarefa percorre todas as listas.
+        """
+        return None
+
+    def carregar_buscas(self) -> dict[str, str]:
+        """Retorna as buscas salvas, pelo nome (vazio se não houver)."""
+        if self.arquivo_de_buscas is None:
+            return {}
+        try:
+            with open(self.arquivo_de_buscas, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def salvar_buscas(self, buscas: dict[str, str]) -> None:
+        """Substitui todas as buscas salvas pelas fornecidas."""
+        if self.arquivo_de_buscas is not None:
+            gravar_atomicamente(self.arquivo_de_buscas,
+                                json.dumps(buscas, indent=4, ensure_ascii=False).encode("utf-8"))
+
+    def descarregar(self) -> None:
+        """Espera até que todas as mudanças já persistidas estejam no disco."""
+        pass
+
+    def fechar(self) -> None:
+        pass
@@ -0,0 +1,218 @@
+"""Armazenamento em um arquivo binário compacto.
+
+Alternativa ao JSON para quem tem muitos dados e quer iniciar rápido:
+o arquivo inteiro é lido de uma só vez, as tarefas são registros de
+tamanho fixo e as datas ficam salvas como ordinais (`date.toordinal`),
+sem precisar interpretar texto. O JSON continua sendo o formato legível
+para importar e exportar (veja o comando "converter dados").
+
+Layout do arquivo (inteiros little-endian):
+    cabeçalho       MAGICO, versão, nº de textos, nº de listas,
+                    nº de tarefas, nº de referências a tags
+    deslocamentos   (nº de textos + 1) x uint32, início de cada texto
+    textos          títulos, notas e tags em UTF-8, cada um salvo uma vez
+    listas          REGISTRO_LISTA por lista
+    tarefas         REGISTRO_TAREFA por tarefa, na ordem das listas
+    tags            uint32 por tag de cada tarefa (índice do texto)
+
+As mudanças feitas entre um salvamento e outro usam o mesmo diário de
+mudanças do armazenamento JSON.
+
+Com `colunar=True`, as tarefas lidas do arquivo ficam em um `TarefaStore`
+(uma coluna por campo) em vez de um objeto `Tarefa` por tarefa.
+"""
+
+from array import array
+from datetime import date
+import io
+import struct
+import sys
+from classes.lista import ListaDeTarefas
+from classes.tarefa import Tarefa
+from classes.tarefa_store import TarefaStore
+from armazenamento.arquivo_json import ArmazenamentoJSON
+from armazenamento.base import restaurar_ids_das_listas
+
+MAGICO: bytes = b"TRFB"
+VERSAO: int = 3
+CABECALHO = struct.Struct("<4sHIIII")
+# titulo, nº de tarefas, id
+REGISTRO_LISTA = struct.Struct("<III")
+# titulo, nota, data (0 = sem data), lista associada, id,
+# início das tags, nº de tags, prioridade, repetição, concluída,
+# início da série (0 = sem início)
+REGISTRO_TAREFA = struct.Struct("<IIiiIIHBBBi")
+# Registro de tarefa de cada versão que ainda pode ser lida (a versão 1
+# não tinha o início da série)
+REGISTROS_TAREFA: dict[int, struct.Struct] = {
+    1: struct.Struct("<IIiiIIHBBB"),
+    2: REGISTRO_TAREFA,
+    VERSAO: REGISTRO_TAREFA,
+}
+# Registro de lista de cada versão (antes da 3 o ID da lista não era
+# salvo, e era deduzido da lista associada das tarefas)
+REGISTROS_LISTA: dict[int, struct.Struct] = {
+    1: struct.Struct("<II"),
+    2: struct.Struct("<II"),
+    VERSAO: REGISTRO_LISTA,
+}
+
+
+def _uint32(valores=()) -> array:
+    """Array de inteiros sem sinal de 32 bits, sempre little-endian."""
+    a = array("I", valores)
+    if a.itemsize != 4:
+        a = array("L", valores)
+    return a
+
+
+def escrever(f, listas: list[ListaDeTarefas]) -> None:
+    """Escreve as listas no formato binário em um arquivo aberto em modo "wb"."""
+    textos: dict[str, int] = {}
+
+    def indice(texto: str) -> int:
+        # Cada texto distinto é salvo só uma vez
+        i = textos.get(texto)
+        if i is None:
+            i = textos[texto] = len(textos)
+        return i
+
+    registros_listas = bytearray()
+    registros_tarefas = bytearray()
+    referencias_tags = _uint32()
+    quantidade_tarefas: int = 0
+    for lista in listas:
+        registros_listas += REGISTRO_LISTA.pack(indice(lista.titulo), len(lista.tarefas), lista.id)
+        for t in lista.tarefas:
+            registros_tarefas += REGISTRO_TAREFA.pack(
+                indice(t.titulo), indice(t.nota),
+                t.data.toordinal() if t.data else 0,
+                t.lista_associada, t.id,
+                len(referencias_tags), len(t.tags),
+                t.prioridade, t.repeticao, t.concluida,
+                t.inicio.toordinal() if t.inicio else 0)
+            referencias_tags.extend(indice(tag) for tag in t.tags)
+            quantidade_tarefas += 1
+
+    deslocamentos = _uint32([0])
+    conteudo = bytearray()
+    for texto in textos:
+        conteudo += texto.encode("utf-8")
+        deslocamentos.append(len(conteudo))
+
+    if sys.byteorder != "little":
+        deslocamentos.byteswap()
+        referencias_tags.byteswap()
+
+    f.write(CABECALHO.pack(MAGICO, VERSAO, len(textos), len(listas),
+                           quantidade_tarefas, len(referencias_tags)))
+    f.write(deslocamentos.tobytes())
+    f.write(conteudo)
+    f.write(registros_listas)
+    f.write(registros_tarefas)
+    f.write(referencias_tags.tobytes())
+
+
+def ler(f, store: TarefaStore | None = None) -> list[ListaDeTarefas]:
+    """Lê as listas de um arquivo binário aberto em modo "rb".
+
+    Se `store` for dado, as tarefas são guardadas nele.
+
+    Lança ValueError se o arquivo não estiver no formato esperado.
+    """
+    dados = memoryview(f.read())
+    if not dados:
+        return []
+    try:
+        magico, versao, n_textos, n_listas, n_tarefas, n_tags = CABECALHO.unpack_from(dados)
+    except struct.error:
+        raise ValueError("Arquivo binário truncado")
+    if magico != MAGICO or versao not in REGISTROS_TAREFA:
+        raise ValueError("Arquivo binário com formato desconhecido")
+    registro_tarefa: struct.Struct = REGISTROS_TAREFA[versao]
+    registro_lista: struct.Struct = REGISTROS_LISTA[versao]
+
+    pos: int = CABECALHO.size
+    if len(dados) < pos + 4 * (n_textos + 1):
+        raise ValueError("Arquivo binário truncado")
+    fim_tags: int = (pos + 4 * (n_textos + 1) + registro_lista.size * n_listas
+                     + registro_tarefa.size * n_tarefas + 4 * n_tags)
+    deslocamentos = _uint32()
+    deslocamentos.frombytes(dados[pos:pos + 4 * (n_textos + 1)])
+    if sys.byteorder != "little":
+        deslocamentos.byteswap()
+    pos += 4 * (n_textos + 1)
+    if fim_tags + deslocamentos[-1] != len(dados):
+        raise ValueError("Arquivo binário truncado")
+
+    conteudo = bytes(dados[pos:pos + deslocamentos[-1]])
+    textos: list[str] = [conteudo[deslocamentos[i]:deslocamentos[i + 1]].decode("utf-8")
+                         for i in range(n_textos)] # UnicodeDecodeError é um ValueError
+    pos += deslocamentos[-1]
+
+    registros_listas = registro_lista.iter_unpack(dados[pos:pos + registro_lista.size * n_listas])
+    if registro_lista is not REGISTRO_LISTA:
+        registros_listas = (registro + (None,) for registro in registros_listas)
+    pos += registro_lista.size * n_listas
+    registros_tarefas = registro_tarefa.iter_unpack(dados[pos:pos + registro_tarefa.size * n_tarefas])
+    if registro_tarefa is not REGISTRO_TAREFA:
+        registros_tarefas = (registro + (0,) for registro in registros_tarefas)
+    pos += registro_tarefa.size * n_tarefas
+    referencias_tags = _uint32()
+    referencias_tags.frombytes(dados[pos:pos + 4 * n_tags])
+    if sys.byteorder != "little":
+        referencias_tags.byteswap()
+
+    criar_tarefa = store.adicionar if store is not None else Tarefa
+    datas: dict[int, date] = {} # para que tarefas com a mesma data a compartilhem
+    listas: list[ListaDeTarefas] = []
+    ids_salvos: list[int | None] = []
+    try:
+        for titulo, quantidade, id_lista in registros_listas:
+            lista = ListaDeTarefas(textos[titulo])
+            ids_salvos.append(id_lista)
+            for _ in range(quantidade):
+                (titulo_t, nota, data, lista_associada, id_tarefa,
+                    inicio_tags, n_tags_t, prioridade, repeticao, concluida,
+                    inicio) = next(registros_tarefas)
+                if data and data not in datas:
+                    datas[data] = date.fromordinal(data)
+                if inicio and inicio not in datas:
+                    datas[inicio] = date.fromordinal(inicio)
+                if ids_salvos[-1] is None:
+                    ids_salvos[-1] = lista_associada
+                lista.adicionar_tarefa(criar_tarefa(
+                    titulo=textos[titulo_t],
+                    lista_associada=lista_associada,
+                    nota=textos[nota],
+                    data=datas[data] if data else None,
+                    tags=[textos[i] for i in referencias_tags[inicio_tags:inicio_tags + n_tags_t]],
+                    prioridade=prioridade,
+                    repeticao=repeticao,
+                    concluida=bool(concluida),
+                    id=id_tarefa,
+                    inicio=datas[inicio] if inicio else None,
+                ))
+            listas.append(lista)
+    except (IndexError, StopIteration):
+        raise ValueError("Arquivo binário corrompido")
+    restaurar_ids_das_listas(listas, ids_salvos)
+    return listas
+
+
+class ArmazenamentoBinario(ArmazenamentoJSON):
+    """Dados no formato binário compacto, com o mesmo diário de mudanças do JSON."""
+
+    binario: bool = True
+
+    def __init__(self, caminho: str, colunar: bool = False, **opcoes) -> None:
+        super().__init__(caminho, **opcoes)
+        self.colunar = colunar
+
+    def serializar(self, listas: list[ListaDeTarefas]) -> bytes:
+        f = io.BytesIO()
+        escrever(f, listas)
+        return f.getvalue()
+
+    def ler_arquivo(self, f) -> list[ListaDeTarefas]:
+        return ler(f, TarefaStore() if self.colunar else None)
@@ -0,0 +1,87 @@
+"""Módulo do diário de mudanças.
+
+Guarda cada alteração dos dados como um registro JSON compacto, uma
+linha por registro, anexada ao final do arquivo. Assim uma mudança não
+precisa reescrever o arquivo de dados inteiro.
+"""
+
+import json
+import os
+from typing import Iterator
+
+
+class Diario:
+    """Arquivo de registros anexados (um JSON por linha)."""
+
+    def __init__(self, caminho: str) -> None:
+        self.caminho = caminho
+        self._arquivo = None
+
+    @staticmethod
+    def codificar(registro: dict) -> bytes:
+        """Converte um registro na linha que será gravada no diário."""
+        linha: str = json.dumps(registro, ensure_ascii=False, separators=(",", ":"))
+        return linha.encode("utf-8") + b"\n"
+
+    def anexar(self, registro: dict) -> None:
+        """Anexa um registro ao final do diário e o força para o disco."""
+        self.gravar(self.codificar(registro))
+
+    def gravar(self, linhas: bytes) -> None:
+        """Anexa uma ou mais linhas já codificadas, com um único fsync."""
+        if self._arquivo is None:
+            self._arquivo = open(self.caminho, "ab")
+        self._arquivo.write(linhas)
+        self._arquivo.flush()
+        os.fsync(self._arquivo.fileno())
+
+    def ler(self) -> Iterator[dict]:
+        """Percorre os registros do diário, na ordem em que foram escritos.
+
+        Um registro só é considerado completo se terminar com quebra de
+        linha e for um JSON válido. Ao encontrar um registro incompleto
+        (por exemplo, cortado por uma queda do programa), o diário é
+        truncado nesse ponto e a leitura termina.
+        """
+        try:
+            f = open(self.caminho, "rb")
+        except FileNotFoundError:
+            return
+
+        posicao_valida: int = 0
+        with f:
+            for linha in f:
+                if not linha.endswith(b"\n"):
+                    break
+                try:
+                    registro = json.loads(linha)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    break
+                posicao_valida += len(linha)
+                yield registro
+            else:
+                return
+
+        # Descarta o registro rasgado e tudo o que vier depois dele
+        with open(self.caminho, "r+b") as f:
+            f.truncate(posicao_valida)
+
+    def tamanho(self) -> int:
+        """Tamanho atual do diário, em bytes."""
+        try:
+            return os.path.getsize(self.caminho)
+        except FileNotFoundError:
+            return 0
+
+    def fechar(self) -> None:
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+    def apagar(self) -> None:
+        """Remove o diário do disco (após ser incorporado aos dados)."""
+        self.fechar()
+        try:
+            os.remove(self.caminho)
+        except FileNotFoundError:
+            pass
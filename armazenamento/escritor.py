@@ -0,0 +1,180 @@
+"""Gravação dos dados em segundo plano.
+
+As mudanças são entregues a uma thread que grava no disco, então o
+programa nunca espera pelo disco para mostrar o próximo prompt. Mudanças
+feitas em sequência rápida são agrupadas em uma única gravação, e o
+arquivo de dados é sempre substituído de forma atômica.
+"""
+
+import os
+import threading
+import time
+from typing import Callable
+from armazenamento.diario import Diario
+
+ATRASO: float = 0.1 # Tempo (em segundos) esperando mais mudanças antes de gravar
+
+
+def gravar_atomicamente(caminho: str, conteudo: bytes,
+                        antes_de_substituir: Callable | None = None) -> None:
+    """Substitui o arquivo `caminho` por `conteudo` sem nunca deixá-lo pela metade.
+
+    O conteúdo é escrito em um arquivo temporário, forçado para o disco
+    (fsync) e só então renomeado por cima do original. `antes_de_substituir`
+    é chamada depois que o temporário está completo e antes da troca.
+
+    A compactação do diário passa `antes_de_substituir=diario.apagar`, e
+    essa ordem só é segura por causa de
+    `ArmazenamentoJSON.recuperar_compactacao`. Uma queda entre apagar o
+    diário e a troca deixa o arquivo de dados antigo sem o diário. Os dados
+    mais recentes ficam só no temporário, que é promovido no próximo
+    carregamento justamente porque o diário não existe mais. Apagar o
+    diário antes de o temporário estar completo, ou depois da troca,
+    quebraria essa regra.
+    """
+    temporario: str = caminho + ".tmp"
+    with open(temporario, "wb") as f:
+        f.write(conteudo)
+        f.flush()
+        os.fsync(f.fileno())
+    if antes_de_substituir:
+        antes_de_substituir()
+    os.replace(temporario, caminho)
+
+    # Garante que a troca de nomes também chegou ao disco
+    try:
+        pasta = os.open(os.path.dirname(os.path.abspath(caminho)), os.O_RDONLY)
+    except OSError:
+        return # por exemplo, no Windows
+    try:
+        os.fsync(pasta)
+    except OSError:
+        pass
+    finally:
+        os.close(pasta)
+
+
+class EscritorEmSegundoPlano:
+    """Thread que grava o arquivo de dados e o diário de mudanças.
+
+    `substituir` agenda a troca do arquivo de dados inteiro e `anexar`
+    agenda uma linha do diário. A ordem entre elas é respeitada: uma
+    substituição torna desnecessárias as linhas agendadas antes dela.
+    `agendar` grava (ou apaga) qualquer outro arquivo.
+
+    Se o mesmo arquivo for agendado várias vezes antes de ser gravado,
+    só a última versão é escrita.
+    """
+
+    def __init__(self, caminho: str | None = None, diario: Diario | None = None,
+                 atraso: float = ATRASO) -> None:
+        self.caminho = caminho
+        self.diario = diario
+        self.atraso = atraso
+        self.condicao = threading.Condition()
+        self.arquivos: dict[str, bytes | None] = {} # caminho -> conteúdo (None apaga)
+        self.linhas: list[bytes] = [] # linhas do diário a gravar depois deles
+        self.gravando: bool = False
+        self.urgente: bool = False # descarregar() pediu para não esperar
+        self.ativo: bool = True
+        self.erro: OSError | None = None
+        self.thread = threading.Thread(target=self._executar, name="escritor", daemon=True)
+        self.thread.start()
+
+    def substituir(self, conteudo: bytes) -> None:
+        with self.condicao:
+            self.arquivos[self.caminho] = conteudo
+            self.linhas = []
+            self.condicao.notify_all()
+
+    def agendar(self, caminho: str, conteudo: bytes | None) -> None:
+        with self.condicao:
+            self.arquivos[caminho] = conteudo
+            self.condicao.notify_all()
+
+    def anexar(self, linha: bytes) -> None:
+        with self.condicao:
+            self.linhas.append(linha)
+            self.condicao.notify_all()
+
+    def _pendente(self) -> bool:
+        return bool(self.arquivos) or bool(self.linhas)
+
+    def _executar(self) -> None:
+        while True:
+            with self.condicao:
+                while self.ativo and not self._pendente():
+                    self.condicao.wait()
+                if not self._pendente():
+                    return
+                # Espera um pouco para juntar uma rajada de mudanças
+                limite: float = time.monotonic() + self.atraso
+                while self.ativo and not self.urgente:
+                    restante: float = limite - time.monotonic()
+                    if restante <= 0:
+                        break
+                    self.condicao.wait(restante)
+                arquivos, linhas = self.arquivos, self.linhas
+                self.arquivos, self.linhas = {}, []
+                self.urgente = False
+                self.gravando = True
+
+            try:
+                self._gravar(arquivos, linhas)
+            except OSError as erro:
+                with self.condicao:
+                    # Devolve o que não foi gravado, para tentar de novo,
+                    # sem passar por cima do que foi agendado depois
+                    if self.caminho not in self.arquivos:
+                        self.linhas = linhas + self.linhas
+                    self.arquivos = arquivos | self.arquivos
+                    self.erro = erro
+                    self.gravando = False
+                    self.condicao.notify_all()
+                    if not self.ativo:
+                        return
+                time.sleep(self.atraso)
+                continue
+
+            with self.condicao:
+                self.erro = None
+                self.gravando = False
+                self.condicao.notify_all()
+
+    def _gravar(self, arquivos: dict[str, bytes | None], linhas: list[bytes]) -> None:
+        for caminho, conteudo in arquivos.items():
+            if conteudo is None:
+                try:
+                    os.remove(caminho)
+                except FileNotFoundError:
+                    pass
+            elif caminho == self.caminho:
+                # O diário só é apagado depois que o novo arquivo está completo
+                gravar_atomicamente(caminho, conteudo, self.diario.apagar)
+            else:
+                gravar_atomicamente(caminho, conteudo)
+        if linhas:
+            self.diario.gravar(b"".join(linhas))
+
+    def descarregar(self) -> None:
+        """Espera até que tudo o que foi agendado esteja no disco.
+
+        Lança o erro da última tentativa se a gravação estiver falhando.
+        """
+        with self.condicao:
+            self.urgente = True
+            self.condicao.notify_all()
+            while self._pendente() or self.gravando:
+                if self.erro and not self.gravando:
+                    raise self.erro
+                self.condicao.wait(self.atraso)
+
+    def fechar(self) -> None:
+        """Grava o que estiver pendente e encerra a thread."""
+        try:
+            self.descarregar()
+        finally:
+            with self.condicao:
+                self.ativo = False
+                self.condicao.notify_all()
+            self.thread.join()
@@ -0,0 +1,277 @@
+"""Armazenamento fragmentado: um arquivo por lista.
+
+Os dados ficam em uma pasta com um manifesto pequeno, que guarda o
+título de cada lista e o nome do arquivo com as suas tarefas:
+
+    pasta/manifesto.json      {"proximo": 3, "proximo_id": 42,
+                               "listas": [{"id": ..., "titulo": ..., "arquivo": ...,
+                                           "ids": [[1, 7], [12, 12]]}]}
+    pasta/lista-0.json        [{...tarefa...}, ...]
+    pasta/buscas.json         {"nome da busca": "texto da busca", ...}
+
+Como nem todas as tarefas são lidas, o manifesto também guarda o próximo
+ID de tarefa livre, para que uma tarefa nova nunca repita um ID salvo,
+e os IDs das tarefas de cada lista (em faixas de IDs seguidos), para que
+achar uma tarefa pelo ID só precise ler o arquivo da lista dela.
+
+Uma mudança em uma tarefa reescreve apenas o arquivo da sua lista, e
+renomear uma lista só reescreve o manifesto. As tarefas de cada lista
+só são lidas do disco quando alguém precisa delas.
+"""
+
+import json
+import os
+from bisect import bisect_right
+from typing import Iterable
+from classes.lista import ListaDeTarefas
+from classes.tarefa import Tarefa
+from armazenamento.base import Armazenamento
+from armazenamento.escritor import EscritorEmSegundoPlano, gravar_atomicamente
+
+MANIFESTO: str = "manifesto.json"
+BUSCAS: str = "buscas.json"
+
+
+def faixas_de_ids(ids: Iterable[int]) -> list[list[int]]:
+    """Resume os IDs em faixas [primeiro, último] de IDs seguidos, em ordem."""
+    faixas: list[list[int]] = []
+    for id_tarefa in sorted(ids):
+        if faixas and faixas[-1][1] + 1 == id_tarefa:
+            faixas[-1][1] = id_tarefa
+        else:
+            faixas.append([id_tarefa, id_tarefa])
+    return faixas
+
+
+class ArmazenamentoFragmentado(Armazenamento):
+    """Dados em uma pasta, com um arquivo JSON por lista."""
+
+    def __init__(self, pasta: str, em_segundo_plano: bool = True) -> None:
+        self.pasta = pasta
+        self.arquivo_de_buscas = os.path.join(pasta, BUSCAS)
+        self.listas: list[ListaDeTarefas] = []
+        self.fragmentos: dict[int, str] = {} # id da lista -> nome do seu arquivo
+        self.faixas: dict[int, list[list[int]]] = {} # id da lista -> IDs das suas tarefas
+        self.proximo: int = 0 # número usado no nome do próximo arquivo
+        self.proximo_id: int = 0 # nenhuma tarefa salva tem ID maior ou igual a este
+        # Durante um lote, os arquivos só são reescritos em `concluir_lote`
+        self.em_lote: bool = False
+        self.manifesto_modificado: bool = False
+        self.apagar_no_fim: list[str] = [] # arquivos de listas removidas no lote
+        self.escritor: EscritorEmSegundoPlano | None = None
+        if em_segundo_plano:
+            self.escritor = EscritorEmSegundoPlano()
+
+    def _caminho(self, nome: str) -> str:
+        return os.path.join(self.pasta, nome)
+
+    def _gravar(self, nome: str, conteudo: bytes | None) -> None:
+        caminho: str = self._caminho(nome)
+        if self.escritor:
+            self.escritor.agendar(caminho, conteudo)
+        elif conteudo is None:
+            try:
+                os.remove(caminho)
+            except FileNotFoundError:
+                pass
+        else:
+            gravar_atomicamente(caminho, conteudo)
+
+    def carregar(self) -> list[ListaDeTarefas]:
+        try:
+            with open(self._caminho(MANIFESTO), "r") as f:
+                manifesto = json.load(f)
+        except FileNotFoundError:
+            manifesto = {"proximo": 0, "listas": []}
+        except ValueError:
+            self.corrompido = self._caminho(MANIFESTO + ".corrompido")
+            os.replace(self._caminho(MANIFESTO), self.corrompido)
+            manifesto = {"proximo": 0, "listas": []}
+
+        self.proximo = manifesto["proximo"]
+        self.listas = []
+        self.fragmentos = {}
+        self.faixas = {}
+        for entrada in manifesto["listas"]:
+            lista = ListaDeTarefas(entrada["titulo"], carregar_tarefas=self._ler_fragmento)
+            if "id" in entrada:
+                lista.restaurar_id(entrada["id"])
+            self.fragmentos[lista.id] = entrada["arquivo"]
+            if "ids" in entrada:
+                self.faixas[lista.id] = entrada["ids"]
+            self.listas.append(lista)
+
+        if "proximo_id" in manifesto:
+            self.proximo_id = manifesto["proximo_id"]
+            Tarefa.id_count = max(Tarefa.id_count, self.proximo_id)
+        if len(self.faixas) < len(self.listas):
+            # Manifesto antigo: lê todas as listas uma vez para descobrir os IDs usados
+            for lista in self.listas:
+                self.faixas[lista.id] = faixas_de_ids(t.id for t in lista.tarefas)
+            self._salvar_manifesto()
+        return self.listas
+
+    def _ler_fragmento(self, lista: ListaDeTarefas) -> list[Tarefa]:
+        """Lê as tarefas de uma lista (chamada no primeiro acesso a elas)."""
+        try:
+            with open(self._caminho(self.fragmentos[lista.id]), "r") as f:
+                dados_tarefas = json.load(f)
+        except FileNotFoundError:
+            return []
+
+        tarefas: list[Tarefa] = []
+        for tarefa_dict in dados_tarefas:
+            tarefa = Tarefa.de_dicio(tarefa_dict)
+            tarefa.lista_associada = lista.id
+            tarefas.append(tarefa)
+        return tarefas
+
+    def _salvar_manifesto(self, sem: ListaDeTarefas | None = None) -> None:
+        """Reescreve o manifesto (deixando de fora a lista `sem`, se dada)."""
+        self.proximo_id = max(self.proximo_id, Tarefa.id_count)
+        manifesto = {
+            "proximo": self.proximo,
+            "proximo_id": self.proximo_id,
+            "listas": [{"id": l.id, "titulo": l.titulo, "arquivo": self.fragmentos[l.id],
+                        "ids": self.faixas.get(l.id, [])}
+                       for l in self.listas if l is not sem],
+        }
+        self._gravar(MANIFESTO, json.dumps(manifesto, indent=4).encode("utf-8"))
+        self.manifesto_modificado = False
+
+    def _novo_fragmento(self, lista: ListaDeTarefas) -> None:
+        self.fragmentos[lista.id] = f"lista-{self.proximo}.json"
+        self.proximo += 1
+        self.faixas[lista.id] = []
+        lista.modificada = True
+
+    def _salvar_fragmento(self, lista: ListaDeTarefas, sem: Tarefa | None = None) -> None:
+        """Reescreve o arquivo de uma lista (deixando de fora a tarefa `sem`, se dada).
+
+        Se os IDs das tarefas da lista mudaram, o manifesto fica marcado
+        como modificado.
+        """
+        tarefas = [t for t in lista.tarefas if t is not sem]
+        conteudo = json.dumps([t.para_dicio() for t in tarefas], indent=4)
+        self._gravar(self.fragmentos[lista.id], conteudo.encode("utf-8"))
+        faixas = faixas_de_ids(t.id for t in tarefas)
+        if faixas != self.faixas.get(lista.id):
+            self.faixas[lista.id] = faixas
+            self.manifesto_modificado = True
+
+    def salvar_modificadas(self) -> None:
+        """Reescreve apenas os arquivos das listas marcadas como modificadas."""
+        for lista in self.listas:
+            if lista.modificada:
+                self._salvar_fragmento(lista)
+                lista.modificada = False
+
+    def salvar_tudo(self, listas: list[ListaDeTarefas]) -> None:
+        if not os.path.isdir(self.pasta):
+            os.makedirs(self.pasta)
+        removidas = [id_lista for id_lista in self.fragmentos
+                     if id_lista not in {l.id for l in listas}]
+        for id_lista in removidas:
+            self._gravar(self.fragmentos.pop(id_lista), None)
+            self.faixas.pop(id_lista, None)
+        self.listas = listas
+        for lista in listas:
+            if lista.id not in self.fragmentos:
+                self._novo_fragmento(lista)
+        self.salvar_modificadas()
+        self._salvar_manifesto()
+
+    def iniciar_lote(self) -> None:
+        self.em_lote = True
+
+    def concluir_lote(self) -> None:
+        """Reescreve uma vez cada lista modificada no lote (e o manifesto)."""
+        self.em_lote = False
+        for nome in self.apagar_no_fim:
+            self._gravar(nome, None)
+        self.apagar_no_fim = []
+        self.salvar_modificadas()
+        if self.manifesto_modificado or Tarefa.id_count > self.proximo_id:
+            self._salvar_manifesto()
+        self.manifesto_modificado = False
+
+    def descartar_lote(self) -> None:
+        # As listas e os fragmentos são lidos de novo do disco por quem descartou
+        self.em_lote = False
+        self.manifesto_modificado = False
+        self.apagar_no_fim = []
+
+    def tarefa_adicionada(self, lista: ListaDeTarefas, tarefa: Tarefa) -> None:
+        lista.modificada = True
+        if self.em_lote:
+            return
+        self.salvar_modificadas()
+        if self.manifesto_modificado or tarefa.id >= self.proximo_id:
+            self._salvar_manifesto()
+
+    def tarefa_editada(self, lista: ListaDeTarefas, tarefa: Tarefa) -> None:
+        lista.modificada = True
+        if not self.em_lote:
+            self.salvar_modificadas()
+            if self.manifesto_modificado:
+                self._salvar_manifesto()
+
+    def tarefa_removida(self, lista: ListaDeTarefas, tarefa: Tarefa) -> None:
+        if self.em_lote:
+            # Quando o lote terminar, a tarefa já terá saído da lista
+            lista.modificada = True
+            return
+        # A tarefa ainda está na lista, então é deixada de fora ao salvar
+        self._salvar_fragmento(lista, sem=tarefa)
+        if self.manifesto_modificado:
+            self._salvar_manifesto()
+
+    def lista_adicionada(self, lista: ListaDeTarefas) -> None:
+        if not os.path.isdir(self.pasta):
+            os.makedirs(self.pasta)
+        if lista not in self.listas:
+            self.listas.append(lista)
+        self._novo_fragmento(lista)
+        if self.em_lote:
+            self.manifesto_modificado = True
+            return
+        self.salvar_modificadas()
+        self._salvar_manifesto()
+
+    def lista_renomeada(self, titulo_antigo: str, lista: ListaDeTarefas) -> None:
+        if self.em_lote:
+            self.manifesto_modificado = True
+        else:
+            self._salvar_manifesto()
+
+    def lista_removida(self, lista: ListaDeTarefas) -> None:
+        nome: str = self.fragmentos.pop(lista.id)
+        self.faixas.pop(lista.id, None)
+        lista.modificada = False
+        if self.em_lote:
+            self.apagar_no_fim.append(nome)
+            self.manifesto_modificado = True
+            return
+        # A lista ainda está em `self.listas`; quem chamou é que a remove
+        self._salvar_manifesto(sem=lista)
+        self._gravar(nome, None)
+
+    def lista_da_tarefa(self, id_tarefa: int) -> int | None:
+        for id_lista, faixas in self.faixas.items():
+            i = bisect_right(faixas, id_tarefa, key=lambda faixa: faixa[0]) - 1
+            if i >= 0 and faixas[i][1] >= id_tarefa:
+                return id_lista
+        return None
+
+    def salvar_buscas(self, buscas: dict[str, str]) -> None:
+        if not os.path.isdir(self.pasta):
+            os.makedirs(self.pasta)
+        self._gravar(BUSCAS, json.dumps(buscas, indent=4, ensure_ascii=False).encode("utf-8"))
+
+    def descarregar(self) -> None:
+        if self.escritor:
+            self.escritor.descarregar()
+
+    def fechar(self) -> None:
+        if self.escritor:
+            self.escritor.fechar()
@@ -0,0 +1,137 @@
+"""Leitor incremental do arquivo de dados JSON.
+
+Em vez de carregar o arquivo inteiro com `json.load`, percorre-o aos
+poucos e entrega uma lista ou tarefa por vez. Assim a memória usada na
+leitura fica limitada ao tamanho de uma tarefa (mais o bloco lido do
+disco), e não ao tamanho do arquivo.
+
+O formato esperado é:
+    {"titulo da lista": {"id": 3, "tarefas": [{...tarefa...}, ...]}, ...}
+ou o formato antigo, sem o ID da lista:
+    {"titulo da lista": [{...tarefa...}, ...], ...}
+"""
+
+import json
+from typing import Iterator, TextIO
+
+TAMANHO_BLOCO: int = 64 * 1024
+ESPACOS: str = " \t\n\r"
+
+
+class LeitorJSON:
+    """Percorre o arquivo de dados, emitindo eventos de lista e tarefa."""
+
+    def __init__(self, arquivo: TextIO, tamanho_bloco: int = TAMANHO_BLOCO) -> None:
+        self.arquivo = arquivo
+        self.tamanho_bloco = tamanho_bloco
+        self.decodificador = json.JSONDecoder()
+        self.buffer: str = ""
+        self.pos: int = 0
+        self.fim: bool = False
+
+    def _preencher(self) -> bool:
+        """Lê mais um bloco do arquivo. Retorna False se ele já acabou."""
+        if self.fim:
+            return False
+        # Descarta o que já foi consumido e lê pelo menos o tamanho do que
+        # sobrou, para que valores grandes não sejam relidos muitas vezes
+        self.buffer = self.buffer[self.pos:]
+        self.pos = 0
+        bloco: str = self.arquivo.read(max(self.tamanho_bloco, len(self.buffer)))
+        if not bloco:
+            self.fim = True
+            return False
+        self.buffer += bloco
+        return True
+
+    def _erro(self, mensagem: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(mensagem, self.buffer, self.pos)
+
+    def _proximo_caractere(self) -> str:
+        """Pula espaços em branco e retorna o próximo caractere (sem consumi-lo)."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in ESPACOS:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._preencher():
+                return ""
+
+    def _consumir(self, esperados: str) -> str:
+        caractere: str = self._proximo_caractere()
+        if not caractere or caractere not in esperados:
+            raise self._erro(f"Esperava um de {esperados!r}")
+        self.pos += 1
+        return caractere
+
+    def _valor(self):
+        """Decodifica o próximo valor JSON completo (string ou objeto)."""
+        self._proximo_caractere()
+        while True:
+            try:
+                valor, fim = self.decodificador.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # O valor pode só estar cortado no fim do bloco atual
+                if not self._preencher():
+                    raise
+                continue
+            self.pos = fim
+            return valor
+
+    def _tarefas(self) -> Iterator[tuple[str, object]]:
+        """Gera ("tarefa", dicio) para cada tarefa de um array já aberto."""
+        if self._proximo_caractere() == "]":
+            self.pos += 1
+            return
+        while True:
+            tarefa = self._valor()
+            if not isinstance(tarefa, dict):
+                raise self._erro("Tarefa inválida")
+            yield "tarefa", tarefa
+            if self._consumir(",]") == "]":
+                return
+
+    def _lista(self) -> Iterator[tuple[str, object]]:
+        """Gera ("id", id) e as tarefas de uma lista no formato com ID."""
+        if self._proximo_caractere() == "}":
+            self.pos += 1
+            return
+        while True:
+            chave = self._valor()
+            self._consumir(":")
+            if chave == "tarefas":
+                self._consumir("[")
+                yield from self._tarefas()
+            elif chave == "id":
+                id_lista = self._valor()
+                if not isinstance(id_lista, int):
+                    raise self._erro("ID de lista inválido")
+                yield "id", id_lista
+            else:
+                self._valor() # campo desconhecido
+            if self._consumir(",}") == "}":
+                return
+
+    def eventos(self) -> Iterator[tuple[str, object]]:
+        """Gera ("lista", titulo) ao começar cada lista, ("id", id) com o ID
+        salvo da lista (se houver) e ("tarefa", dicio) para cada uma de
+        suas tarefas, na ordem do arquivo.
+        """
+        if not self._proximo_caractere():
+            return # arquivo vazio
+        self._consumir("{")
+        if self._proximo_caractere() == "}":
+            self.pos += 1
+            return
+
+        while True:
+            titulo = self._valor()
+            if not isinstance(titulo, str):
+                raise self._erro("Título de lista inválido")
+            self._consumir(":")
+            abertura: str = self._consumir("[{")
+            yield "lista", titulo
+            yield from (self._tarefas() if abertura == "[" else self._lista())
+
+            if self._consumir(",}") == "}":
+                return
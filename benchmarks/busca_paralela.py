@@ -0,0 +1,163 @@
+"""Benchmark da busca paralela (TAREFAS_PROCESSOS) por TEXTO em notas longas.
+
+Compara a busca em um só processo (percorrendo todas as tarefas, sem o
+índice de trigramas) com a busca dividida entre 2, 4, ... processos, e
+confere que os resultados são idênticos. O tempo para criar os processos
+e copiar as tarefas para eles aparece à parte, pois só é pago uma vez.
+
+Depois, edita algumas tarefas entre uma busca e outra e compara a busca
+seguinte em um só processo, em vários processos que recebem só as
+mudanças e em vários processos recriados do zero (como era feito antes
+de as mudanças serem enviadas aos processos).
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/busca_paralela.py [quantidade de tarefas ...]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from armazenamento.arquivo_json import ArmazenamentoJSON
+from classes.lista import ListaDeTarefas
+from classes.tarefa import Tarefa
+from comandos.manipulacao_de_dados import dados
+from comandos.busca_paralela import BuscaParalela
+import comandos.busca as busca
+
+TAREFAS_POR_LISTA: int = 1000
+PROCESSOS: list[int] = [2, 4]
+PALAVRAS: list[str] = [
+    "comprar", "pagar", "ligar", "estudar", "revisar", "enviar", "lavar", "marcar",
+    "conta", "mercado", "relatório", "consulta", "projeto", "prova", "carro", "casa",
+]
+EDICOES: list[int] = [10, 1000]
+CONSULTAS: list[str] = ['TEXTO:"relatório do mercado"', 'TEXTO:"xyz" CONCLUIDA:"n"',
+                        'TEXTO:"conta" ORDENAR:"prioridade" LIMITE:"20"']
+
+
+def gerar_listas(quantidade: int) -> list[ListaDeTarefas]:
+    aleatorio = random.Random(42)
+    listas: list[ListaDeTarefas] = []
+    for i in range(quantidade):
+        if i % TAREFAS_POR_LISTA == 0:
+            listas.append(ListaDeTarefas(f"Lista {len(listas)}"))
+        nota: str = " ".join(aleatorio.choices(PALAVRAS, k=60)) # ~400 caracteres
+        listas[-1].adicionar_tarefa(Tarefa(
+            titulo=f"Tarefa {i}",
+            lista_associada=listas[-1].id,
+            nota=nota,
+            prioridade=aleatorio.randrange(4),
+            concluida=aleatorio.random() < 0.3,
+            id=i,
+        ))
+    return listas
+
+
+def buscar(consulta: str) -> tuple[float, list[int], int]:
+    plano = busca.gerar_busca(consulta.split('"'))
+    plano.chave = None # sem cache, para medir a busca de verdade
+    inicio = time.perf_counter()
+    tarefas, total = plano.executar_pagina()
+    return time.perf_counter() - inicio, [tarefa.id for tarefa in tarefas], total
+
+
+def buscar_percorrendo(consulta: str) -> tuple[float, list[int], int]:
+    """A mesma busca em um só processo, testando todas as tarefas (sem
+    construir o índice de trigramas, como a busca faria)."""
+    plano = busca.gerar_busca(consulta.split('"'))
+    inicio = time.perf_counter()
+    encontradas = [tarefa for lista in dados.listas for tarefa in lista.tarefas
+                   if all(filtro(tarefa) for filtro in plano.filtros)]
+    fim = plano.pagina * plano.limite if plano.limite else None
+    pagina = sorted(encontradas, key=plano.sorting_key)[:fim][fim - plano.limite if fim else 0:]
+    return time.perf_counter() - inicio, [tarefa.id for tarefa in pagina], len(encontradas)
+
+
+def editar(quantidade: int, aleatorio: random.Random) -> None:
+    for _ in range(quantidade):
+        lista: ListaDeTarefas = aleatorio.choice(dados.listas)
+        tarefa: Tarefa = aleatorio.choice(list(lista.tarefas))
+        tarefa.prioridade = (tarefa.prioridade + 1) % 4
+        tarefa.concluida = not tarefa.concluida
+        dados.mudou() # como `registrar_tarefa_editada`, sem o armazenamento
+        dados.registro.tarefa_editada(tarefa)
+
+
+def medir_mudancas(quantidade: int, processos: int) -> None:
+    """Tempo da primeira busca depois de `EDICOES` tarefas editadas."""
+    consulta: str = CONSULTAS[-1]
+    aleatorio = random.Random(7)
+    print(f"{'tarefas':>10} {'editadas':>9} {'1 proc. (ms)':>13} "
+          f"{f'{processos} proc., mudanças (ms)':>28} {f'{processos} proc., recriados (ms)':>29}")
+    busca.processos_paralelos = processos
+    busca.busca_paralela = BuscaParalela(processos)
+    busca.busca_paralela.iniciar(dados.listas, dados.registro)
+    for editadas in EDICOES:
+        editar(editadas, aleatorio)
+        tempo_serial, esperado_ids, esperado_total = buscar_percorrendo(consulta)
+        inicio = time.perf_counter()
+        busca.busca_paralela.iniciar(dados.listas, dados.registro) # envia só as mudanças
+        _, ids, total = buscar(consulta)
+        tempo_mudancas: float = time.perf_counter() - inicio
+        assert (ids, total) == (esperado_ids, esperado_total), consulta
+
+        editar(editadas, aleatorio)
+        _, esperado_ids, esperado_total = buscar_percorrendo(consulta)
+        inicio = time.perf_counter()
+        busca.busca_paralela.fechar()
+        busca.busca_paralela.iniciar(dados.listas, dados.registro) # recria os processos
+        _, ids, total = buscar(consulta)
+        tempo_recriados: float = time.perf_counter() - inicio
+        assert (ids, total) == (esperado_ids, esperado_total), consulta
+        print(f"{quantidade:>10} {editadas:>9} {tempo_serial * 1000:>13.1f} "
+              f"{tempo_mudancas * 1000:>28.1f} {tempo_recriados * 1000:>29.1f}")
+    busca.busca_paralela.fechar()
+    busca.busca_paralela = None
+
+
+def main(quantidades: list[int]) -> None:
+    print(f"Processadores: {os.cpu_count()}")
+    cabecalho: str = "".join(f"{f'{n} proc. (ms)':>14}" for n in PROCESSOS)
+    print(f"{'tarefas':>10} {'consulta':>45} {'achadas':>8} {'1 proc. (ms)':>13}{cabecalho}")
+    with tempfile.TemporaryDirectory() as pasta:
+        for quantidade in quantidades:
+            dados._listas = gerar_listas(quantidade)
+            dados._registro = None
+            dados._armazenamento = ArmazenamentoJSON(os.path.join(pasta, "tarefas.json"),
+                                                     em_segundo_plano=False) # não resolve buscas sozinho
+            busca.MINIMO_PARALELO = 0
+            tempos: dict[str, list[float]] = {consulta: [] for consulta in CONSULTAS}
+            esperados: dict[str, tuple[list[int], int]] = {}
+            iniciar: list[str] = []
+            for processos in [1] + PROCESSOS:
+                busca.processos_paralelos = processos
+                if busca.busca_paralela is not None:
+                    busca.busca_paralela.fechar()
+                    busca.busca_paralela = None
+                if processos > 1:
+                    inicio = time.perf_counter()
+                    busca.busca_paralela = BuscaParalela(processos)
+                    busca.busca_paralela.iniciar(dados.listas, dados.registro)
+                    iniciar.append(f"{processos} proc.: {time.perf_counter() - inicio:.2f} s")
+                for consulta in CONSULTAS:
+                    t, ids, total = buscar(consulta) if processos > 1 else buscar_percorrendo(consulta)
+                    assert esperados.setdefault(consulta, (ids, total)) == (ids, total), consulta
+                    tempos[consulta].append(t)
+            for consulta in CONSULTAS:
+                colunas: str = "".join(f"{t * 1000:>14.1f}" for t in tempos[consulta][1:])
+                print(f"{quantidade:>10} {consulta:>45} {esperados[consulta][1]:>8} {tempos[consulta][0] * 1000:>13.1f}{colunas}")
+            print(f"{quantidade:>10} (criação dos processos: {', '.join(iniciar)})")
+            busca.busca_paralela.fechar()
+            busca.busca_paralela = None
+            print()
+            medir_mudancas(quantidade, PROCESSOS[-1])
+            print()
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [100_000, 1_000_000])
@@ -0,0 +1,80 @@
+"""Benchmark da busca por texto (filtro TEXTO).
+
+Compara, em listas geradas na memória, a busca antiga (percorre todas
+as tarefas, passando cada campo para minúsculas) com o índice de
+trigramas, para algumas consultas mais e menos seletivas.
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/busca_texto.py [quantidade de tarefas ...]
+"""
+
+import os
+import random
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from classes.indices import IndiceDeTexto
+from classes.lista import ListaDeTarefas
+from classes.registro import RegistroDeIds
+from classes.tarefa import Tarefa
+
+TAREFAS_POR_LISTA: int = 1000
+PALAVRAS: list[str] = [
+    "comprar", "pagar", "ligar", "estudar", "revisar", "enviar", "lavar", "marcar",
+    "conta", "mercado", "relatório", "consulta", "projeto", "prova", "carro", "casa",
+    "dentista", "reunião", "presente", "viagem", "academia", "livro", "banco", "email",
+]
+CONSULTAS: list[str] = ["relatório", "dentista 12", "123456", "xyz"]
+
+
+def gerar_listas(quantidade: int) -> list[ListaDeTarefas]:
+    aleatorio = random.Random(42)
+    listas: list[ListaDeTarefas] = []
+    for i in range(quantidade):
+        if i % TAREFAS_POR_LISTA == 0:
+            listas.append(ListaDeTarefas(f"Lista {len(listas)}"))
+        palavras = aleatorio.sample(PALAVRAS, 3)
+        listas[-1].adicionar_tarefa(Tarefa(
+            titulo=f"{palavras[0].capitalize()} {palavras[1]} {i}",
+            lista_associada=listas[-1].id,
+            nota=palavras[2] if i % 4 == 0 else "",
+            tags={aleatorio.choice(PALAVRAS)},
+            id=i,
+        ))
+    return listas
+
+
+def buscar_percorrendo(listas: list[ListaDeTarefas], texto: str) -> int:
+    return sum(1 for lista in listas for tarefa in lista.tarefas
+               if texto in tarefa.titulo.lower()
+               or texto in tarefa.nota.lower()
+               or any(texto in tag.lower() for tag in tarefa.tags))
+
+
+def cronometrar(funcao, *args) -> tuple[float, object]:
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return time.perf_counter() - inicio, resultado
+
+
+def main(quantidades: list[int]) -> None:
+    print(f"{'tarefas':>10} {'consulta':>15} {'achadas':>8} {'percorrendo (ms)':>17} {'índice (ms)':>12}")
+    for quantidade in quantidades:
+        listas = gerar_listas(quantidade)
+        registro = RegistroDeIds(listas)
+        construcao, indice = cronometrar(registro.indice, IndiceDeTexto)
+        for consulta in CONSULTAS:
+            t_percorrer, achadas = cronometrar(buscar_percorrendo, listas, consulta)
+            t_indice, ids = cronometrar(indice.buscar, consulta)
+            assert achadas == len(ids)
+            print(f"{quantidade:>10} {consulta:>15} {achadas:>8} {t_percorrer * 1000:>17.1f} {t_indice * 1000:>12.2f}")
+        print(f"{quantidade:>10} {'(construção do índice: ' + format(construcao, '.1f') + ' s)':>55}")
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"Pico de memória (RSS): {pico:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [100_000, 1_000_000])
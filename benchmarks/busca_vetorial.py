@@ -0,0 +1,91 @@
+"""Benchmark da busca vetorial (NumPy) contra a busca com filtros Python.
+
+Gera tarefas na memória, roda algumas buscas com os filtros que viram
+máscaras (lista, conclusão, datas) e as duas ordenações, uma vez com
+`usar_vetorial` desligado e outra ligado, e confere que os resultados
+são idênticos.
+
+Uso (a partir da raiz do projeto, com NumPy instalado):
+    python benchmarks/busca_vetorial.py [quantidade de tarefas ...]
+"""
+
+from datetime import date
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from armazenamento.arquivo_json import ArmazenamentoJSON
+from classes.indice_vetorial import DISPONIVEL, IndiceVetorial
+from classes.lista import ListaDeTarefas
+from classes.tarefa import Tarefa
+from comandos.manipulacao_de_dados import dados
+import comandos.busca as busca
+
+TAREFAS_POR_LISTA: int = 1000
+CONSULTAS: list[str] = [
+    'CONCLUIDA:"n" ATE:"31/03/2025"',
+    'LISTA_NOME:"lista 7" CONCLUIDA:"n"',
+    'ENTRE:"01/06/2025-30/06/2025" ORDENAR:"prioridade"',
+    'CONCLUIDA:"s" ORDENAR:"prioridade" LIMITE:"20"',
+    'ATE:"31/12/2025" LIMITE:"20" PAGINA:"3"',
+]
+
+
+def gerar_listas(quantidade: int) -> list[ListaDeTarefas]:
+    aleatorio = random.Random(42)
+    inicio: int = date(2025, 1, 1).toordinal()
+    listas: list[ListaDeTarefas] = []
+    for i in range(quantidade):
+        if i % TAREFAS_POR_LISTA == 0:
+            listas.append(ListaDeTarefas(f"Lista {len(listas)}"))
+        sem_data: bool = aleatorio.random() < 0.2
+        listas[-1].adicionar_tarefa(Tarefa(
+            titulo=f"Tarefa {i}",
+            lista_associada=listas[-1].id,
+            data=None if sem_data else date.fromordinal(inicio + aleatorio.randrange(365)),
+            prioridade=aleatorio.randrange(4),
+            concluida=aleatorio.random() < 0.3,
+            id=i,
+        ))
+    return listas
+
+
+def buscar(consulta: str) -> tuple[float, list[int], int]:
+    plano = busca.gerar_busca(consulta.split('"'))
+    plano.chave = None # sem cache, para medir a busca de verdade
+    inicio = time.perf_counter()
+    tarefas, total = plano.executar_pagina()
+    return time.perf_counter() - inicio, [tarefa.id for tarefa in tarefas], total
+
+
+def main(quantidades: list[int]) -> None:
+    if not DISPONIVEL:
+        print("NumPy não está instalado; só a busca com filtros Python está disponível.")
+        return
+    print(f"{'tarefas':>10} {'consulta':>52} {'achadas':>8} {'python (ms)':>12} {'vetorial (ms)':>14}")
+    with tempfile.TemporaryDirectory() as pasta:
+        for quantidade in quantidades:
+            dados._listas = gerar_listas(quantidade)
+            dados._registro = None
+            dados._armazenamento = ArmazenamentoJSON(os.path.join(pasta, "tarefas.json"),
+                                                     em_segundo_plano=False) # não resolve buscas sozinho
+            inicio = time.perf_counter()
+            dados.registro.indice(IndiceVetorial)
+            construcao: float = time.perf_counter() - inicio
+            for consulta in CONSULTAS:
+                busca.usar_vetorial = False
+                buscar(consulta) # constrói os índices usados pelo caminho Python
+                t_python, ids_python, total = buscar(consulta)
+                busca.usar_vetorial = True
+                t_vetorial, ids_vetorial, total_vetorial = buscar(consulta)
+                assert (ids_python, total) == (ids_vetorial, total_vetorial), consulta
+                print(f"{quantidade:>10} {consulta:>52} {total:>8} {t_python * 1000:>12.1f} {t_vetorial * 1000:>14.1f}")
+            print(f"{quantidade:>10} {'(construção do índice vetorial: ' + format(construcao, '.2f') + ' s)':>75}")
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [100_000, 1_000_000])
@@ -0,0 +1,99 @@
+"""Benchmark do carregamento do arquivo de dados JSON.
+
+Compara o carregamento antigo (`json.load` do arquivo inteiro e só
+depois a criação das tarefas) com o leitor incremental, medindo o tempo
+de carregamento e o pico de memória (RSS) de cada um.
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/carregamento.py [quantidade de tarefas ...]
+"""
+
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TAREFAS_POR_LISTA: int = 1000
+
+
+def gerar_arquivo(caminho: str, quantidade: int) -> None:
+    """Escreve um arquivo de dados sintético com `quantidade` tarefas."""
+    with open(caminho, "w") as f:
+        f.write("{")
+        for i_lista in range(0, quantidade, TAREFAS_POR_LISTA):
+            tarefas = [{
+                "titulo": f"Tarefa {i}",
+                "nota": f"Nota da tarefa {i}, com algum texto a mais para ocupar espaço",
+                "data": f"{i % 28 + 1:02d}/{i % 12 + 1:02d}/2025",
+                "tags": ["casa", f"tag{i % 50}"],
+                "lista_associada": i_lista // TAREFAS_POR_LISTA,
+                "prioridade": i % 4,
+                "repeticao": i % 5,
+                "concluida": i % 3 == 0,
+                "id": i,
+            } for i in range(i_lista, min(i_lista + TAREFAS_POR_LISTA, quantidade))]
+            separador = "," if i_lista else ""
+            f.write(f'{separador}\n    "Lista {i_lista // TAREFAS_POR_LISTA}": ')
+            f.write(json.dumps(tarefas, indent=4))
+        f.write("\n}")
+
+
+def carregar_json_load(caminho: str) -> int:
+    from classes.lista import ListaDeTarefas
+    from classes.tarefa import Tarefa
+    with open(caminho) as f:
+        dados = json.load(f)
+    listas = []
+    for titulo, tarefas in dados.items():
+        lista = ListaDeTarefas(titulo)
+        for tarefa_dict in tarefas:
+            lista.adicionar_tarefa(Tarefa.de_dicio(tarefa_dict))
+        listas.append(lista)
+    return sum(len(l.tarefas) for l in listas)
+
+
+def carregar_incremental(caminho: str) -> int:
+    from armazenamento.arquivo_json import ArmazenamentoJSON
+    listas = ArmazenamentoJSON(caminho).carregar()
+    return sum(len(l.tarefas) for l in listas)
+
+
+MODOS = {
+    "json.load": carregar_json_load,
+    "incremental": carregar_incremental,
+}
+
+
+def medir(modo: str, caminho: str) -> None:
+    """Executado em um processo separado, para isolar o pico de memória."""
+    inicio = time.perf_counter()
+    quantidade = MODOS[modo](caminho)
+    duracao = time.perf_counter() - inicio
+    pico_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"tarefas": quantidade, "segundos": duracao, "pico_mib": pico_kib / 1024}))
+
+
+def main(quantidades: list[int]) -> None:
+    print(f"{'tarefas':>10} {'modo':>12} {'tempo (s)':>10} {'pico RSS (MiB)':>15}")
+    for quantidade in quantidades:
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, "tarefas.json")
+            gerar_arquivo(caminho, quantidade)
+            for modo in MODOS:
+                saida = subprocess.run(
+                    [sys.executable, __file__, "--medir", modo, caminho],
+                    capture_output=True, text=True, check=True).stdout
+                r = json.loads(saida)
+                print(f"{r['tarefas']:>10} {modo:>12} {r['segundos']:>10.2f} {r['pico_mib']:>15.1f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--medir":
+        medir(sys.argv[2], sys.argv[3])
+    else:
+        main([int(n) for n in sys.argv[1:]] or [100_000, 1_000_000])
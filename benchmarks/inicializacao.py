@@ -0,0 +1,64 @@
+"""Benchmark do custo de inicialização do programa.
+
+Mede, em um processo novo a cada rodada, o tempo de importar o programa
+principal e a latência do primeiro comando: um que não usa os dados
+("ajuda") e um que usa ("ver listas").
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/inicializacao.py [quantidade de tarefas ...]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RAIZ: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from benchmarks.carregamento import gerar_arquivo
+
+RODADAS: int = 5
+
+MEDICAO: str = """
+import contextlib, io, json, time
+inicio = time.perf_counter()
+import lista_de_tarefas
+importacao = time.perf_counter() - inicio
+with contextlib.redirect_stdout(io.StringIO()):
+    inicio = time.perf_counter()
+    getattr(lista_de_tarefas.UserCommands, COMANDO)()
+    comando = time.perf_counter() - inicio
+print(json.dumps({"importacao": importacao, "comando": comando}))
+"""
+
+
+def medir(pasta: str, comando: str) -> tuple[float, float]:
+    """Retorna as medianas (importação, primeiro comando), em segundos."""
+    importacoes: list[float] = []
+    comandos: list[float] = []
+    for _ in range(RODADAS):
+        saida = subprocess.run(
+            [sys.executable, "-c", f"COMANDO = {comando!r}\n" + MEDICAO],
+            cwd=pasta, env=os.environ | {"PYTHONPATH": RAIZ},
+            capture_output=True, text=True, check=True).stdout
+        r = json.loads(saida.splitlines()[-1])
+        importacoes.append(r["importacao"])
+        comandos.append(r["comando"])
+    return statistics.median(importacoes), statistics.median(comandos)
+
+
+def main(quantidades: list[int]) -> None:
+    print(f"{'tarefas':>10} {'comando':>12} {'importação (ms)':>16} {'1º comando (ms)':>16}")
+    for quantidade in quantidades:
+        with tempfile.TemporaryDirectory() as pasta:
+            gerar_arquivo(os.path.join(pasta, "tarefas.json"), quantidade)
+            for comando in ("ajuda", "ver_listas"):
+                importacao, primeiro = medir(pasta, comando)
+                print(f"{quantidade:>10} {comando:>12} {importacao * 1000:>16.1f} {primeiro * 1000:>16.1f}")
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [1_000, 100_000])
@@ -0,0 +1,78 @@
+"""Benchmark do modo em lote: tarefas criadas por segundo.
+
+Gera um lote com uma linha "adicionar tarefa ..." por tarefa e o executa
+em um arquivo de dados novo (em uma pasta temporária), de duas formas:
+como uma só transação (como `lista_de_tarefas.py ARQUIVO` faz) e
+persistindo cada tarefa assim que é criada (como os comandos interativos,
+que gravam cada mudança no diário). Os tempos incluem esperar a gravação
+chegar ao disco.
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/lote.py [quantidade de tarefas ...]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from comandos.manipulacao_de_dados import dados
+import comandos.lote as lote
+
+FORMATOS: list[str] = ["tarefas.json", "tarefas.db"]
+
+
+def gerar_lote(quantidade: int) -> list[str]:
+    linhas: list[str] = ['adicionar lista titulo="Importadas"']
+    for i in range(quantidade):
+        linhas.append(f'adicionar tarefa titulo="Tarefa importada {i}" lista=Importadas '
+                      f'data={i % 28 + 1:02}/{i % 12 + 1:02}/2025 tags=importada,lote{i % 10} '
+                      f'prioridade={i % 4} nota="nota da tarefa {i}"')
+    return linhas
+
+
+def usar_arquivo(caminho: str) -> None:
+    dados.encerrar()
+    dados.caminho = caminho
+    dados._armazenamento = None
+    dados._listas = None
+    dados._registro = None
+    dados._buscas = None
+
+
+def em_transacao(linhas: list[str]) -> None:
+    assert lote.executar_lote(linhas)
+
+
+def uma_a_uma(linhas: list[str]) -> None:
+    dados.listas
+    for linha in linhas:
+        lote.executar_linha(linha)
+    dados.armazenamento.descarregar()
+
+
+def main(quantidades: list[int]) -> None:
+    print(f"{'tarefas':>10} {'formato':>13} {'modo':>12} {'tempo (s)':>10} {'tarefas/s':>10}")
+    for quantidade in quantidades:
+        linhas = gerar_lote(quantidade)
+        for formato in FORMATOS:
+            for nome, executar in (("transação", em_transacao), ("uma a uma", uma_a_uma)):
+                with tempfile.TemporaryDirectory() as pasta:
+                    usar_arquivo(os.path.join(pasta, formato))
+                    inicio = time.perf_counter()
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        executar(linhas)
+                    tempo: float = time.perf_counter() - inicio
+                    usar_arquivo(os.path.join(pasta, formato))
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        assert sum(len(l.tarefas) for l in dados.listas) == quantidade
+                    dados.encerrar()
+                print(f"{quantidade:>10} {formato:>13} {nome:>12} {tempo:>10.2f} {quantidade / tempo:>10.0f}")
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [10_000, 100_000])
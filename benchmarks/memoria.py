@@ -0,0 +1,71 @@
+"""Benchmark da memória usada por tarefa.
+
+Cria tarefas como os carregadores fazem (uma data e um conjunto de tags
+novos para cada tarefa) e mede, com tracemalloc, quantos bytes cada
+tarefa ocupa em média: como objetos `Tarefa` e, se disponível, no
+armazenamento colunar `TarefaStore`.
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/memoria.py [quantidade de tarefas]
+"""
+
+from datetime import date
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from classes.tarefa import Tarefa
+
+
+def campos(i: int) -> dict:
+    return {
+        "titulo": f"Tarefa {i}",
+        "lista_associada": i // 1000,
+        "nota": "",
+        "data": date(2025, i % 12 + 1, i % 28 + 1),
+        "tags": {"casa", f"tag{i % 50}"},
+        "prioridade": i % 4,
+        "repeticao": i % 5,
+        "concluida": i % 3 == 0,
+    }
+
+
+def medir(criar, quantidade: int) -> float:
+    """Bytes alocados por tarefa ao criar `quantidade` tarefas com `criar`."""
+    # Os textos dos títulos são criados antes, pois existem em qualquer representação
+    todos = [campos(i) for i in range(quantidade)]
+    for c in todos:
+        c["tags"] = {"".join(tag) for tag in c["tags"]} # textos novos, como ao ler um arquivo
+    tracemalloc.start()
+    inicio = tracemalloc.get_traced_memory()[0]
+    tarefas = criar(todos)
+    usado = tracemalloc.get_traced_memory()[0] - inicio
+    tracemalloc.stop()
+    del tarefas
+    return usado / quantidade
+
+
+def criar_objetos(todos: list[dict]) -> list:
+    return [Tarefa(**c) for c in todos]
+
+
+def criar_colunar(todos: list[dict]):
+    from classes.tarefa_store import TarefaStore
+    store = TarefaStore()
+    return store, [store.adicionar(**c) for c in todos]
+
+
+def main(quantidade: int) -> None:
+    print(f"{'representação':>16} {'bytes por tarefa':>17}")
+    print(f"{'Tarefa':>16} {medir(criar_objetos, quantidade):>17.1f}")
+    try:
+        import classes.tarefa_store
+    except ImportError:
+        return
+    print(f"{'TarefaStore':>16} {medir(criar_colunar, quantidade):>17.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,55 @@
+"""Benchmark de pôr em dia uma tarefa repetível atrasada.
+
+Compara concluir, uma a uma, todas as ocorrências atrasadas de uma série
+diária (como "concluir tarefa" fazia, criando uma cópia da tarefa para
+cada ocorrência) com `concluir_ate`, que calcula a próxima ocorrência
+pendente diretamente a partir do início da série.
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/recorrencia.py [dias de atraso ...]
+"""
+
+from datetime import date, timedelta
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from classes.recorrencia import concluir_ate
+from classes.tarefa import Repeticao, Tarefa
+
+
+def uma_a_uma(tarefa: Tarefa, ate: date) -> list[Tarefa]:
+    copias: list[Tarefa] = []
+    while tarefa.data <= ate:
+        tarefa.concluida = True
+        tarefa = Tarefa(titulo=tarefa.titulo, lista_associada=tarefa.lista_associada,
+                        nota=tarefa.nota, data=tarefa.data + timedelta(days=1),
+                        tags=tarefa.tags, prioridade=tarefa.prioridade,
+                        repeticao=tarefa.repeticao)
+        copias.append(tarefa)
+    return copias
+
+
+def main(atrasos: list[int]) -> None:
+    hoje: date = date.today()
+    print(f"{'dias':>10} {'modo':>12} {'tarefas criadas':>16} {'tempo (ms)':>11}")
+    for atraso in atrasos:
+        inicio: date = hoje - timedelta(days=atraso)
+        tarefa = Tarefa("Regar plantas", 0, data=inicio, repeticao=Repeticao.DIARIA.value)
+
+        comeco = time.perf_counter()
+        copias = uma_a_uma(tarefa, hoje)
+        tempo: float = time.perf_counter() - comeco
+        print(f"{atraso:>10} {'uma a uma':>12} {len(copias):>16} {tempo * 1000:>11.3f}")
+
+        comeco = time.perf_counter()
+        proxima, _ = concluir_ate(inicio, Repeticao.DIARIA.value, inicio, hoje)
+        tempo = time.perf_counter() - comeco
+        assert proxima == copias[-1].data
+        print(f"{atraso:>10} {'de uma vez':>12} {0:>16} {tempo * 1000:>11.3f}")
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [30, 365, 3650])
@@ -0,0 +1,67 @@
+"""Benchmark da saída com `trm.buffered_output` contra um `print()` por linha.
+
+Imprime uma linha por tarefa, como "remover tarefa" faz ao listar as
+tarefas, em uma saída com buffer de linha (como a de um terminal) que
+conta quantas escritas chegam ao sistema operacional. Cada escrita em um
+terminal remoto (SSH) vira ao menos um pacote.
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/saida.py [quantidade de linhas ...]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import terminal_utils as trm
+
+
+class Destino(io.RawIOBase):
+    """Descarta os bytes, contando as escritas."""
+
+    def __init__(self) -> None:
+        self.escritas: int = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, dados) -> int:
+        self.escritas += 1
+        return len(dados)
+
+
+def listar(quantidade: int) -> None:
+    print(trm.bold("Escolha a tarefa que deseja remover:"))
+    for i in range(quantidade):
+        print(f"Título: Tarefa {i} | ID: {i}")
+
+
+def medir(quantidade: int, com_buffer: bool) -> tuple[float, int]:
+    destino = Destino()
+    terminal = io.TextIOWrapper(io.BufferedWriter(destino), encoding="utf-8",
+                                line_buffering=True)
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(terminal):
+        if com_buffer:
+            with trm.buffered_output():
+                listar(quantidade)
+        else:
+            listar(quantidade)
+        terminal.flush()
+    return time.perf_counter() - inicio, destino.escritas
+
+
+def main(quantidades: list[int]) -> None:
+    print(f"{'linhas':>10} {'modo':>16} {'escritas':>9} {'tempo (ms)':>11}")
+    for quantidade in quantidades:
+        for nome, com_buffer in (("print por linha", False), ("com buffer", True)):
+            tempo, escritas = medir(quantidade, com_buffer)
+            print(f"{quantidade:>10} {nome:>16} {escritas:>9} {tempo * 1000:>11.1f}")
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [1_000, 50_000])
@@ -0,0 +1,93 @@
+"""Benchmark do "ver tudo": texto montado inteiro contra texto em blocos.
+
+Para cada quantidade de tarefas, mede quanto tempo leva até o primeiro
+byte chegar à saída, o tempo total e o pico de memória usada para montar
+o texto (com `tracemalloc`), escrevendo em uma saída que descarta tudo.
+O texto de cada tarefa é gerado de novo a cada rodada, como na primeira
+vez que ela é mostrada.
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/visualizacao.py [quantidade de tarefas ...]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from classes.lista import ListaDeTarefas
+from classes.tarefa import Tarefa
+from comandos.manipulacao_de_dados import dados
+import comandos.visualizacao as visualizacao
+
+TAREFAS_POR_LISTA: int = 1000
+
+
+class Saida(io.TextIOBase):
+    """Descarta o texto, anotando quando chegou a primeira escrita."""
+
+    def __init__(self) -> None:
+        self.primeira: float | None = None
+
+    def write(self, texto: str) -> int:
+        if self.primeira is None and texto.strip():
+            self.primeira = time.perf_counter()
+        return len(texto)
+
+
+def gerar_listas(quantidade: int) -> list[ListaDeTarefas]:
+    listas: list[ListaDeTarefas] = []
+    for i in range(quantidade):
+        if i % TAREFAS_POR_LISTA == 0:
+            listas.append(ListaDeTarefas(f"Lista {len(listas)}"))
+        listas[-1].adicionar_tarefa(Tarefa(
+            titulo=f"Tarefa {i}",
+            lista_associada=listas[-1].id,
+            nota="uma nota de tamanho médio, como as de verdade",
+            tags=["casa", f"tag{i % 50}"],
+            prioridade=i % 4,
+            id=i,
+        ))
+    return listas
+
+
+def ver_tudo_montado() -> None:
+    """Como o "ver tudo" fazia: o texto de todas as listas de uma vez."""
+    print()
+    print("\n\n".join(str(lista) for lista in dados.listas))
+
+
+def medir(mostrar, *args) -> tuple[float, float, float]:
+    for lista in dados.listas:
+        for tarefa in lista.tarefas:
+            tarefa._texto = None # o texto guardado não vale entre as rodadas
+    saida = Saida()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(saida):
+        mostrar(*args)
+    total: float = time.perf_counter() - inicio
+    pico: int = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return saida.primeira - inicio, total, pico / 2**20
+
+
+def main(quantidades: list[int]) -> None:
+    print(f"{'tarefas':>10} {'modo':>22} {'1º byte (ms)':>13} {'total (ms)':>11} {'pico (MiB)':>11}")
+    for quantidade in quantidades:
+        dados._listas = gerar_listas(quantidade)
+        dados._registro = None
+        for nome, mostrar, args in (("montado", ver_tudo_montado, ()),
+                                    ("em blocos", visualizacao.ver_tudo, ()),
+                                    ("--pagina 10 --limite 50", visualizacao.ver_tudo,
+                                     ("--pagina", "10", "--limite", "50"))):
+            primeiro, total, pico = medir(mostrar, *args)
+            print(f"{quantidade:>10} {nome:>22} {primeiro * 1000:>13.1f} {total * 1000:>11.1f} {pico:>11.1f}")
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
@@ -0,0 +1,46 @@
+"""Cache dos resultados das buscas.
+
+Guarda os IDs encontrados pelas buscas mais recentes (LRU), junto com a
+geração dos dados em que foram calculados: qualquer mudança nos dados
+incrementa a geração e torna velhos todos os resultados guardados. Buscas
+com datas relativas ("HOJE", "7 DIAS") valem só no dia em que foram feitas.
+"""
+
+from collections import OrderedDict
+from datetime import date
+from typing import Hashable
+
+
+class CacheDeBuscas:
+    """Cache LRU de chave da busca -> IDs das tarefas encontradas."""
+
+    def __init__(self, capacidade: int = 64) -> None:
+        self.capacidade = capacidade
+        # chave -> (geração, dia em que expira ou None, ids)
+        self.entradas: OrderedDict[Hashable, tuple[int, date | None, list[int]]] = OrderedDict()
+        self.acertos: int = 0
+        self.falhas: int = 0
+
+    def obter(self, chave: Hashable, geracao: int) -> list[int] | None:
+        """IDs guardados para a busca, ou None se não há um resultado válido."""
+        entrada = self.entradas.get(chave)
+        if entrada is not None:
+            geracao_salva, dia, ids = entrada
+            if geracao_salva == geracao and (dia is None or dia == date.today()):
+                self.entradas.move_to_end(chave)
+                self.acertos += 1
+                return ids
+            del self.entradas[chave]
+        self.falhas += 1
+        return None
+
+    def guardar(self, chave: Hashable, geracao: int, ids: list[int],
+                relativa: bool = False) -> None:
+        """Guarda o resultado de uma busca; se `relativa`, só até o fim do dia."""
+        self.entradas[chave] = (geracao, date.today() if relativa else None, ids)
+        self.entradas.move_to_end(chave)
+        if len(self.entradas) > self.capacidade:
+            self.entradas.popitem(last=False)
+
+    def limpar(self) -> None:
+        self.entradas.clear()
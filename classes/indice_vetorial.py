@@ -0,0 +1,135 @@
+"""Colunas NumPy com os campos numéricos das tarefas, para buscas vetoriais.
+
+Com NumPy instalado, os filtros de lista, conclusão e data viram operações
+sobre arrays inteiros (máscaras booleanas), e a ordenação dos resultados
+vira um `lexsort`, em vez de uma função Python chamada para cada tarefa.
+Sem NumPy, `DISPONIVEL` é False e a busca usa apenas os filtros comuns.
+O NumPy é uma dependência opcional (veja requirements.txt), e só é
+importado quando o primeiro `IndiceVetorial` é criado, para não pesar no
+início do programa.
+
+Cada tarefa ocupa uma linha. Uma tarefa removida só tem a linha marcada
+como inválida; as novas tarefas são escritas no fim, e os arrays dobram
+de tamanho quando enchem.
+"""
+
+from datetime import date
+from importlib.util import find_spec
+from typing import Callable, Iterable
+from classes.indices import Indice
+from classes.tarefa import Tarefa
+
+DISPONIVEL: bool = find_spec("numpy") is not None
+np = None # o módulo numpy, depois do primeiro `IndiceVetorial`
+
+# Ordinal usado no lugar de "sem data" ao ordenar, depois de qualquer data
+SEM_DATA: int = date.max.toordinal() + 1
+
+
+class IndiceVetorial(Indice):
+    """Colunas de ids, listas, prioridades, repetições, conclusão e datas."""
+
+    COLUNAS: dict[str, str] = {
+        "ids": "int64",
+        "listas": "int64",
+        "prioridades": "int8",
+        "repeticoes": "int8",
+        "concluidas": "bool",
+        "datas": "int32", # ordinal da data; 0 = sem data
+        "validas": "bool",
+    }
+
+    def __init__(self) -> None:
+        global np
+        if np is None:
+            import numpy as np
+        self.tamanho: int = 0 # linhas usadas
+        self.linhas: dict[int, int] = {} # id -> linha
+        self.tarefas: list[Tarefa | None] = [] # linha -> tarefa
+        for nome, tipo in self.COLUNAS.items():
+            setattr(self, nome, np.zeros(0, dtype=tipo))
+
+    def construir(self, tarefas: Iterable[Tarefa]) -> None:
+        self.tarefas = list(tarefas)
+        self.tamanho = len(self.tarefas)
+        self.linhas = {tarefa.id: linha for linha, tarefa in enumerate(self.tarefas)}
+        for nome, campo in (("ids", "id"), ("listas", "lista_associada"),
+                            ("prioridades", "prioridade"), ("repeticoes", "repeticao"),
+                            ("concluidas", "concluida")):
+            setattr(self, nome, np.fromiter((getattr(t, campo) for t in self.tarefas),
+                                            dtype=self.COLUNAS[nome], count=self.tamanho))
+        self.datas = np.fromiter((t.data.toordinal() if t.data else 0 for t in self.tarefas),
+                                 dtype="int32", count=self.tamanho)
+        self.validas = np.ones(self.tamanho, dtype=bool)
+
+    def _escrever(self, linha: int, tarefa: Tarefa) -> None:
+        self.ids[linha] = tarefa.id
+        self.listas[linha] = tarefa.lista_associada
+        self.prioridades[linha] = tarefa.prioridade
+        self.repeticoes[linha] = tarefa.repeticao
+        self.concluidas[linha] = tarefa.concluida
+        self.datas[linha] = tarefa.data.toordinal() if tarefa.data else 0
+        self.validas[linha] = True
+
+    def adicionar(self, tarefa: Tarefa) -> None:
+        if self.tamanho == len(self.ids):
+            capacidade: int = max(16, 2 * self.tamanho)
+            for nome in self.COLUNAS:
+                coluna = getattr(self, nome)
+                nova = np.zeros(capacidade, dtype=coluna.dtype)
+                nova[:self.tamanho] = coluna[:self.tamanho]
+                setattr(self, nome, nova)
+        linha: int = self.tamanho
+        self.tamanho += 1
+        self.linhas[tarefa.id] = linha
+        self.tarefas.append(tarefa)
+        self._escrever(linha, tarefa)
+
+    def remover(self, tarefa: Tarefa) -> None:
+        linha: int | None = self.linhas.pop(tarefa.id, None)
+        if linha is not None:
+            self.validas[linha] = False
+            self.tarefas[linha] = None
+
+    def atualizar(self, tarefa: Tarefa) -> None:
+        linha: int | None = self.linhas.get(tarefa.id)
+        if linha is None:
+            self.adicionar(tarefa)
+        else:
+            self._escrever(linha, tarefa)
+
+    def coluna(self, nome: str):
+        """A coluna `nome`, só com as linhas usadas."""
+        return getattr(self, nome)[:self.tamanho]
+
+    def selecionar(self, mascaras: list[Callable]):
+        """Linhas das tarefas que passam em todas as `mascaras` (funções que
+        recebem este índice e retornam um array booleano com uma posição
+        por linha)."""
+        mascara = self.coluna("validas").copy()
+        for gerar_mascara in mascaras:
+            mascara &= gerar_mascara(self)
+        return np.flatnonzero(mascara)
+
+    def linhas_de(self, tarefas: list[Tarefa]):
+        return np.fromiter((self.linhas[tarefa.id] for tarefa in tarefas),
+                           dtype="int64", count=len(tarefas))
+
+    def tarefas_de(self, linhas) -> list[Tarefa]:
+        tarefas: list[Tarefa | None] = self.tarefas
+        return [tarefas[linha] for linha in linhas.tolist()]
+
+    def ordenar(self, linhas, ordem: str):
+        """`linhas` ordenadas pela mesma chave que a busca usa para `ordem`
+        ("data" ou "prioridade"), com o ID desempatando."""
+        datas = self.coluna("datas")[linhas]
+        datas = np.where(datas == 0, SEM_DATA, datas)
+        prioridades = -self.coluna("prioridades")[linhas].astype("int16")
+        listas = self.coluna("listas")[linhas]
+        ids = self.coluna("ids")[linhas]
+        if ordem == "prioridade":
+            chaves = (ids, listas, datas, prioridades)
+        else:
+            chaves = (ids, listas, prioridades, datas)
+        # lexsort usa a última chave como a principal
+        return linhas[np.lexsort(chaves)]
@@ -0,0 +1,385 @@
+"""Índices de busca sobre as tarefas.
+
+Cada índice é criado pelo `RegistroDeIds` na primeira busca que precisa
+dele e, a partir daí, é atualizado a cada tarefa adicionada, editada ou
+removida. Para conseguir desfazer uma entrada depois que a tarefa já
+mudou, cada índice guarda a chave que usou para cada tarefa.
+"""
+
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+from typing import Callable, Iterable
+import math
+import re
+import unicodedata
+from classes.recorrencia import e_serie, inicio_da_serie, ocorrencias
+from classes.tarefa import Tarefa
+
+
+class Indice(ABC):
+    """Classe base dos índices mantidos pelo `RegistroDeIds`.
+
+    Cada índice precisa saber adicionar e remover uma tarefa; construir e
+    atualizar são feitos a partir dessas duas, a menos que o índice saiba
+    fazer melhor.
+    """
+
+    def construir(self, tarefas: Iterable[Tarefa]) -> None:
+        """Indexa de uma vez as tarefas existentes, ao criar o índice."""
+        for tarefa in tarefas:
+            self.adicionar(tarefa)
+
+    @abstractmethod
+    def adicionar(self, tarefa: Tarefa) -> None:
+        pass
+
+    @abstractmethod
+    def remover(self, tarefa: Tarefa) -> None:
+        pass
+
+    def atualizar(self, tarefa: Tarefa) -> None:
+        """Chamada depois que algum campo da tarefa mudou."""
+        self.remover(tarefa)
+        self.adicionar(tarefa)
+
+
+def trigramas(texto: str) -> set[str]:
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class IndiceDeTexto(Indice):
+    """Índice invertido de trigramas do título, da nota e das tags.
+
+    Uma busca intersecta os IDs de cada trigrama da consulta (do menor
+    conjunto para o maior) e confere os candidatos no texto de verdade.
+    """
+
+    def __init__(self) -> None:
+        self.textos: dict[int, str] = {} # id -> texto normalizado da tarefa
+        self.postagens: dict[str, set[int]] = {} # trigrama -> ids
+
+    @staticmethod
+    def normalizar(tarefa: Tarefa) -> str:
+        # O separador impede que um trecho junte dois campos diferentes
+        return "\0".join((tarefa.titulo, tarefa.nota, *tarefa.tags)).lower()
+
+    def adicionar(self, tarefa: Tarefa) -> None:
+        texto: str = self.normalizar(tarefa)
+        self.textos[tarefa.id] = texto
+        for trigrama in trigramas(texto):
+            self.postagens.setdefault(trigrama, set()).add(tarefa.id)
+
+    def remover(self, tarefa: Tarefa) -> None:
+        texto: str | None = self.textos.pop(tarefa.id, None)
+        if texto is None:
+            return
+        for trigrama in trigramas(texto):
+            ids = self.postagens[trigrama]
+            ids.discard(tarefa.id)
+            if not ids:
+                del self.postagens[trigrama]
+
+    def atualizar(self, tarefa: Tarefa) -> None:
+        if self.textos.get(tarefa.id) != self.normalizar(tarefa):
+            super().atualizar(tarefa)
+
+    def buscar(self, consulta: str) -> list[int]:
+        """IDs das tarefas cujo título, nota ou alguma tag contém `consulta`."""
+        consulta = consulta.lower()
+        if len(consulta) < 3:
+            # Curta demais para ter trigramas: confere todos os textos
+            candidatos = self.textos
+        else:
+            conjuntos = sorted((self.postagens.get(t, set()) for t in trigramas(consulta)), key=len)
+            if not conjuntos[0]:
+                return []
+            candidatos = conjuntos[0].intersection(*conjuntos[1:])
+        return [id_tarefa for id_tarefa in candidatos if consulta in self.textos[id_tarefa]]
+
+    def estimar(self, consulta: str) -> int:
+        """Limite superior para o número de resultados de `buscar`."""
+        consulta = consulta.lower()
+        if len(consulta) < 3:
+            return len(self.textos)
+        return min(len(self.postagens.get(t, ())) for t in trigramas(consulta))
+
+
+class IndiceDeTags(Indice):
+    """Índice invertido tag -> IDs das tarefas, com a contagem de cada
+    tag por lista mantida junto."""
+
+    def __init__(self) -> None:
+        self.postagens: dict[str, set[int]] = {}
+        self.chaves: dict[int, tuple[int, frozenset[str]]] = {} # id -> (lista, tags)
+        self.contagens: dict[int, dict[str, int]] = {} # lista -> tag -> nº de tarefas
+
+    def adicionar(self, tarefa: Tarefa) -> None:
+        self.chaves[tarefa.id] = (tarefa.lista_associada, tarefa.tags)
+        contagem = self.contagens.setdefault(tarefa.lista_associada, {})
+        for tag in tarefa.tags:
+            self.postagens.setdefault(tag, set()).add(tarefa.id)
+            contagem[tag] = contagem.get(tag, 0) + 1
+
+    def remover(self, tarefa: Tarefa) -> None:
+        chave = self.chaves.pop(tarefa.id, None)
+        if chave is None:
+            return
+        lista, tags = chave
+        contagem = self.contagens[lista]
+        for tag in tags:
+            ids = self.postagens[tag]
+            ids.discard(tarefa.id)
+            if not ids:
+                del self.postagens[tag]
+            contagem[tag] -= 1
+            if not contagem[tag]:
+                del contagem[tag]
+
+    def atualizar(self, tarefa: Tarefa) -> None:
+        if self.chaves.get(tarefa.id) != (tarefa.lista_associada, tarefa.tags):
+            super().atualizar(tarefa)
+
+    def buscar(self, tags: list[str]) -> set[int]:
+        """IDs das tarefas que têm todas as `tags`."""
+        conjuntos = sorted((self.postagens.get(tag, set()) for tag in tags), key=len)
+        if not conjuntos:
+            return set(self.chaves)
+        return conjuntos[0].intersection(*conjuntos[1:])
+
+    def estimar(self, tags: list[str]) -> int:
+        """Limite superior para o número de resultados de `buscar`."""
+        return min((len(self.postagens.get(tag, ())) for tag in tags), default=len(self.chaves))
+
+    def contagem_por_lista(self, id_lista: int) -> dict[str, int]:
+        """Quantas tarefas da lista têm cada tag."""
+        return dict(self.contagens.get(id_lista, {}))
+
+
+class IndiceDeDatas(Indice):
+    """Índice ordenado de (ordinal da data, id) para buscas por prazo.
+
+    Tarefas sem data ficam de fora da ordenação, em um conjunto à parte.
+    """
+
+    def __init__(self) -> None:
+        self.entradas: list[tuple[int, int]] = [] # (ordinal, id), em ordem
+        self.chaves: dict[int, int | None] = {} # id -> ordinal (None = sem data)
+        self.sem_data: set[int] = set()
+
+    def construir(self, tarefas: Iterable[Tarefa]) -> None:
+        for tarefa in tarefas:
+            ordinal = tarefa.data.toordinal() if tarefa.data else None
+            self.chaves[tarefa.id] = ordinal
+            if ordinal is None:
+                self.sem_data.add(tarefa.id)
+            else:
+                self.entradas.append((ordinal, tarefa.id))
+        self.entradas.sort()
+
+    def adicionar(self, tarefa: Tarefa) -> None:
+        ordinal = tarefa.data.toordinal() if tarefa.data else None
+        self.chaves[tarefa.id] = ordinal
+        if ordinal is None:
+            self.sem_data.add(tarefa.id)
+        else:
+            insort(self.entradas, (ordinal, tarefa.id))
+
+    def remover(self, tarefa: Tarefa) -> None:
+        if tarefa.id not in self.chaves:
+            return
+        ordinal = self.chaves.pop(tarefa.id)
+        if ordinal is None:
+            self.sem_data.discard(tarefa.id)
+        else:
+            del self.entradas[bisect_left(self.entradas, (ordinal, tarefa.id))]
+
+    def atualizar(self, tarefa: Tarefa) -> None:
+        if self.chaves.get(tarefa.id) != (tarefa.data.toordinal() if tarefa.data else None):
+            super().atualizar(tarefa)
+
+    def _limites(self, inicio: date | None, fim: date) -> tuple[int, int]:
+        i = bisect_left(self.entradas, (inicio.toordinal(),)) if inicio else 0
+        j = bisect_right(self.entradas, (fim.toordinal(), float("inf")))
+        return i, max(i, j)
+
+    def entre(self, inicio: date | None, fim: date) -> list[int]:
+        """IDs das tarefas com data de `inicio` (ou desde sempre) até `fim`,
+        inclusive, em ordem de data. Tarefas sem data não entram."""
+        i, j = self._limites(inicio, fim)
+        return [id_tarefa for _, id_tarefa in self.entradas[i:j]]
+
+    def contar(self, inicio: date | None, fim: date) -> int:
+        """Quantas tarefas `entre` retornaria, sem montar a lista."""
+        i, j = self._limites(inicio, fim)
+        return j - i
+
+
+class IndiceDeSeries(Indice):
+    """Regras das séries (tarefas repetíveis pendentes e com data).
+
+    Complementa o `IndiceDeDatas`, que só conhece a ocorrência pendente de
+    cada série: as seguintes são calculadas a partir da regra.
+    """
+
+    def __init__(self) -> None:
+        self.series: dict[int, tuple[date, int, date]] = {} # id -> (início, repetição, pendente)
+
+    def adicionar(self, tarefa: Tarefa) -> None:
+        if e_serie(tarefa):
+            self.series[tarefa.id] = (inicio_da_serie(tarefa), tarefa.repeticao, tarefa.data)
+
+    def remover(self, tarefa: Tarefa) -> None:
+        self.series.pop(tarefa.id, None)
+
+    def entre(self, inicio: date, fim: date) -> list[int]:
+        """IDs das séries com a ocorrência pendente antes de `inicio` e
+        alguma das seguintes de `inicio` até `fim` (as que o `IndiceDeDatas`
+        não encontra nesse intervalo)."""
+        return [id_tarefa for id_tarefa, (inicio_serie, repeticao, pendente) in self.series.items()
+                if pendente < inicio
+                and next(ocorrencias(inicio_serie, repeticao, inicio, fim), None) is not None]
+
+
+class IndiceDeConclusao(Indice):
+    """IDs das tarefas concluídas e das pendentes."""
+
+    def __init__(self) -> None:
+        self.ids: dict[bool, set[int]] = {True: set(), False: set()}
+
+    def adicionar(self, tarefa: Tarefa) -> None:
+        self.ids[bool(tarefa.concluida)].add(tarefa.id)
+
+    def remover(self, tarefa: Tarefa) -> None:
+        self.ids[True].discard(tarefa.id)
+        self.ids[False].discard(tarefa.id)
+
+    def atualizar(self, tarefa: Tarefa) -> None:
+        if tarefa.id not in self.ids[bool(tarefa.concluida)]:
+            super().atualizar(tarefa)
+
+    def buscar(self, concluida: bool) -> set[int]:
+        return self.ids[concluida]
+
+
+def dobrar_acentos(texto: str) -> str:
+    """Texto em minúsculas e sem acentos ("Reunião" -> "reuniao")."""
+    decomposto: str = unicodedata.normalize("NFKD", texto.lower())
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+
+def termos(texto: str) -> list[str]:
+    """Palavras do texto, sem acentos e em minúsculas."""
+    return re.findall(r"\w+", dobrar_acentos(texto))
+
+
+class IndiceDeTermos(Indice):
+    """Índice invertido de palavras para a busca por relevância (BM25).
+
+    Cada ocorrência de uma palavra conta com o peso do campo onde aparece
+    (o título vale mais que as tags, que valem mais que a nota), e o
+    tamanho de cada tarefa é a soma dos pesos das suas palavras.
+    """
+
+    PESOS: dict[str, float] = {"titulo": 3.0, "tags": 2.0, "nota": 1.0}
+    K1: float = 1.2
+    B: float = 0.75
+
+    def __init__(self) -> None:
+        self.postagens: dict[str, dict[int, float]] = {} # termo -> id -> frequência com pesos
+        self.tamanhos: dict[int, float] = {} # id -> tamanho com pesos
+        self.chaves: dict[int, tuple[str, ...]] = {} # id -> termos da tarefa
+        self.tamanho_total: float = 0.0
+
+    def frequencias(self, tarefa: Tarefa) -> dict[str, float]:
+        frequencias: dict[str, float] = {}
+        for campo, peso in self.PESOS.items():
+            valor = tarefa.tags if campo == "tags" else (getattr(tarefa, campo),)
+            for texto in valor:
+                for termo in termos(texto):
+                    frequencias[termo] = frequencias.get(termo, 0.0) + peso
+        return frequencias
+
+    def adicionar(self, tarefa: Tarefa) -> None:
+        frequencias = self.frequencias(tarefa)
+        for termo, frequencia in frequencias.items():
+            self.postagens.setdefault(termo, {})[tarefa.id] = frequencia
+        tamanho: float = sum(frequencias.values())
+        self.chaves[tarefa.id] = tuple(frequencias)
+        self.tamanhos[tarefa.id] = tamanho
+        self.tamanho_total += tamanho
+
+    def remover(self, tarefa: Tarefa) -> None:
+        tamanho: float | None = self.tamanhos.pop(tarefa.id, None)
+        if tamanho is None:
+            return
+        self.tamanho_total -= tamanho
+        for termo in self.chaves.pop(tarefa.id):
+            ids = self.postagens[termo]
+            del ids[tarefa.id]
+            if not ids:
+                del self.postagens[termo]
+
+    def pontuar(self, consulta: str) -> dict[int, float]:
+        """Pontuação BM25 de cada tarefa que contém algum termo da consulta."""
+        quantidade: int = len(self.tamanhos)
+        if not quantidade:
+            return {}
+        media: float = self.tamanho_total / quantidade or 1.0
+        pontuacoes: dict[int, float] = {}
+        for termo in set(termos(consulta)):
+            ids = self.postagens.get(termo)
+            if not ids:
+                continue
+            idf: float = math.log(1 + (quantidade - len(ids) + 0.5) / (len(ids) + 0.5))
+            for id_tarefa, frequencia in ids.items():
+                normalizacao = self.K1 * (1 - self.B + self.B * self.tamanhos[id_tarefa] / media)
+                pontuacoes[id_tarefa] = (pontuacoes.get(id_tarefa, 0.0)
+                                         + idf * frequencia * (self.K1 + 1) / (frequencia + normalizacao))
+        return pontuacoes
+
+
+class BuscaSalva:
+    """Resultado materializado de uma busca salva."""
+
+    def __init__(self, testes: list[Callable[[Tarefa], bool]], ids: set[int],
+                 dia: date | None = None) -> None:
+        self.testes = testes # uma tarefa está no resultado se passa em todos
+        self.ids = ids
+        self.dia = dia # dia em que os testes foram gerados, se dependem dele
+
+
+class IndiceDeBuscasSalvas(Indice):
+    """IDs das tarefas que passam em cada busca salva, pelo nome da busca.
+
+    O resultado de cada busca é calculado uma única vez (veja `materializar`);
+    a partir daí, só a tarefa que mudou é testada contra cada busca salva.
+    """
+
+    def __init__(self) -> None:
+        self.buscas: dict[str, BuscaSalva] = {}
+
+    def construir(self, tarefas: Iterable[Tarefa]) -> None:
+        pass # as buscas são materializadas uma a uma, quando usadas
+
+    def materializar(self, nome: str, busca: BuscaSalva) -> None:
+        self.buscas[nome] = busca
+
+    def descartar(self, nome: str) -> None:
+        self.buscas.pop(nome, None)
+
+    def adicionar(self, tarefa: Tarefa) -> None:
+        for busca in self.buscas.values():
+            if all(teste(tarefa) for teste in busca.testes):
+                busca.ids.add(tarefa.id)
+
+    def remover(self, tarefa: Tarefa) -> None:
+        for busca in self.buscas.values():
+            busca.ids.discard(tarefa.id)
+
+    def atualizar(self, tarefa: Tarefa) -> None:
+        for busca in self.buscas.values():
+            if all(teste(tarefa) for teste in busca.testes):
+                busca.ids.add(tarefa.id)
+            else:
+                busca.ids.discard(tarefa.id)
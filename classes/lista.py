@@ -1,25 +1,112 @@
+from typing import Callable, Iterable, Iterator, ValuesView
 from classes.tarefa import Tarefa
 
 class ListaDeTarefas:
     id_count: int = 0
-    
-    def __init__(self, titulo: str) -> None:
+
+    def __init__(self, titulo: str, carregar_tarefas: Callable | None = None) -> None:
         self.id = ListaDeTarefas.id_count
         ListaDeTarefas.id_count += 1
         self.titulo = titulo
-        self.tarefas = []
-    
+        # Se as tarefas mudaram desde a última vez que a lista foi salva
+        self.modificada: bool = False
+        # Com `carregar_tarefas`, as tarefas só são lidas no primeiro acesso
+        self._carregar_tarefas = carregar_tarefas
+        # id -> tarefa, na ordem em que foram adicionadas
+        self._tarefas: dict[int, Tarefa] | None = None if carregar_tarefas else {}
+
+    def restaurar_id(self, id: int) -> None:
+        """Usa o ID salvo da lista, sem que novas listas possam repeti-lo."""
+        self.id = id
+        ListaDeTarefas.id_count = max(ListaDeTarefas.id_count, id + 1)
+
+    def _por_id(self) -> dict[int, Tarefa]:
+        if self._tarefas is None:
+            self.tarefas = self._carregar_tarefas(self)
+        return self._tarefas
+
+    @property
+    def tarefas(self) -> ValuesView[Tarefa]:
+        return self._por_id().values()
+
+    @tarefas.setter
+    def tarefas(self, tarefas: Iterable[Tarefa]) -> None:
+        self._tarefas = {}
+        self._carregar_tarefas = None
+        for tarefa in tarefas:
+            self._guardar(tarefa)
+
+    @property
+    def carregada(self) -> bool:
+        """Se as tarefas da lista já estão na memória."""
+        return self._tarefas is not None
+
+    @property
+    def titulo(self) -> str:
+        return self._titulo
+
+    @titulo.setter
+    def titulo(self, titulo: str) -> None:
+        self._titulo = titulo
+        self._cabecalho: str = f"===== Lista: {titulo} =====\n\n"
+
     def __str__(self) -> None:
-        header: str = f"===== Lista: {self.titulo} =====\n\n"
-        if not self.tarefas:
-            return header + "  Não há tarefas nesta lista."
-        lines: str = "\n\n".join(f"{tarefa}" for tarefa in self.tarefas)
-        return header + lines + "\n"
+        return "".join(self.trechos())
+
+    def trechos(self, tarefas: Iterable[Tarefa] | None = None,
+                guardar: bool = True) -> Iterator[str]:
+        """Gera o texto da lista aos poucos, sem montá-lo inteiro na memória.
+
+        Com `tarefas`, mostra só essas (por exemplo, uma página da lista).
+        `guardar` é repassado a `Tarefa.texto`.
+        """
+        yield self._cabecalho
+        if tarefas is None:
+            if not self.tarefas:
+                yield "  Não há tarefas nesta lista."
+                return
+            tarefas = self.tarefas
+        for i, tarefa in enumerate(tarefas):
+            if i:
+                yield "\n\n"
+            yield tarefa.texto(guardar)
+        yield "\n"
+
+    def _guardar(self, tarefa: Tarefa) -> None:
+        # Um ID repetido (dados antigos) não pode sobrescrever outra tarefa
+        if tarefa.id in self._tarefas:
+            tarefa.id = Tarefa.id_count
+            Tarefa.id_count += 1
+            tarefa.esquecer_texto()
+        self._tarefas[tarefa.id] = tarefa
+
+    def tarefa(self, id_tarefa: int) -> Tarefa | None:
+        return self._por_id().get(id_tarefa)
 
     def adicionar_tarefa(self, tarefa: Tarefa) -> None:
-        self.tarefas.append(tarefa)
+        if tarefa.lista_associada != self.id:
+            # A tarefa veio de outra lista
+            tarefa.lista_associada = self.id
+            tarefa.esquecer_texto()
+        self._por_id()
+        self._guardar(tarefa)
+        self.modificada = True
+
+    def substituir_tarefa(self, tarefa: Tarefa) -> None:
+        """Coloca `tarefa` no lugar da tarefa com o mesmo ID, na mesma posição."""
+        if tarefa.lista_associada != self.id:
+            tarefa.lista_associada = self.id
+            tarefa.esquecer_texto()
+        self._por_id()[tarefa.id] = tarefa
+        self.modificada = True
 
     def remover_tarefa(self, id_tarefa: int):
-        for t in self.tarefas:
-            if t.id == id_tarefa:
-                self.tarefas.remove(t)
\ No newline at end of file
+        if self._por_id().pop(id_tarefa, None) is not None:
+            self.modificada = True
+
+    def trocar_id_da_tarefa(self, tarefa: Tarefa, novo_id: int) -> None:
+        """Muda o ID de uma tarefa da lista, mantendo a sua posição."""
+        self._tarefas = {(novo_id if t is tarefa else id_tarefa): t
+                         for id_tarefa, t in self._por_id().items()}
+        tarefa.id = novo_id
+        tarefa.esquecer_texto()
@@ -0,0 +1,122 @@
+"""Regras de repetição das tarefas.
+
+Uma tarefa repetível é uma série: uma regra (a data de início da série e o
+tipo de repetição) mais a data da próxima ocorrência pendente. Concluir a
+tarefa só avança essa data; as ocorrências seguintes nunca viram tarefas,
+e são calculadas sob demanda para um intervalo de datas (veja
+`ocorrencias`).
+
+A n-ésima ocorrência é calculada diretamente a partir do início da série,
+sem passar pelas anteriores. Repetições mensais e anuais seguem o
+calendário: uma série que começa em 31/01 cai em 28/02 (ou 29/02) e volta
+a cair em 31/03, e uma série anual de 29/02 cai em 28/02 nos anos que não
+são bissextos.
+"""
+
+from calendar import monthrange
+from datetime import date, timedelta
+from typing import Iterator
+from classes.tarefa import Repeticao, TarefaBase
+
+# Passo das repetições contadas em dias e das contadas em meses
+PASSO_EM_DIAS: dict[int, int] = {
+    Repeticao.DIARIA.value: 1,
+    Repeticao.SEMANAL.value: 7,
+}
+PASSO_EM_MESES: dict[int, int] = {
+    Repeticao.MENSAL.value: 1,
+    Repeticao.ANUAL.value: 12,
+}
+
+
+def ocorrencia(inicio: date, repeticao: int, n: int) -> date:
+    """A `n`-ésima ocorrência da série que começa em `inicio` (a 0 é o próprio início)."""
+    dias: int | None = PASSO_EM_DIAS.get(repeticao)
+    if dias is not None:
+        return inicio + timedelta(days=dias * n)
+    meses: int = inicio.month - 1 + PASSO_EM_MESES[repeticao] * n
+    ano: int = inicio.year + meses // 12
+    mes: int = meses % 12 + 1
+    return date(ano, mes, min(inicio.day, monthrange(ano, mes)[1]))
+
+
+def posicao(inicio: date, repeticao: int, dia: date) -> int:
+    """O número da primeira ocorrência da série em `dia` ou depois dele."""
+    if dia <= inicio:
+        return 0
+    dias: int | None = PASSO_EM_DIAS.get(repeticao)
+    if dias is not None:
+        return -(-(dia - inicio).days // dias)
+    # A ocorrência n cai no mesmo mês de `dia` ou antes dele, e a n + 1 depois
+    meses: int = (dia.year - inicio.year) * 12 + dia.month - inicio.month
+    n: int = meses // PASSO_EM_MESES[repeticao]
+    return n if ocorrencia(inicio, repeticao, n) >= dia else n + 1
+
+
+def ocorrencias(inicio: date, repeticao: int, de: date, ate: date) -> Iterator[date]:
+    """Gera, uma a uma, as ocorrências da série de `de` até `ate` (inclusive)."""
+    n: int = posicao(inicio, repeticao, de)
+    try:
+        while (dia := ocorrencia(inicio, repeticao, n)) <= ate:
+            yield dia
+            n += 1
+    except (OverflowError, ValueError):
+        return # passou do último ano que uma data aceita
+
+
+def e_serie(tarefa: TarefaBase) -> bool:
+    """Se a tarefa é uma série com ocorrências pendentes."""
+    return (tarefa.repeticao != Repeticao.NENHUMA.value
+            and tarefa.data is not None and not tarefa.concluida)
+
+
+def inicio_da_serie(tarefa: TarefaBase) -> date:
+    # Tarefas salvas antes das séries não têm início: a série começa na data pendente
+    return tarefa.inicio or tarefa.data
+
+
+def ocorrencias_da_tarefa(tarefa: TarefaBase, de: date | None, ate: date) -> Iterator[date]:
+    """As datas da tarefa de `de` (ou desde sempre) até `ate`: a data da
+    tarefa e, se ela é uma série, as ocorrências seguintes a ela."""
+    data: date | None = tarefa.data
+    if data is None or data > ate:
+        return
+    if not e_serie(tarefa):
+        if de is None or de <= data:
+            yield data
+        return
+    yield from ocorrencias(inicio_da_serie(tarefa), tarefa.repeticao,
+                           data if de is None else max(de, data), ate)
+
+
+def ocorre_entre(tarefa: TarefaBase, de: date | None, ate: date) -> bool:
+    return next(ocorrencias_da_tarefa(tarefa, de, ate), None) is not None
+
+
+def concluir_ate(inicio: date, repeticao: int, pendente: date, dia: date) -> tuple[date, int]:
+    """Conclui as ocorrências da série de `pendente` até `dia` de uma vez.
+
+    Retorna a nova ocorrência pendente (a primeira depois das duas datas)
+    e quantas ocorrências foram concluídas.
+    """
+    de: int = posicao(inicio, repeticao, pendente)
+    ate: int = posicao(inicio, repeticao, max(pendente, dia) + timedelta(days=1))
+    return ocorrencia(inicio, repeticao, ate), ate - de
+
+
+def avancar_serie(tarefa: TarefaBase, ate: date | None = None) -> int:
+    """Conclui a ocorrência pendente de uma tarefa repetível (ou, com `ate`,
+    todas as ocorrências até essa data), passando a data da tarefa para a
+    ocorrência seguinte.
+
+    Retorna quantas ocorrências foram concluídas.
+    """
+    pendente: date | None = tarefa.data
+    if pendente is None:
+        # Sem data, a série começa hoje, com a ocorrência concluída agora
+        pendente = date.today()
+        tarefa.inicio = pendente
+    elif tarefa.inicio is None:
+        tarefa.inicio = pendente
+    tarefa.data, concluidas = concluir_ate(tarefa.inicio, tarefa.repeticao, pendente, ate or pendente)
+    return concluidas
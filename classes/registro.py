@@ -0,0 +1,131 @@
+"""Registro global de IDs.
+
+Encontra listas e tarefas pelo ID em tempo constante, sem percorrer
+todas as listas. As tarefas só são indexadas na primeira busca por uma
+tarefa, e quando o armazenamento sabe em que lista ela está, só as
+tarefas dessa lista, para não carregar antes da hora as listas que são
+lidas sob demanda.
+
+O registro também mantém os índices de busca (veja `classes.indices`),
+criados na primeira vez que alguma busca precisa de cada um.
+"""
+
+from typing import Callable
+from classes.indices import Indice
+from classes.lista import ListaDeTarefas
+from classes.tarefa import Tarefa
+
+
+class RegistroDeIds:
+    """Índices id -> lista, id -> tarefa e id da tarefa -> lista que a contém.
+
+    Deve ser avisado de toda lista ou tarefa adicionada, editada ou
+    removida (mover uma tarefa é removê-la de uma lista e adicioná-la
+    em outra).
+
+    As tarefas são indexadas uma lista por vez: se `localizar` (id da
+    tarefa -> id da lista) souber onde está a tarefa procurada, só a
+    lista dela é indexada. Sem essa dica, ou quando algum índice de busca
+    precisa de todas as tarefas, todas as listas são indexadas.
+    """
+
+    def __init__(self, listas: list[ListaDeTarefas],
+                 ao_trocar_ids: Callable[[], None] | None = None,
+                 localizar: Callable[[int], int | None] | None = None) -> None:
+        self.listas: dict[int, ListaDeTarefas] = {l.id: l for l in listas}
+        self._tarefas: dict[int, Tarefa] = {}
+        self._donas: dict[int, ListaDeTarefas] = {}
+        self._indexadas: set[int] = set() # IDs das listas cujas tarefas já estão em `_tarefas`
+        # Chamada se algum ID repetido precisou ser trocado ao indexar as tarefas
+        self.ao_trocar_ids = ao_trocar_ids
+        self.localizar = localizar
+        self.indices: dict[type, Indice] = {}
+
+    def _indexar_lista(self, lista: ListaDeTarefas) -> bool:
+        """Indexa as tarefas de uma lista; retorna se algum ID foi trocado."""
+        self._indexadas.add(lista.id)
+        trocados: bool = False
+        for tarefa in list(lista.tarefas):
+            if tarefa.id in self._tarefas:
+                # Dados antigos podem ter o mesmo ID em listas diferentes
+                lista.trocar_id_da_tarefa(tarefa, Tarefa.id_count)
+                Tarefa.id_count += 1
+                trocados = True
+            self._tarefas[tarefa.id] = tarefa
+            self._donas[tarefa.id] = lista
+        return trocados
+
+    def _indexar(self, listas: list[ListaDeTarefas]) -> None:
+        trocados: bool = False
+        for lista in listas:
+            if lista.id not in self._indexadas:
+                trocados = self._indexar_lista(lista) or trocados
+        if trocados and self.ao_trocar_ids:
+            self.ao_trocar_ids()
+
+    def _indexar_tarefas(self) -> dict[int, Tarefa]:
+        if len(self._indexadas) < len(self.listas):
+            self._indexar(list(self.listas.values()))
+        return self._tarefas
+
+    def indice(self, tipo: type[Indice]) -> Indice:
+        """Retorna o índice do tipo dado, criando-o se ainda não existir."""
+        indice = self.indices.get(tipo)
+        if indice is None:
+            indice = tipo()
+            indice.construir(self._indexar_tarefas().values())
+            self.indices[tipo] = indice
+        return indice
+
+    def quantidade(self) -> int:
+        """Quantas tarefas existem, somando todas as listas."""
+        return len(self._indexar_tarefas())
+
+    def lista(self, id_lista: int) -> ListaDeTarefas | None:
+        return self.listas.get(id_lista)
+
+    def tarefa(self, id_tarefa: int) -> tuple[Tarefa, ListaDeTarefas] | tuple[None, None]:
+        tarefa = self._tarefas.get(id_tarefa)
+        if tarefa is None and self.localizar:
+            dona = self.listas.get(self.localizar(id_tarefa))
+            if dona is not None:
+                self._indexar([dona])
+                tarefa = self._tarefas.get(id_tarefa)
+        if tarefa is None:
+            # Sem dica (ou com uma dica desatualizada), procura em todas as listas
+            tarefa = self._indexar_tarefas().get(id_tarefa)
+        if tarefa is None:
+            return None, None
+        return tarefa, self._donas[id_tarefa]
+
+    def lista_adicionada(self, lista: ListaDeTarefas) -> None:
+        # Uma lista nova já tem as suas tarefas na memória
+        self.listas[lista.id] = lista
+        self._indexadas.add(lista.id)
+        for tarefa in lista.tarefas:
+            self.tarefa_adicionada(lista, tarefa)
+
+    def lista_removida(self, lista: ListaDeTarefas) -> None:
+        self.listas.pop(lista.id, None)
+        if lista.id in self._indexadas:
+            self._indexadas.discard(lista.id)
+            for tarefa in lista.tarefas:
+                self.tarefa_removida(tarefa)
+
+    def tarefa_adicionada(self, lista: ListaDeTarefas, tarefa: Tarefa) -> None:
+        # Uma lista ainda não indexada terá a tarefa quando for indexada
+        if lista.id in self._indexadas:
+            self._tarefas[tarefa.id] = tarefa
+            self._donas[tarefa.id] = lista
+            for indice in self.indices.values():
+                indice.adicionar(tarefa)
+
+    def tarefa_editada(self, tarefa: Tarefa) -> None:
+        for indice in self.indices.values():
+            indice.atualizar(tarefa)
+
+    def tarefa_removida(self, tarefa: Tarefa) -> None:
+        if self._tarefas.pop(tarefa.id, None) is not None:
+            self._donas.pop(tarefa.id, None)
+            for indice in self.indices.values():
+                indice.remover(tarefa)
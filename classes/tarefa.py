@@ -1,5 +1,8 @@
 from datetime import date
 from enum import Enum
+from functools import lru_cache
+import sys
+from typing import Iterable
 
 class Prioridade(Enum):
     NENHUMA = 0
@@ -16,65 +19,96 @@ class Repeticao(Enum):
     ANUAL = 4
 
 
-class Tarefa:
-    id_count: int = 0
+TEXTO_PRIORIDADE: dict[int, str] = {
+    Prioridade.NENHUMA.value: "Prioridade: nenhuma",
+    Prioridade.BAIXA.value: "Prioridade: baixa",
+    Prioridade.MEDIA.value: "Prioridade: média",
+    Prioridade.ALTA.value: "Prioridade: alta",
+}
 
-    def __init__(self,
-                titulo: str,
-                lista_associada: int,
-                nota: str = "",
-                data: date | None = None,
-                tags: set[str] = set(),
-                prioridade: int = 0,
-                repeticao: int = 0,
-                concluida: bool = False) -> None:
-        
-        self.id = Tarefa.id_count
-        Tarefa.id_count += 1
+TEXTO_REPETICAO: dict[int, str] = {
+    Repeticao.NENHUMA.value: "Sem repetição",
+    Repeticao.DIARIA.value: "Repetição: diária",
+    Repeticao.SEMANAL.value: "Repetição: semanal",
+    Repeticao.MENSAL.value: "Repetição: mensal",
+    Repeticao.ANUAL.value: "Repetição: anual",
+}
+
+
+# Conjuntos de tags já vistos, para que tarefas com as mesmas tags compartilhem um só objeto
+_conjuntos_de_tags: dict[frozenset[str], frozenset[str]] = {}
+
+def internar_tags(tags: Iterable[str] | None) -> frozenset[str]:
+    """ Retorna as tags como um conjunto imutável e compartilhado.
+
+    Os textos das tags são internados (`sys.intern`), e tarefas com as
+    mesmas tags recebem o mesmo conjunto.
+    """
+    conjunto = frozenset(map(sys.intern, tags or ()))
+    return _conjuntos_de_tags.setdefault(conjunto, conjunto)
+
+@lru_cache(maxsize=4096)
+def data_de_texto(texto: str) -> date:
+    """ Converte "DD/MM/AAAA" em data. Datas repetidas viram o mesmo objeto. """
+    dia, mes, ano = map(int, texto.split("/"))
+    return date(ano, mes, dia)
+
+def proximo_id(id_salvo: int | None = None) -> int:
+    """ ID para uma tarefa: o ID com que ela foi salva, se houver, ou um novo.
+
+    Novas tarefas nunca recebem um ID já salvo.
+    """
+    if id_salvo is None:
+        id_salvo = Tarefa.id_count
+    Tarefa.id_count = max(Tarefa.id_count, id_salvo + 1)
+    return id_salvo
+
+
+class TarefaBase:
+    """Comportamento comum às tarefas, independente de onde os campos ficam
+    guardados (em uma `Tarefa` ou em uma linha de um `TarefaStore`)."""
+
+    __slots__ = ()
 
-        self.titulo = titulo
-        self.nota = nota
-        self.data = data
-        self.tags = tags
-        self.lista_associada = lista_associada
-        self.prioridade = prioridade
-        self.repeticao = repeticao
-        self.concluida = concluida
-    
     def __str__(self) -> str:
+        return self.texto()
+
+    def texto(self, guardar: bool = True) -> str:
+        """O texto da tarefa, que fica guardado até `esquecer_texto`.
+
+        Com `guardar=False`, um texto já guardado é reaproveitado, mas um
+        texto novo não é guardado (para mostrar muitas tarefas de uma vez
+        sem manter o texto de todas na memória).
+        """
+        texto = self._texto
+        if texto is None:
+            texto = self._formatar()
+            if guardar:
+                self._texto = texto
+        return texto
+
+    def esquecer_texto(self) -> None:
+        """Descarta o texto guardado. Deve ser chamada sempre que algum
+        campo de uma tarefa já existente muda (veja `registrar_tarefa_editada`)."""
+        self._texto = None
+
+    def _formatar(self) -> str:
         lines: list[str] = [f"Tarefa: {self.titulo} | ID: {self.id}"]
         lines.append(f"Lista associada: {self.lista_associada}")
         lines.append(f"Nota: {self.nota}")
-        if self.data:
-            ano, mes, dia = map(int, str(self.data).split("-"))
-            lines.append(f"Data: {dia}/{mes}/{ano}")
+        data = self.data
+        if data:
+            lines.append(f"Data: {data.day}/{data.month}/{data.year}")
         else:
             lines.append("Data: ")
 
-        lines.append(f"Tags: {self.tags}")
-
-        match self.prioridade:
-            case Prioridade.NENHUMA.value:
-                lines.append(f"Prioridade: nenhuma")
-            case Prioridade.BAIXA.value:
-                lines.append(f"Prioridade: baixa")
-            case Prioridade.MEDIA.value:
-                lines.append(f"Prioridade: média")
-            case Prioridade.ALTA.value:
-                lines.append(f"Prioridade: alta")
-        
-        match self.repeticao:
-            case Repeticao.NENHUMA.value:
-                lines.append(f"Sem repetição")
-            case Repeticao.DIARIA.value:
-                lines.append(f"Repetição: diária")
-            case Repeticao.SEMANAL.value:
-                lines.append("Repetição: semanal")
-            case Repeticao.MENSAL.value:
-                lines.append("Repetição: mensal")
-            case Repeticao.ANUAL.value:
-                lines.append("Repetição: anual")
-        
+        lines.append(f"Tags: {set(self.tags)}")
+
+        if self.prioridade in TEXTO_PRIORIDADE:
+            lines.append(TEXTO_PRIORIDADE[self.prioridade])
+        if self.repeticao in TEXTO_REPETICAO:
+            lines.append(TEXTO_REPETICAO[self.repeticao])
+
         if self.concluida:
             lines.append("Concluída: sim ✓")
         else:
@@ -96,9 +130,73 @@ class Tarefa:
             "prioridade": self.prioridade,
             "repeticao": self.repeticao,
             "concluida": self.concluida,
-            "id": self.id
+            "id": self.id,
+            "inicio": self.inicio.strftime("%d/%m/%Y") if self.inicio else None,
         }
 
+
+class Tarefa(TarefaBase):
+    id_count: int = 0
+
+    # Sem __dict__ por tarefa: os campos ficam em posições fixas do objeto
+    __slots__ = ("id", "titulo", "nota", "data", "_tags", "lista_associada",
+                 "prioridade", "repeticao", "concluida", "inicio", "_texto")
+
+    def __init__(self,
+                titulo: str,
+                lista_associada: int,
+                nota: str = "",
+                data: date | None = None,
+                tags: Iterable[str] | None = None,
+                prioridade: int = 0,
+                repeticao: int = 0,
+                concluida: bool = False,
+                id: int | None = None,
+                inicio: date | None = None) -> None:
+        
+        self.id = proximo_id(id)
+
+        self.titulo = titulo
+        self.nota = nota
+        self.data = data
+        self._tags = internar_tags(tags)
+        self.lista_associada = lista_associada
+        self.prioridade = prioridade
+        self.repeticao = repeticao
+        self.concluida = concluida
+        # Início da série de uma tarefa repetível (veja `classes.recorrencia`)
+        self.inicio = inicio
+        # Texto guardado por __str__ (veja `TarefaBase.texto`)
+        self._texto = None
+
+    @property
+    def tags(self) -> frozenset[str]:
+        return self._tags
+
+    @tags.setter
+    def tags(self, tags: Iterable[str] | None) -> None:
+        self._tags = internar_tags(tags)
+
+    @classmethod
+    def de_dicio(cls, dicio: dict) -> "Tarefa":
+        """Cria uma tarefa a partir do dicionário gerado por `para_dicio`."""
+        data_str = dicio.get("data")
+        data_obj = data_de_texto(data_str) if data_str else None
+        inicio_str = dicio.get("inicio")
+
+        return cls(
+            titulo=dicio["titulo"],
+            lista_associada=dicio["lista_associada"],
+            nota=dicio["nota"],
+            data=data_obj,
+            tags=dicio["tags"],
+            prioridade=dicio["prioridade"],
+            repeticao=dicio["repeticao"],
+            concluida=dicio["concluida"],
+            id=dicio.get("id"),
+            inicio=data_de_texto(inicio_str) if inicio_str else None,
+        )
+
 if __name__ == "__main__":
     print(Tarefa.id_count)
     the = Tarefa(*([None] * 8))
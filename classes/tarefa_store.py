@@ -0,0 +1,101 @@
+"""Armazenamento colunar de tarefas.
+
+Em vez de um objeto com todos os campos para cada tarefa, o `TarefaStore`
+guarda cada campo em uma coluna: os números em `array`s compactos (a data
+como ordinal, com 0 para "sem data") e os textos e as tags em listas.
+Cada tarefa é acessada por uma `VisaoDeTarefa`, um objeto pequeno que só
+sabe o número da sua linha e se comporta como uma `Tarefa`.
+
+As linhas não são apagadas quando uma tarefa é removida; o espaço é
+recuperado na próxima vez que os dados forem carregados.
+"""
+
+from array import array
+from datetime import date
+from typing import Iterable
+from classes.tarefa import TarefaBase, internar_tags, proximo_id
+
+
+class TarefaStore:
+    """Colunas com os campos de muitas tarefas."""
+
+    def __init__(self) -> None:
+        self.ids = array("q")
+        self.titulos: list[str] = []
+        self.notas: list[str] = []
+        self.datas = array("i") # ordinal da data; 0 = sem data
+        self.tags: list[frozenset[str]] = []
+        self.listas = array("i")
+        self.prioridades = array("b")
+        self.repeticoes = array("b")
+        self.concluidas = array("b")
+        self.inicios = array("i") # ordinal do início da série; 0 = sem início
+        self.textos: list[str | None] = [] # texto de cada tarefa guardado por __str__
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def adicionar(self,
+                  titulo: str,
+                  lista_associada: int,
+                  nota: str = "",
+                  data: date | None = None,
+                  tags: Iterable[str] | None = None,
+                  prioridade: int = 0,
+                  repeticao: int = 0,
+                  concluida: bool = False,
+                  id: int | None = None,
+                  inicio: date | None = None) -> "VisaoDeTarefa":
+        """Adiciona uma tarefa (com os mesmos argumentos de `Tarefa`) e retorna a sua visão."""
+        self.ids.append(proximo_id(id))
+        self.titulos.append(titulo)
+        self.notas.append(nota)
+        self.datas.append(data.toordinal() if data else 0)
+        self.tags.append(internar_tags(tags))
+        self.listas.append(lista_associada)
+        self.prioridades.append(prioridade)
+        self.repeticoes.append(repeticao)
+        self.concluidas.append(concluida)
+        self.inicios.append(inicio.toordinal() if inicio else 0)
+        self.textos.append(None)
+        return VisaoDeTarefa(self, len(self.ids) - 1)
+
+
+def _coluna(nome: str, ler=None, gravar=None) -> property:
+    """Propriedade que lê e grava o campo na coluna `nome` do store."""
+    def getter(visao: "VisaoDeTarefa"):
+        valor = getattr(visao.store, nome)[visao.linha]
+        return ler(valor) if ler else valor
+
+    def setter(visao: "VisaoDeTarefa", valor) -> None:
+        getattr(visao.store, nome)[visao.linha] = gravar(valor) if gravar else valor
+        if nome != "textos":
+            visao.store.textos[visao.linha] = None
+
+    return property(getter, setter)
+
+
+class VisaoDeTarefa(TarefaBase):
+    """Uma tarefa guardada em uma linha de um `TarefaStore`."""
+
+    __slots__ = ("store", "linha")
+
+    def __init__(self, store: TarefaStore, linha: int) -> None:
+        self.store = store
+        self.linha = linha
+
+    id = _coluna("ids")
+    titulo = _coluna("titulos")
+    nota = _coluna("notas")
+    data = _coluna("datas",
+                   ler=lambda ordinal: date.fromordinal(ordinal) if ordinal else None,
+                   gravar=lambda data: data.toordinal() if data else 0)
+    tags = _coluna("tags", gravar=internar_tags)
+    lista_associada = _coluna("listas")
+    prioridade = _coluna("prioridades")
+    repeticao = _coluna("repeticoes")
+    concluida = _coluna("concluidas", ler=bool)
+    inicio = _coluna("inicios",
+                     ler=lambda ordinal: date.fromordinal(ordinal) if ordinal else None,
+                     gravar=lambda data: data.toordinal() if data else 0)
+    _texto = _coluna("textos")
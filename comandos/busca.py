@@ -3,39 +3,209 @@
 Implementa os mecanismos necessários para o comando de busca por tarefas.
 """
 
-from typing import Callable
+from __future__ import annotations
+from typing import TYPE_CHECKING, Callable, Iterable
 from datetime import date, timedelta
+from functools import partial
+from importlib.util import find_spec
+import heapq
+import os
+from classes.cache_de_buscas import CacheDeBuscas
 from classes.tarefa import Tarefa
-from comandos.manipulacao_de_dados import listas
+from classes.lista import ListaDeTarefas
+from classes.indices import (IndiceDeConclusao, IndiceDeDatas, IndiceDeSeries, IndiceDeTags,
+                             IndiceDeTermos, IndiceDeTexto, termos)
+from classes.recorrencia import ocorre_entre
+from comandos.manipulacao_de_dados import dados
 import terminal_utils as trm
 
-def gerar_filtro_texto(texto: str) -> Callable:
+if TYPE_CHECKING:
+    from classes.indice_vetorial import IndiceVetorial
+    from comandos.busca_paralela import BuscaParalela
+
+# Resultados das buscas recentes, válidos até a próxima mudança nos dados
+cache_de_buscas: CacheDeBuscas = CacheDeBuscas()
+
+# Com NumPy instalado, os filtros e a ordenação que sabem usar as colunas
+# do `IndiceVetorial` são feitos sobre arrays; TAREFAS_VETORIAL=0 desliga.
+# Só se procura o NumPy aqui: ele e o índice são importados no primeiro uso
+usar_vetorial: bool = os.environ.get("TAREFAS_VETORIAL") != "0" and find_spec("numpy") is not None
+# Se o filtro mais seletivo deixa passar menos que essa fração das tarefas,
+# percorrer só as que ele deixa passar é mais rápido que as máscaras
+FRACAO_VETORIAL: float = 0.01
+
+# Com TAREFAS_PROCESSOS=n (n > 1), as buscas que não têm um índice para
+# começar (TEXTO antes do índice de trigramas existir) testam as tarefas
+# em n processos, se houver pelo menos MINIMO_PARALELO tarefas; abaixo
+# disso, criar e consultar os processos custa mais do que percorrê-las
+processos_paralelos: int = int(os.environ.get("TAREFAS_PROCESSOS") or 0)
+MINIMO_PARALELO: int = 100_000
+busca_paralela: BuscaParalela | None = None
+
+# Tamanho da página quando só PAGINA é dada
+LIMITE_PADRAO: int = 20
+
+# Nomes alternativos aceitos para os tipos de filtro
+SINONIMOS: dict[str, str] = {
+    "TAG": "TAGS",
+    "ATÉ": "ATE",
+    "CONCLUÍDA": "CONCLUIDA",
+    "CONCLUIDAS": "CONCLUIDA",
+    "CONCLUÍDAS": "CONCLUIDA",
+    "RELEVÂNCIA": "RELEVANCIA",
+}
+
+class Filtro:
+    """Filtro de busca.
+
+    Pode ser chamado com uma tarefa, como uma função de filtro comum.
+    Quando possível, guarda também uma `condicao` equivalente, no formato
+    (TIPO, valor), que o armazenamento pode resolver por conta própria, e
+    uma função `candidatos` que usa um índice para retornar os IDs de
+    exatamente as tarefas que passam no filtro (ou `tarefas`, que já
+    retorna as próprias tarefas).
+
+    Para o planejador de busca, `estimar` diz quantas tarefas devem passar
+    no filtro (None se não dá para saber sem trabalho demais) e `custo`
+    é o quão caro é testar uma tarefa, de 1 (comparar um campo) a 3.
+    Se o filtro pode ser aplicado às colunas do `IndiceVetorial` de uma
+    vez, `mascara` recebe o índice e retorna a máscara booleana das linhas.
+    """
+
+    def __init__(self, teste: Callable, condicao: tuple | None = None,
+                 candidatos: Callable[[], Iterable[int]] | None = None,
+                 estimar: Callable[[], int | None] | None = None,
+                 custo: int = 1,
+                 tarefas: Callable[[], Iterable[Tarefa]] | None = None,
+                 mascara: Callable[[IndiceVetorial], object] | None = None) -> None:
+        self.teste = teste
+        self.condicao = condicao
+        self.candidatos = candidatos
+        self.estimar = estimar
+        self.custo = custo
+        self.tarefas = tarefas
+        self.mascara = mascara
+        self.descricao: str = "" # como o filtro foi escrito, para o EXPLICAR
+
+    def __call__(self, tarefa: Tarefa) -> bool:
+        return self.teste(tarefa)
+
+
+# Os testes dos filtros e as chaves de ordenação são funções do módulo (e
+# não lambdas) para poderem ser enviados aos processos da busca paralela
+
+def contem_texto(texto: str, tarefa: Tarefa) -> bool:
+    return (texto in tarefa.titulo.lower()
+            or texto in tarefa.nota.lower()
+            or any((texto in tag.lower()) for tag in tarefa.tags))
+
+
+def na_lista(lista_id: int, tarefa: Tarefa) -> bool:
+    return tarefa.lista_associada == lista_id
+
+
+def tem_tags(tags: list[str], tarefa: Tarefa) -> bool:
+    return all((tag in tarefa.tags) for tag in tags)
+
+
+def com_data_entre(inicio: date | None, fim: date, tarefa: Tarefa) -> bool:
+    # Tarefas sem data não têm prazo, então nunca entram
+    return tarefa.data is not None and (inicio is None or inicio <= tarefa.data) and tarefa.data <= fim
+
+
+def tem_ocorrencia_entre(inicio: date, fim: date, tarefa: Tarefa) -> bool:
+    # A data da tarefa ou, se ela é uma série, uma das próximas ocorrências
+    return ocorre_entre(tarefa, inicio, fim)
+
+
+def esta_concluida(concluida: bool, tarefa: Tarefa) -> bool:
+    return tarefa.concluida == concluida
+
+
+def chave_por_data(tarefa: Tarefa) -> tuple:
+    # O ID desempata, para que as páginas de uma mesma busca não mudem
+    # de uma vez para outra
+    return (tarefa.data if tarefa.data else date.max,
+            -tarefa.prioridade,
+            tarefa.lista_associada,
+            tarefa.id)
+
+
+def chave_por_prioridade(tarefa: Tarefa) -> tuple:
+    return (-tarefa.prioridade,
+            tarefa.data if tarefa.data else date.max,
+            tarefa.lista_associada,
+            tarefa.id)
+
+
+class Relevancia:
+    """Pontuações BM25 das tarefas para uma consulta, calculadas no
+    primeiro uso (veja `IndiceDeTermos`)."""
+
+    def __init__(self, consulta: str) -> None:
+        self.consulta = consulta
+        self._pontuacoes: dict[int, float] | None = None
+
+    @property
+    def pontuacoes(self) -> dict[int, float]:
+        if self._pontuacoes is None:
+            self._pontuacoes = dados.registro.indice(IndiceDeTermos).pontuar(self.consulta)
+        return self._pontuacoes
+
+
+def tem_pontuacao(relevancia: Relevancia, tarefa: Tarefa) -> bool:
+    return tarefa.id in relevancia.pontuacoes
+
+
+def chave_por_relevancia(relevancia: Relevancia, tarefa: Tarefa) -> tuple:
+    return (-relevancia.pontuacoes.get(tarefa.id, 0.0), tarefa.id)
+
+
+ORDENACOES: dict[str, Callable[[Tarefa], tuple]] = {
+    "data": chave_por_data,
+    "prioridade": chave_por_prioridade,
+}
+
+
+def estimar_texto(texto: str) -> int | None:
+    # Construir o índice de trigramas é caro; só estima se ele já existe
+    indice = dados.registro.indices.get(IndiceDeTexto)
+    return indice.estimar(texto) if indice else None
+
+
+def gerar_filtro_texto(texto: str) -> Filtro:
     """Retorna uma função de filtro que pode ser usada para checar
     se o texto da string `valor` está contida em uma dada tarefa.
     """
-    return (lambda tarefa, texto=texto:
-                texto in tarefa.titulo.lower()
-                or texto in tarefa.nota.lower()
-                or any((texto in tag.lower()) for tag in tarefa.tags))
+    return Filtro(partial(contem_texto, texto),
+                  candidatos=lambda texto=texto:
+                      dados.registro.indice(IndiceDeTexto).buscar(texto),
+                  estimar=lambda texto=texto: estimar_texto(texto),
+                  custo=3)
 
 
-def gerar_filtro_lista_nome(nome: str) -> Callable:
+def filtro_de_lista(lista: ListaDeTarefas) -> Filtro:
+    # Uma tarefa sempre está na lista à qual está associada, então as
+    # tarefas da própria lista são exatamente as que passam no filtro
+    return Filtro(partial(na_lista, lista.id),
+                  ("LISTA_ID", lista.id),
+                  estimar=lambda: len(lista.tarefas),
+                  tarefas=lambda: lista.tarefas,
+                  mascara=lambda vetor, lista_id=lista.id:
+                      vetor.coluna("listas") == lista_id)
+
+
+def gerar_filtro_lista_nome(nome: str) -> Filtro:
     """Retorna uma função de filtro que pode ser usada para checar
     se uma dada tarefa está associada à lista de nome `valor`.
     """
-    lista_id: int
-    for lista in listas:
+    for lista in dados.listas:
         if lista.titulo.lower() == nome.lower():
-            lista_id = lista.id
-            break
-    else:
-        raise ValueError("Lista não encontrada")
-    
-    return (lambda tarefa, lista_id=lista_id:
-                tarefa.lista_associada == lista_id)
+            return filtro_de_lista(lista)
+    raise ValueError("Lista não encontrada")
 
 
-def gerar_filtro_lista_id(id: str | int) -> Callable:
+def gerar_filtro_lista_id(id: str | int) -> Filtro:
     """Retorna uma função de filtro que pode ser usada para checar
     se uma dada tarefa está associada à lista cujo id é `id`.
     """
@@ -44,25 +214,27 @@ def gerar_filtro_lista_id(id: str | int) -> Callable:
     except ValueError:
         raise ValueError("ID inválido")
     
-    for lista in listas:
-        if lista.id == id:
-            break
-    else:
+    lista: ListaDeTarefas | None = dados.registro.lista(id)
+    if lista is None:
         raise ValueError("Lista não encontrada")
-    
-    return (lambda tarefa, id=id: tarefa.lista_associada == id)
+    return filtro_de_lista(lista)
 
 
-def gerar_filtro_tags(tags: str) -> Callable:
+def gerar_filtro_tags(tags: str) -> Filtro:
     """Retorna uma função de filtro que pode ser usada para checar
     se uma dada tarefa contém a(s) tag(s) da string `tags`.
     """
-    return (lambda tarefa, tags=tags:
-                all((tag.strip() in tarefa.tags)
-                        for tag in tags.split(",") if tag))
+    lista_tags: list[str] = [tag.strip() for tag in tags.split(",") if tag.strip()]
+    return Filtro(partial(tem_tags, lista_tags),
+                  ("TAGS", lista_tags),
+                  lambda lista_tags=lista_tags:
+                      dados.registro.indice(IndiceDeTags).buscar(lista_tags),
+                  lambda lista_tags=lista_tags:
+                      dados.registro.indice(IndiceDeTags).estimar(lista_tags),
+                  custo=2)
 
 
-def gerar_filtro_ate_data(valor: str) -> Callable:
+def gerar_filtro_ate_data(valor: str) -> Filtro:
     """Retorna uma função de filtro que pode ser usada para checar
     se a data de uma dada tarefa é igual ou anterior à data ou prazo
     fornecido pela string `valor`.
@@ -83,21 +255,82 @@ def gerar_filtro_ate_data(valor: str) -> Callable:
                     ' uma data no formato "DD/MM/AAAA".')
                 return
     
-    return (lambda tarefa, target_date=target_date:
-                tarefa.data <= target_date)
+    return Filtro(partial(com_data_entre, None, target_date),
+                  ("ATE", target_date),
+                  lambda target_date=target_date:
+                      dados.registro.indice(IndiceDeDatas).entre(None, target_date),
+                  lambda target_date=target_date:
+                      dados.registro.indice(IndiceDeDatas).contar(None, target_date),
+                  mascara=lambda vetor, ordinal=target_date.toordinal():
+                      (vetor.coluna("datas") != 0) & (vetor.coluna("datas") <= ordinal))
+
+
+def mascara_entre(inicio: date, fim: date, vetor: IndiceVetorial):
+    """Linhas com a data no intervalo, mais as séries atrasadas com uma
+    ocorrência nele (que são poucas, então são testadas uma a uma)."""
+    datas = vetor.coluna("datas")
+    mascara = (datas >= inicio.toordinal()) & (datas <= fim.toordinal())
+    series = ((vetor.coluna("repeticoes") != 0) & ~vetor.coluna("concluidas")
+              & (datas != 0) & (datas < inicio.toordinal())).nonzero()[0]
+    for linha, tarefa in zip(series.tolist(), vetor.tarefas_de(series)):
+        if tarefa is not None and ocorre_entre(tarefa, inicio, fim):
+            mascara[linha] = True
+    return mascara
+
+
+def gerar_filtro_entre_datas(valor: str) -> Filtro:
+    """Retorna uma função de filtro que pode ser usada para checar
+    se a data de uma dada tarefa está no intervalo "DD/MM/AAAA-DD/MM/AAAA"
+    (inclusive). Tarefas sem data não estão em nenhum intervalo, e uma
+    tarefa repetível está se alguma ocorrência dela está.
+    """
+    inicio_str, separador, fim_str = valor.partition("-")
+    if not separador:
+        raise ValueError("Intervalo sem separador")
+    dia, mes, ano = map(int, inicio_str.strip().split("/"))
+    inicio: date = date(ano, mes, dia)
+    dia, mes, ano = map(int, fim_str.strip().split("/"))
+    fim: date = date(ano, mes, dia)
+    if inicio > fim:
+        raise ValueError("Intervalo invertido")
+
+    return Filtro(partial(tem_ocorrencia_entre, inicio, fim),
+                  ("ENTRE", (inicio, fim)),
+                  lambda inicio=inicio, fim=fim:
+                      dados.registro.indice(IndiceDeDatas).entre(inicio, fim)
+                      + dados.registro.indice(IndiceDeSeries).entre(inicio, fim),
+                  lambda inicio=inicio, fim=fim:
+                      dados.registro.indice(IndiceDeDatas).contar(inicio, fim)
+                      + len(dados.registro.indice(IndiceDeSeries).series),
+                  mascara=partial(mascara_entre, inicio, fim))
 
 
-def gerar_filtro_concluida(valor: str) -> Callable:
+def gerar_filtro_concluida(valor: str) -> Filtro:
     """Retorna uma função de filtro que pode ser usada para checar
     se uma dada tarefa está ou não concluída (a depender do `valor`,
     que pode indicar sim ou não).
     """
     concluida: bool = valor.startswith("s")
-    return (lambda tarefa, concluida=concluida:
-                tarefa.concluida == concluida)
+    return Filtro(partial(esta_concluida, concluida),
+                  ("CONCLUIDA", concluida),
+                  lambda concluida=concluida:
+                      dados.registro.indice(IndiceDeConclusao).buscar(concluida),
+                  lambda concluida=concluida:
+                      len(dados.registro.indice(IndiceDeConclusao).buscar(concluida)),
+                  mascara=lambda vetor, concluida=concluida:
+                      vetor.coluna("concluidas") == concluida)
 
 
-def obter_filtro(tipo: str, valor: str) -> Callable | None:
+def gerar_filtro_relevancia(relevancia: Relevancia) -> Filtro:
+    """Retorna uma função de filtro que pode ser usada para checar se
+    uma dada tarefa contém alguma das palavras da busca por relevância.
+    """
+    return Filtro(partial(tem_pontuacao, relevancia),
+                  candidatos=lambda: relevancia.pontuacoes.keys(),
+                  estimar=lambda: len(relevancia.pontuacoes))
+
+
+def obter_filtro(tipo: str, valor: str) -> Filtro | None:
     """Obtém uma função de filtro do tipo `tipo` a partir do valor `valor`."""
     match tipo:
         case "TEXTO":
@@ -125,43 +358,350 @@ def obter_filtro(tipo: str, valor: str) -> Callable | None:
                 print('Data inválida! Use "HOJE", "7 DIAS" ou' \
                     ' uma data no formato "DD/MM/AAAA".')
                 return None
+        case "ENTRE":
+            try:
+                return gerar_filtro_entre_datas(valor)
+            except (ValueError, TypeError):
+                print('Intervalo inválido! Use "DD/MM/AAAA-DD/MM/AAAA", com a data inicial primeiro.')
+                return None
         case "CONCLUIDA" | "CONCLUÍDA" | "CONCLUIDAS" | "CONCLUÍDAS":
             return gerar_filtro_concluida(valor)
 
 
-def gerar_busca(words: list[str]) -> tuple[list[Callable], Callable] | tuple[None, None]:
-    """Obtém todas as funções de filtro necessárias para uma dada busca."""
+class PlanoDeBusca:
+    """Plano de execução de uma busca.
+
+    As condições que o armazenamento sabe resolver são enviadas a ele
+    (por exemplo, como SQL). Senão, o plano estima quantas tarefas passam
+    em cada filtro e parte do filtro mais seletivo que tem índice (ou da
+    lista, no caso de um filtro de lista); os demais filtros são testados
+    só nessas tarefas, dos mais baratos e seletivos para os mais caros.
+    Sem nenhum filtro com índice, todas as tarefas são percorridas.
+
+    Com uma `chave`, o resultado é guardado em `cache_de_buscas` e
+    reaproveitado enquanto os dados não mudarem (e, se a busca é
+    `relativa` ao dia de hoje, enquanto o dia não mudar).
+
+    Com um `limite`, só a página pedida das tarefas encontradas é ordenada.
+
+    Com `usar_vetorial`, se o filtro mais seletivo pode virar uma máscara,
+    todos os filtros que podem são aplicados de uma vez às colunas do
+    `IndiceVetorial`, e a ordenação por `ordem` é feita com `lexsort`.
+    """
+
+    def __init__(self, filtros: list[Filtro], sorting_key: Callable,
+                 explicar: bool = False, chave: tuple | None = None,
+                 relativa: bool = False, limite: int | None = None,
+                 pagina: int = 1, ordem: str | None = None) -> None:
+        self.filtros = filtros
+        self.sorting_key = sorting_key
+        self.explicar = explicar
+        self.chave = chave
+        self.relativa = relativa
+        self.limite = limite
+        self.pagina = pagina
+        self.ordem = ordem # "data" ou "prioridade", se `sorting_key` for uma delas
+        # Preenchidos por `executar`
+        self.acesso: str = ""
+        self.inicio: Filtro | None = None
+        self.estimativas: dict[int, int | None] = {} # id(filtro) -> estimativa
+        self.restantes: list[Filtro] = []
+        self.examinadas: int = 0
+        self._linhas = None # linhas do `IndiceVetorial` com as tarefas encontradas
+        self._ordenadas: bool = False # se as tarefas encontradas já vieram em ordem
+        self.total: int = 0 # quantas tarefas passam nos filtros
+
+    def _estimativa(self, filtro: Filtro) -> int | None:
+        if id(filtro) not in self.estimativas:
+            self.estimativas[id(filtro)] = filtro.estimar() if filtro.estimar else None
+        return self.estimativas[id(filtro)]
+
+    def _escolher_inicio(self) -> Filtro | None:
+        """O filtro com índice que deve deixar passar menos tarefas."""
+        indexados = [f for f in self.filtros if f.candidatos or f.tarefas]
+        if not indexados:
+            return None
+        conhecidos = [f for f in indexados if self._estimativa(f) is not None]
+        if conhecidos:
+            return min(conhecidos, key=self._estimativa)
+        return indexados[0]
+
+    def _ordenar_restantes(self, filtros: list[Filtro]) -> list[Filtro]:
+        sem_estimativa: float = float("inf")
+        return sorted(filtros, key=lambda f: (
+            f.custo, e if (e := self.estimativas.get(id(f))) is not None else sem_estimativa))
+
+    def _vale_vetorizar(self, inicio: Filtro | None) -> bool:
+        if inicio is None:
+            return True
+        estimativa: int | None = self._estimativa(inicio)
+        if estimativa is not None and estimativa < FRACAO_VETORIAL * dados.registro.quantidade():
+            return False
+        return inicio.mascara is not None
+
+    def _vale_paralelizar(self, inicio: Filtro | None) -> bool:
+        return (processos_paralelos > 1 and self.ordem is not None
+                and inicio is not None and self._estimativa(inicio) is None
+                and dados.registro.quantidade() >= MINIMO_PARALELO)
+
+    def _buscar_em_paralelo(self, quantas: int | None) -> list[Tarefa]:
+        global busca_paralela
+        if busca_paralela is None:
+            # Só importado aqui: a busca paralela é opcional, e o
+            # multiprocessing pesa no início do programa
+            from comandos.busca_paralela import BuscaParalela
+            busca_paralela = BuscaParalela(processos_paralelos)
+        busca_paralela.iniciar(dados.listas, dados.registro)
+        self.acesso = f"todas as tarefas, em {processos_paralelos} processos"
+        self.restantes = self._ordenar_restantes(self.filtros)
+        self.examinadas = dados.registro.quantidade()
+        self._ordenadas = True
+        resultados, self.total = busca_paralela.buscar(
+            [f.teste for f in self.restantes], self.sorting_key,
+            lambda id_tarefa: dados.registro.tarefa(id_tarefa)[0], quantas)
+        if quantas is None:
+            self._guardar_no_cache(resultados)
+        return resultados
+
+    def _ordenar(self, tarefas: list[Tarefa], quantas: int | None = None) -> list[Tarefa]:
+        if self._ordenadas:
+            return tarefas[:quantas]
+        vetor: IndiceVetorial | None = None
+        if usar_vetorial:
+            from classes.indice_vetorial import IndiceVetorial
+            vetor = dados.registro.indices.get(IndiceVetorial)
+        if vetor is not None and self.ordem is not None:
+            linhas = self._linhas if self._linhas is not None else vetor.linhas_de(tarefas)
+            return vetor.tarefas_de(vetor.ordenar(linhas, self.ordem)[:quantas])
+        if quantas is None:
+            return sorted(tarefas, key=self.sorting_key)
+        return heapq.nsmallest(quantas, tarefas, key=self.sorting_key)
+
+    def executar(self) -> list[Tarefa]:
+        """Retorna as tarefas que atendem a todos os filtros, ordenadas."""
+        return self._ordenar(self.encontrar())
+
+    def executar_pagina(self) -> tuple[list[Tarefa], int]:
+        """Retorna as tarefas da página pedida, ordenadas, e o total de
+        tarefas encontradas.
+
+        Só as tarefas até o fim da página passam pela ordenação (com um
+        heap de tamanho limitado), e não todas as encontradas.
+        """
+        if self.limite is None:
+            return self.executar(), self.total
+        return self.paginar(self.encontrar(self.pagina * self.limite)), self.total
+
+    def paginar(self, tarefas: list[Tarefa]) -> list[Tarefa]:
+        """Ordena `tarefas` (já encontradas) e retorna só a página pedida."""
+        if self.limite is None:
+            return self._ordenar(tarefas)
+        fim: int = self.pagina * self.limite
+        return self._ordenar(tarefas, fim)[fim - self.limite:]
+
+    def encontrar(self, quantas: int | None = None) -> list[Tarefa]:
+        """Retorna as tarefas que atendem a todos os filtros, sem ordem
+        definida, e guarda quantas são em `total`.
+
+        Se `quantas` é dado, basta que estejam entre as tarefas retornadas
+        as `quantas` primeiras na ordem da busca (a busca paralela só
+        retorna essas, já ordenadas)."""
+        listas: list[ListaDeTarefas] = dados.listas # garante que os dados foram carregados
+        self._linhas = None
+        self._ordenadas = False
+        if self.chave is not None:
+            ids: list[int] | None = cache_de_buscas.obter(self.chave, dados.geracao)
+            if ids is not None:
+                self.acesso = "cache"
+                self.restantes = []
+                self.examinadas = 0
+                self.total = len(ids)
+                return [dados.registro.tarefa(id_tarefa)[0] for id_tarefa in ids]
+
+        condicoes: list[tuple] = [f.condicao for f in self.filtros if f.condicao]
+        candidatas: Iterable[Tarefa] | None = None
+        if condicoes and not dados.em_transacao:
+            # Durante uma transação, o armazenamento ainda não tem as mudanças
+            candidatas = dados.armazenamento.buscar(condicoes)
+
+        if candidatas is not None:
+            self.acesso = "armazenamento (" + ", ".join(
+                f.descricao for f in self.filtros if f.condicao) + ")"
+            self.restantes = [f for f in self.filtros if not f.condicao]
+        else:
+            inicio: Filtro | None = self._escolher_inicio()
+            self.inicio = inicio
+            self.restantes = [f for f in self.filtros if f is not inicio]
+            vetoriais: list[Filtro] = [f for f in self.filtros if f.mascara]
+            if self._vale_paralelizar(inicio):
+                self.inicio = None
+                return self._buscar_em_paralelo(quantas)
+            if usar_vetorial and vetoriais and self._vale_vetorizar(inicio):
+                self.inicio = None
+                self.acesso = "vetorial (" + ", ".join(f.descricao for f in vetoriais) + ")"
+                self.restantes = [f for f in self.filtros if not f.mascara]
+                from classes.indice_vetorial import IndiceVetorial
+                vetor: IndiceVetorial = dados.registro.indice(IndiceVetorial)
+                linhas = vetor.selecionar([f.mascara for f in vetoriais])
+                if not self.restantes:
+                    # As linhas já são o resultado, e servem para ordená-lo
+                    self._linhas = linhas
+                candidatas = vetor.tarefas_de(linhas)
+            elif inicio is None:
+                self.acesso = "todas as tarefas"
+                candidatas = (tarefa for lista in listas for tarefa in lista.tarefas)
+            elif inicio.tarefas:
+                self.acesso = f"lista ({inicio.descricao})"
+                candidatas = inicio.tarefas()
+            else:
+                self.acesso = f"índice ({inicio.descricao})"
+                ids: list[int] = sorted(inicio.candidatos())
+                candidatas = (dados.registro.tarefa(id_tarefa)[0] for id_tarefa in ids)
+
+        self.restantes = self._ordenar_restantes(self.restantes)
+        restantes: list[Filtro] = self.restantes
+        resultados: list[Tarefa]
+        if restantes:
+            resultados = []
+            self.examinadas = 0
+            for tarefa in candidatas:
+                self.examinadas += 1
+                if all(filtro(tarefa) for filtro in restantes):
+                    resultados.append(tarefa)
+        else:
+            resultados = list(candidatas)
+            self.examinadas = len(resultados)
+        return self._guardar_no_cache(resultados)
+
+    def _guardar_no_cache(self, resultados: list[Tarefa]) -> list[Tarefa]:
+        self.total = len(resultados)
+        if self.chave is not None:
+            cache_de_buscas.guardar(self.chave, dados.geracao,
+                                    [tarefa.id for tarefa in resultados], self.relativa)
+        return resultados
+
+    def explicacao(self, encontradas: int) -> list[str]:
+        """Linhas descrevendo o plano executado, para o EXPLICAR."""
+        def com_estimativa(filtro: Filtro) -> str:
+            estimativa = self.estimativas.get(id(filtro))
+            return filtro.descricao + (f" (~{estimativa})" if estimativa is not None else "")
+
+        linhas: list[str] = [f"Acesso: {self.acesso}"]
+        if self.inicio is not None:
+            estimativa = self.estimativas.get(id(self.inicio))
+            linhas[0] += f", estimativa: {'?' if estimativa is None else estimativa}"
+        linhas.append("Filtros testados em cada tarefa: "
+                      + (", ".join(com_estimativa(f) for f in self.restantes) or "nenhum"))
+        linhas.append(f"Tarefas examinadas: {self.examinadas}")
+        linhas.append(f"Tarefas encontradas: {encontradas}")
+        linhas.append(f"Cache de buscas: {cache_de_buscas.acertos} acertos, "
+                      f"{cache_de_buscas.falhas} falhas")
+        return linhas
+
+
+def normalizar_filtro(tipo: str, valor: str) -> tuple[str, str]:
+    """Forma canônica de um filtro, para que buscas equivalentes
+    escritas de jeitos diferentes usem o mesmo resultado do cache."""
+    tipo = SINONIMOS.get(tipo, tipo)
+    match tipo:
+        case "TAGS":
+            valor = ",".join(sorted({tag.strip() for tag in valor.split(",") if tag.strip()}))
+        case "CONCLUIDA":
+            valor = "s" if valor.startswith("s") else "n"
+        case "LISTA_NOME" | "ATE" | "ENTRE":
+            valor = " ".join(valor.split())
+        case "RELEVANCIA":
+            valor = " ".join(sorted(set(termos(valor))))
+    return tipo, valor
+
 
-    filtros: list[Callable] = []
+def gerar_busca(words: list[str]) -> PlanoDeBusca | None:
+    """Obtém todas as funções de filtro necessárias para uma dada busca,
+    já no plano que vai executá-la."""
 
-    # Ordenação padrão é, primariamente, por data
-    sorting_key: Callable = lambda tarefa: (
-                tarefa.data if tarefa.data else date.max,
-                -tarefa.prioridade,
-                tarefa.lista_associada,
-            )
+    filtros: list[Filtro] = []
+    explicar: bool = False
+    normalizados: set[tuple[str, str]] = set()
+    limite: int | None = None
+    pagina: int = 1
+
+    # Sem ORDENAR, a ordenação é por relevância se houver RELEVANCIA e,
+    # senão, primariamente por data
+    ordem: str | None = None
+    relevancia: Relevancia | None = None
 
     for i in range(0, len(words) - 1, 2):
         # extrai cada filtro do input, com o tipo e seu respectivo valor
         tipo: str = words[i].strip(" :").upper()
         valor: str = words[i + 1].lower()
 
+        if tipo == "EXPLICAR":
+            explicar = valor.startswith("s")
+            continue
+        if tipo in ("LIMITE", "PAGINA", "PÁGINA"):
+            try:
+                numero: int = int(valor)
+                if numero < 1:
+                    raise ValueError
+            except ValueError:
+                print(f'{tipo} deve ser um número inteiro maior que zero.')
+                return None
+            if tipo == "LIMITE":
+                limite = numero
+            else:
+                pagina = numero
+            continue
         if tipo != "ORDENAR":
-            filtro: Callable = obter_filtro(tipo, valor)
+            # A ordenação é aplicada depois do cache, então não entra na chave
+            normalizados.add(normalizar_filtro(tipo, valor))
+            filtro: Filtro | None
+            if SINONIMOS.get(tipo, tipo) == "RELEVANCIA":
+                if not termos(valor):
+                    print('Dê ao menos uma palavra para a busca por relevância.')
+                    return None
+                relevancia = Relevancia(valor)
+                filtro = gerar_filtro_relevancia(relevancia)
+            else:
+                filtro = obter_filtro(tipo, valor)
             if not filtro:
-                return None, None
+                return None
+            filtro.descricao = f'{tipo}:"{valor}"'
             filtros.append(filtro)
         else:
-            # Ordenação padrão já é por data, então só é preciso
-            # mudar quando o usuário quer ordenar por prioridade
-            if valor.upper() == "PRIORIDADE":
-                sorting_key = lambda tarefa: (
-                        -tarefa.prioridade,
-                        tarefa.data if tarefa.data else date.max,
-                        tarefa.lista_associada,
-                    )
-    
-    return (filtros, sorting_key)
+            match valor.upper():
+                case "PRIORIDADE":
+                    ordem = "prioridade"
+                case "RELEVANCIA" | "RELEVÂNCIA":
+                    ordem = "relevancia"
+                case _:
+                    ordem = "data"
+
+    sorting_key: Callable
+    if relevancia is not None and ordem in (None, "relevancia"):
+        # A chave usa as pontuações, então não serve para a ordenação vetorial
+        sorting_key = partial(chave_por_relevancia, relevancia)
+        ordem = None
+        if limite is None:
+            # Na busca por relevância, só as melhores tarefas interessam
+            limite = LIMITE_PADRAO
+    else:
+        ordem = "data" if ordem in (None, "relevancia") else ordem
+        sorting_key = ORDENACOES[ordem]
+
+    if limite is None and pagina > 1:
+        limite = LIMITE_PADRAO
+
+    # "HOJE" e "7 DIAS" dependem do dia em que a busca é feita
+    relativa: bool = any(tipo == "ATE" and valor in ("hoje", "7 dias")
+                         for tipo, valor in normalizados)
+    return PlanoDeBusca(filtros, sorting_key, explicar,
+                        chave=tuple(sorted(normalizados)), relativa=relativa,
+                        limite=limite, pagina=pagina, ordem=ordem)
+
+
+def filtrar_tarefas(filtros: list[Filtro]) -> list[Tarefa]:
+    """Retorna as tarefas que atendem a todos os filtros (veja `PlanoDeBusca`)."""
+    return PlanoDeBusca(filtros, sorting_key=lambda tarefa: 0).executar()
 
 
 def imprimir_ajuda_busca() -> None:
@@ -181,8 +721,16 @@ def imprimir_ajuda_busca() -> None:
     print('    > "HOJE", ou que já estão atrasadas')
     print('    > "7 DIAS", prazo contido nos próximos 7 dias ou já atrasadas')
     print('    > "DD/MM/AAAA", até a data específica dada (inclui atrasadas)')
+    print(trm.bold('=> ENTRE:"DD/MM/AAAA-DD/MM/AAAA"'), '- busca por tarefas com prazo entre as duas datas (inclusive);')
+    print('    > Tarefas sem data não entram nas buscas por ATE ou ENTRE.')
+    print('    > Uma tarefa repetível entra no ENTRE se qualquer ocorrência dela cai no intervalo.')
     print(trm.bold('=> CONCLUIDA:"s"'), '- busca por tarefas concluídas ("s", "sim") ou pendentes ("n", "nao");')
-    print(trm.bold('=> ORDENAR:"criterio"'), '- ordena os resultados pelo critério "DATA" ou "PRIORIDADE".')
+    print(trm.bold('=> RELEVANCIA:"palavras"'), '- busca por tarefas com alguma das palavras, das mais relevantes para as menos;')
+    print(f'    > Acentos não importam, e o título pesa mais que as tags e a nota. Mostra as {LIMITE_PADRAO} primeiras, se não houver LIMITE.')
+    print(trm.bold('=> ORDENAR:"criterio"'), '- ordena os resultados pelo critério "DATA", "PRIORIDADE" ou "RELEVANCIA".')
+    print(trm.bold('=> LIMITE:"n"'), '- mostra só as n primeiras tarefas encontradas;')
+    print(trm.bold('=> PAGINA:"p"'), f'- mostra a p-ésima página de resultados (de LIMITE tarefas, {LIMITE_PADRAO} por padrão);')
+    print(trm.bold('=> EXPLICAR:"s"'), '- mostra também como a busca foi feita e quantas tarefas foram examinadas.')
 
 
 def buscar_tarefas(*args) -> None:
@@ -201,26 +749,37 @@ def buscar_tarefas(*args) -> None:
         print("Certifique-se de usar aspas ao redor de cada valor de filtro na busca.")
         return
 
-    filtros: list[Callable]
-    sorting_key: Callable
-    filtros, sorting_key = gerar_busca(words)
-    if filtros is None:
+    plano: PlanoDeBusca | None = gerar_busca(words)
+    if plano is None:
         return
 
-    # filtra todas as tarefas, guarda apenas as que atendem
-    # a todos os critérios dos filtros, e ordena os resultados
-    resultados: list[Tarefa] = []
-    for lista in listas:
-        for tarefa in lista.tarefas:
-            if all(filtro(tarefa) for filtro in filtros):
-                resultados.append(tarefa)
-    resultados.sort(key=sorting_key)
+    resultados: list[Tarefa]
+    total: int
+    resultados, total = plano.executar_pagina()
+    imprimir_resultados(plano, resultados, total)
+
+
+def imprimir_resultados(plano: PlanoDeBusca, resultados: list[Tarefa], total: int) -> None:
+    """Imprime a página `resultados` de uma busca que encontrou `total`
+    tarefas (e o plano da busca, com EXPLICAR)."""
+    if plano.explicar:
+        print(trm.bold(trm.italic("\n>>>>>> PLANO DA BUSCA:\n")))
+        print("\n".join("  " + linha for linha in plano.explicacao(total)))
     
-    if not resultados:
+    if not total:
         print("Nenhuma tarefa encontrada nessa busca. :/")
         return
     print(trm.bold(trm.italic("\n>>>>>> RESULTADOS DA BUSCA:\n")))
+    if not resultados:
+        print(f"A busca encontrou {total} tarefa(s), mas a página {plano.pagina} está vazia.")
+        return
     print("\n\n".join(str(tarefa) for tarefa in resultados))
+    if plano.limite is not None:
+        primeira: int = (plano.pagina - 1) * plano.limite + 1
+        paginas: int = -(-total // plano.limite)
+        print()
+        print(trm.bold(f"Mostrando {primeira}-{primeira + len(resultados) - 1} de {total} "
+                       f"tarefas encontradas (página {plano.pagina} de {paginas})."))
     print()
     print('Lembrando: você pode rodar os comandos "editar tarefa", "remover tarefa" ou "concluir tarefa" e')
     print('selecionar o id de qualquer uma das tarefas encontrada na busca!')
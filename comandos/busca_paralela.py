@@ -0,0 +1,183 @@
+"""Busca paralela, em vários processos.
+
+As listas são divididas entre os processos (equilibrando o número de
+tarefas de cada um), e cada processo recebe uma única vez a cópia das
+tarefas da sua parte, que fica guardada nele entre uma busca e outra. A
+cada busca, só os testes dos filtros e a chave de ordenação são enviados;
+cada processo devolve quantas tarefas passaram e os IDs delas (ou só das
+primeiras, se a busca é paginada), já ordenados, e os resultados parciais
+são intercalados mantendo a ordem.
+
+Quando os dados mudam, só as tarefas adicionadas, editadas ou removidas
+desde a busca anterior são enviadas aos processos (veja
+`IndiceDeMudancas`). Os processos só são recriados do zero quando os
+dados são recarregados ou quando as mudanças acumuladas passam de
+`FRACAO_RECRIAR` das tarefas.
+"""
+
+from __future__ import annotations
+from itertools import islice
+from typing import TYPE_CHECKING, Callable
+import heapq
+import multiprocessing
+from classes.indices import Indice
+from classes.lista import ListaDeTarefas
+from classes.tarefa import Tarefa
+
+if TYPE_CHECKING:
+    from multiprocessing.connection import Connection
+    from classes.registro import RegistroDeIds
+
+# Acima dessa fração das tarefas mudadas, recriar os processos sai mais
+# barato que enviar as mudanças
+FRACAO_RECRIAR: float = 0.5
+
+
+class IndiceDeMudancas(Indice):
+    """Anota as tarefas adicionadas, editadas ou removidas desde a última
+    vez que as mudanças foram enviadas aos processos.
+
+    Guarda só a tarefa (ou None, se foi removida) de cada ID; ela é
+    convertida em dicionário no envio, já com o seu estado mais recente.
+    """
+
+    def __init__(self) -> None:
+        self.tarefas: dict[int, Tarefa | None] = {}
+
+    def construir(self, tarefas) -> None:
+        pass # as tarefas existentes já estão nos processos
+
+    def adicionar(self, tarefa: Tarefa) -> None:
+        self.tarefas[tarefa.id] = tarefa
+
+    def remover(self, tarefa: Tarefa) -> None:
+        self.tarefas[tarefa.id] = None
+
+    def atualizar(self, tarefa: Tarefa) -> None:
+        self.tarefas[tarefa.id] = tarefa
+
+
+def _trabalhar(conexao: Connection, tarefas_em_dicio: list[dict]) -> None:
+    """Laço de cada processo: responde às buscas sobre a sua parte das
+    tarefas e aplica as mudanças que recebe."""
+    tarefas: dict[int, Tarefa] = {}
+    for dicio in tarefas_em_dicio:
+        tarefa = Tarefa.de_dicio(dicio)
+        tarefas[tarefa.id] = tarefa
+    del tarefas_em_dicio
+    conexao.send(len(tarefas)) # pronto
+    while True:
+        pedido = conexao.recv()
+        if pedido is None:
+            break
+        if pedido[0] == "mudar":
+            # Tarefas editadas ou removidas saem de onde estiverem; as
+            # editadas e as novas entram no processo que as recebeu
+            _, mudadas, novas = pedido
+            for id_tarefa in mudadas:
+                tarefas.pop(id_tarefa, None)
+            for dicio in novas:
+                tarefa = Tarefa.de_dicio(dicio)
+                tarefas[tarefa.id] = tarefa
+            conexao.send(len(tarefas))
+            continue
+        _, testes, chave, quantas = pedido
+        encontradas: list[Tarefa] = [tarefa for tarefa in tarefas.values()
+                                     if all(teste(tarefa) for teste in testes)]
+        total: int = len(encontradas)
+        if quantas is None:
+            encontradas.sort(key=chave)
+        else:
+            encontradas = heapq.nsmallest(quantas, encontradas, key=chave)
+        conexao.send((total, [tarefa.id for tarefa in encontradas]))
+    conexao.close()
+
+
+class BuscaParalela:
+    """Processos que guardam, cada um, as tarefas de algumas listas."""
+
+    def __init__(self, processos: int) -> None:
+        self.processos = processos
+        self.conexoes: list[Connection] = []
+        self.trabalhadores: list[multiprocessing.Process] = []
+        self.quantidades: list[int] = [] # quantas tarefas cada processo tem
+        # Mudanças anotadas desde que os processos receberam as tarefas
+        self.mudancas: IndiceDeMudancas | None = None
+
+    def _dividir(self, listas: list[ListaDeTarefas]) -> list[list[dict]]:
+        partes: list[list[dict]] = [[] for _ in range(self.processos)]
+        # Maiores listas primeiro, cada uma para a parte com menos tarefas
+        for lista in sorted(listas, key=lambda l: len(l.tarefas), reverse=True):
+            menor: list[dict] = min(partes, key=len)
+            menor.extend(tarefa.para_dicio() for tarefa in lista.tarefas)
+        return partes
+
+    def iniciar(self, listas: list[ListaDeTarefas], registro: RegistroDeIds) -> None:
+        """Deixa os processos com as tarefas atuais: envia as mudanças
+        anotadas no `registro` ou, se os processos ainda não existem, se
+        os dados foram recarregados (outro registro) ou se as mudanças são
+        muitas, cria os processos com cópias novas das tarefas."""
+        if self.conexoes and registro.indices.get(IndiceDeMudancas) is self.mudancas:
+            if len(self.mudancas.tarefas) <= FRACAO_RECRIAR * registro.quantidade():
+                self._enviar_mudancas()
+                return
+        self.fechar()
+        for parte in self._dividir(listas):
+            conexao, conexao_do_processo = multiprocessing.Pipe()
+            trabalhador = multiprocessing.Process(target=_trabalhar,
+                                                  args=(conexao_do_processo, parte),
+                                                  daemon=True)
+            trabalhador.start()
+            conexao_do_processo.close()
+            self.conexoes.append(conexao)
+            self.trabalhadores.append(trabalhador)
+        # Espera cada processo terminar de montar as suas tarefas
+        self.quantidades = [conexao.recv() for conexao in self.conexoes]
+        registro.indices.pop(IndiceDeMudancas, None)
+        self.mudancas = registro.indice(IndiceDeMudancas)
+
+    def _enviar_mudancas(self) -> None:
+        if not self.mudancas.tarefas:
+            return
+        mudadas: list[int] = list(self.mudancas.tarefas)
+        novas: list[list[dict]] = [[] for _ in self.conexoes]
+        # Tarefas novas ou editadas vão para os processos com menos tarefas
+        for tarefa in self.mudancas.tarefas.values():
+            if tarefa is not None:
+                i: int = min(range(len(novas)), key=lambda i: self.quantidades[i] + len(novas[i]))
+                novas[i].append(tarefa.para_dicio())
+        self.mudancas.tarefas = {}
+        for conexao, parte in zip(self.conexoes, novas):
+            conexao.send(("mudar", mudadas, parte))
+        self.quantidades = [conexao.recv() for conexao in self.conexoes]
+
+    def buscar(self, testes: list[Callable[[Tarefa], bool]],
+               chave: Callable[[Tarefa], tuple],
+               tarefa_pelo_id: Callable[[int], Tarefa],
+               quantas: int | None = None) -> tuple[list[Tarefa], int]:
+        """As primeiras `quantas` (ou todas as) tarefas que passam em todos
+        os `testes`, ordenadas por `chave`, e quantas passam no total."""
+        for conexao in self.conexoes:
+            conexao.send(("buscar", testes, chave, quantas))
+        total: int = 0
+        parciais: list[list[Tarefa]] = []
+        for conexao in self.conexoes:
+            encontradas, ids = conexao.recv()
+            total += encontradas
+            parciais.append([tarefa_pelo_id(id_tarefa) for id_tarefa in ids])
+        tarefas = heapq.merge(*parciais, key=chave)
+        return list(tarefas if quantas is None else islice(tarefas, quantas)), total
+
+    def fechar(self) -> None:
+        for conexao in self.conexoes:
+            try:
+                conexao.send(None)
+            except OSError:
+                pass
+            conexao.close()
+        for trabalhador in self.trabalhadores:
+            trabalhador.join(timeout=1)
+        self.conexoes = []
+        self.trabalhadores = []
+        self.quantidades = []
+        self.mudancas = None
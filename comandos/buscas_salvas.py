@@ -0,0 +1,127 @@
+"""Módulo das buscas salvas.
+
+Uma busca salva guarda o texto de uma busca (os mesmos filtros do comando
+"buscar tarefas") sob um nome. O texto fica junto dos dados (veja
+`Armazenamento.salvar_buscas`), e o resultado é materializado no
+`IndiceDeBuscasSalvas` na primeira vez que a busca é vista: a partir daí,
+cada tarefa adicionada, editada, concluída ou removida é testada só contra
+os filtros de cada busca salva, sem percorrer as demais tarefas.
+"""
+
+from datetime import date
+from classes.indices import BuscaSalva, IndiceDeBuscasSalvas
+from classes.tarefa import Tarefa
+from comandos.busca import PlanoDeBusca, gerar_busca, imprimir_resultados
+from comandos.manipulacao_de_dados import dados
+import terminal_utils as trm
+
+
+def separar_nome(args: tuple) -> tuple[str, str] | None:
+    """Separa `"nome" resto` no nome (entre aspas, em minúsculas) e no resto do texto."""
+    texto: str = " ".join(args)
+    words: list[str] = texto.split('"')
+    if len(words) < 3 or words[0].strip() or not words[1].strip():
+        return None
+    return words[1].strip().lower(), '"'.join(words[2:]).strip()
+
+
+def materializar(nome: str, plano: PlanoDeBusca) -> BuscaSalva:
+    """O resultado materializado da busca salva `nome`, calculando-o com
+    `plano` se ainda não existe (ou se foi calculado em outro dia e a busca
+    depende do dia de hoje)."""
+    indice: IndiceDeBuscasSalvas = dados.registro.indice(IndiceDeBuscasSalvas)
+    busca: BuscaSalva | None = indice.buscas.get(nome)
+    if busca is None or (busca.dia is not None and busca.dia != date.today()):
+        ids: set[int] = {tarefa.id for tarefa in plano.encontrar()}
+        busca = BuscaSalva([filtro.teste for filtro in plano.filtros], ids,
+                           date.today() if plano.relativa else None)
+        indice.materializar(nome, busca)
+        plano.acesso = f"busca completa ({plano.acesso}), guardada na busca salva"
+    else:
+        plano.acesso = "busca salva, mantida a cada mudança"
+        plano.inicio = None
+        plano.restantes = []
+        plano.examinadas = 0
+    return busca
+
+
+def salvar_busca(*args) -> None:
+    """Salva uma busca sob um nome, para ser vista com "ver busca"."""
+    separados: tuple[str, str] | None = separar_nome(args)
+    if separados is None or not separados[1]:
+        print('Uso: salvar busca "nome" FILTRO1:"filtro" FILTRO2:"outro filtro"')
+        print('Os filtros são os mesmos do comando "buscar tarefas".')
+        return
+    nome, consulta = separados
+
+    plano: PlanoDeBusca | None = gerar_busca(consulta.split('"'))
+    if plano is None:
+        return
+    if not plano.filtros:
+        print("Dê ao menos um filtro para a busca.")
+        return
+    if any(tipo == "RELEVANCIA" for tipo, _ in plano.chave):
+        # As pontuações dependem de todas as tarefas, não só da que mudou
+        print("Buscas por RELEVANCIA não podem ser salvas.")
+        return
+
+    dados.buscas[nome] = consulta
+    dados.salvar_buscas()
+    dados.registro.indice(IndiceDeBuscasSalvas).descartar(nome)
+    materializar(nome, plano)
+    print(f'Busca "{nome}" salva. Use o comando ver busca "{nome}" para ver suas tarefas.')
+
+
+def ver_busca(*args) -> None:
+    """Mostra as tarefas de uma busca salva.
+
+    Depois do nome, podem ser dados LIMITE, PAGINA, ORDENAR e EXPLICAR,
+    que valem só para essa vez.
+    """
+    separados: tuple[str, str] | None = separar_nome(args)
+    if separados is None:
+        print('Uso: ver busca "nome" [LIMITE:"n" PAGINA:"p" ORDENAR:"criterio" EXPLICAR:"s"]')
+        return
+    nome, opcoes = separados
+    consulta: str | None = dados.buscas.get(nome)
+    if consulta is None:
+        print(f'Não existe uma busca salva com o nome "{nome}".')
+        return
+
+    extra: PlanoDeBusca | None = gerar_busca(opcoes.split('"'))
+    if extra is None:
+        return
+    if extra.filtros:
+        print('Só LIMITE, PAGINA, ORDENAR e EXPLICAR podem ser dados depois do nome da busca.')
+        return
+
+    # As opções dadas agora vêm depois e, por isso, valem mais que as salvas
+    plano: PlanoDeBusca | None = gerar_busca(f"{consulta} {opcoes}".split('"'))
+    if plano is None:
+        return
+    busca: BuscaSalva = materializar(nome, plano)
+    tarefas: list[Tarefa] = [dados.registro.tarefa(id_tarefa)[0] for id_tarefa in busca.ids]
+    imprimir_resultados(plano, plano.paginar(tarefas), len(tarefas))
+
+
+def ver_buscas() -> None:
+    """Mostra o nome e os filtros de todas as buscas salvas."""
+    if not dados.buscas:
+        print('Nenhuma busca salva. Use "salvar busca" para criar uma.')
+        return
+    for nome, consulta in sorted(dados.buscas.items()):
+        print(trm.bold(f'"{nome}":'), consulta)
+
+
+def remover_busca(*args) -> None:
+    """Apaga uma busca salva."""
+    nome: str = " ".join(args).strip().strip('"').lower()
+    if nome not in dados.buscas:
+        print(f'Não existe uma busca salva com o nome "{nome}".')
+        return
+    del dados.buscas[nome]
+    dados.salvar_buscas()
+    indice = dados.registro.indices.get(IndiceDeBuscasSalvas) if dados.carregados else None
+    if indice is not None:
+        indice.descartar(nome)
+    print(f'Busca "{nome}" removida.')
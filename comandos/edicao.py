@@ -3,27 +3,27 @@
 Contém os mecanismos de manipulação de tarefas pelo usuário.
 """
 
-from datetime import date, timedelta
+from datetime import date
+from classes.recorrencia import avancar_serie
 from classes.tarefa import Tarefa, Repeticao
 from classes.lista import ListaDeTarefas
-from comandos.manipulacao_de_dados import salvar_mudanças, salvar_dados, listas
+from comandos.busca import PlanoDeBusca, gerar_busca
+from comandos.lote import CAMPOS, PALAVRA, ErroNoLote, ler_campos, ler_data, separar_palavras
+from comandos.manipulacao_de_dados import (
+    salvar_mudanças, dados, transacao,
+    registrar_tarefa_adicionada, registrar_tarefa_editada, registrar_tarefa_removida,
+    registrar_lista_adicionada, registrar_lista_renomeada, registrar_lista_removida,
+)
 import terminal_utils as trm
 
 def encontrar_tarefa_pelo_id(id: int) -> tuple[Tarefa, ListaDeTarefas] | tuple[None, None]:
-    """ Itera sobre todas as listas e tarefas para encontrar uma tarefa pelo ID """
-    for l in listas:
-        for t in l.tarefas:
-            if t.id == id:
-                return t, l
-    return None, None
+    """ Encontra uma tarefa (e a lista que a contém) pelo ID. """
+    return dados.registro.tarefa(id)
 
 
 def encontrar_lista_pelo_id(id: int) -> ListaDeTarefas | None:
-    """ Itera sobre as listas para encontrar uma lista pelo ID. """
-    for l in listas:
-        if l.id == id:
-            return l
-    return None
+    """ Encontra uma lista pelo ID. """
+    return dados.registro.lista(id)
 
 
 def confirmar_id_int() -> int:
@@ -47,7 +47,7 @@ def adicionar_tarefa() -> None:
             break
 
     print("Listas disponíveis: ")
-    for l in listas:
+    for l in dados.listas:
         print(f"Título: {l.titulo} | ID: {l.id}")
     
     lista_associada = confirmar_id_int()
@@ -114,7 +114,7 @@ def adicionar_tarefa() -> None:
         if not salvar_mudanças():
             return
         lista.adicionar_tarefa(nova_tarefa)
-        salvar_dados()
+        registrar_tarefa_adicionada(lista, nova_tarefa)
         print("Feito :D")
     else:
         print("Lista não encontrada")
@@ -129,15 +129,15 @@ def adicionar_lista() -> None:
             print("Digite um título não vazio")
             continue
         # Verifica se o título já existe
-        for l in listas:
+        for l in dados.listas:
             if novo_titulo.lower() == l.titulo.lower():
                 p = False
         if p:
             nova_lista = ListaDeTarefas(titulo=novo_titulo)
             if not salvar_mudanças():
                 return
-            listas.append(nova_lista)
-            salvar_dados()
+            dados.listas.append(nova_lista)
+            registrar_lista_adicionada(nova_lista)
             print("Feito :D")
             return
         else:
@@ -147,7 +147,7 @@ def adicionar_lista() -> None:
 def remover_tarefa() -> None:
     """ Remove uma tarefa existente e as tarefas dentro dela. """
     print(trm.bold("Escolha a tarefa que deseja remover:"))
-    for l in listas:
+    for l in dados.listas:
         for t in l.tarefas:
             print(f"Título: {t.titulo} | ID: {t.id}")
     
@@ -158,8 +158,8 @@ def remover_tarefa() -> None:
     if tarefa and lista:
         if not salvar_mudanças():
             return
+        registrar_tarefa_removida(lista, tarefa)
         lista.remover_tarefa(tarefa.id)
-        salvar_dados()
         print("Feito :D")
     else:
         print("Tarefa não encontrada")
@@ -167,13 +167,13 @@ def remover_tarefa() -> None:
 
 def remover_lista() -> None:
     """ Remove uma lista existente"""
-    if len(listas) <= 1:
+    if len(dados.listas) <= 1:
         print()
         print("Somente há uma lista salva, você não pode exclui-la")
         return
     
     print(trm.bold("Escolha a lista que deseja remover:"))
-    for l in listas:
+    for l in dados.listas:
         print(f"Título: {l.titulo} | ID: {l.id}")
     
     lista_id = confirmar_id_int()
@@ -184,8 +184,8 @@ def remover_lista() -> None:
         while True:
             confirmacao = input("Apagar a lista também excluirá todas as tarefas contidas nela. Você quer continuar com a ação? (S/N): ")
             if confirmacao == "S" or confirmacao == "s":
-                listas.remove(lista)
-                salvar_dados()
+                registrar_lista_removida(lista)
+                dados.listas.remove(lista)
                 print("Feito :D")
                 return
             elif confirmacao == "N" or confirmacao == "n":
@@ -201,7 +201,7 @@ def remover_lista() -> None:
 def editar_tarefa() -> None:
     """ Edita os atributos de uma tarefa existente. """
     print(trm.bold("Selecione a tarefa que deseja editar:"))
-    for l in listas:
+    for l in dados.listas:
         for t in l.tarefas:
             print(f"Título: {t.titulo} | ID: {t.id}")
     
@@ -219,7 +219,7 @@ def editar_tarefa() -> None:
         # Edição da lista associada, com validação de ID
         while True:
             print("Listas disponíveis:")
-            for l in listas:
+            for l in dados.listas:
                 print(f"    Título: {l.titulo} | ID: {l.id}")
             lista_associada = input(f"Novo id da lista associada [{tarefa.lista_associada}]: ")
             
@@ -257,7 +257,7 @@ def editar_tarefa() -> None:
         else:
             data_obj2 = None
 
-        print(f"Novas tags separadas por vírgula [{tarefa.tags}]")
+        print(f"Novas tags separadas por vírgula [{set(tarefa.tags)}]")
         tags_str = input(f"  (substituirão as antigas): ")
         
         # Edição e validação da prioridade
@@ -290,20 +290,28 @@ def editar_tarefa() -> None:
         # Atualiza os atributos da tarefa se novos valores forem fornecidos
         if titulo:
             tarefa.titulo = titulo
-        if lista_associada:
-            tarefa.lista_associada = lista_associada
         if nota:    
             tarefa.nota = nota
         if data_obj2:
             tarefa.data = data_obj2
+            tarefa.inicio = None # a série recomeça na nova data
         if tags_str:
             tarefa.tags = set(tag.strip().lower() for tag in tags_str.split(" "))
         if prioridade:
             tarefa.prioridade = prioridade
         if repeticao:    
             tarefa.repeticao = repeticao
+            tarefa.inicio = None
         
-        salvar_dados()
+        registrar_tarefa_editada(lista, tarefa)
+
+        # Trocar a lista associada move a tarefa para a nova lista
+        if lista_associada != "" and lista_associada != lista.id:
+            nova_lista = encontrar_lista_pelo_id(lista_associada)
+            registrar_tarefa_removida(lista, tarefa)
+            lista.remover_tarefa(tarefa.id)
+            nova_lista.adicionar_tarefa(tarefa)
+            registrar_tarefa_adicionada(nova_lista, tarefa)
         print("Feito :D")
     else:
         print("Tarefa não encontrada")
@@ -312,7 +320,7 @@ def editar_tarefa() -> None:
 def editar_lista() -> None:
     """ Edita o título de uma lista existente. """
     print(trm.bold("Selecione a lista que deseja editar:"))
-    for l in listas:
+    for l in dados.listas:
         print(f"Título: {l.titulo} | ID: {l.id}")
 
     lista_id = confirmar_id_int()
@@ -330,7 +338,7 @@ def editar_lista() -> None:
                 continue
             
             # Verifica se o novo título já existe
-            for l in listas:
+            for l in dados.listas:
                 if l.titulo.lower() == titulo.lower():
                     print("Título já existente, tente novamente")
                     p = False
@@ -341,20 +349,22 @@ def editar_lista() -> None:
         if not salvar_mudanças():
             return
         
+        titulo_antigo = lista.titulo
         lista.titulo = titulo
 
-        salvar_dados()
+        registrar_lista_renomeada(titulo_antigo, lista)
         print("Feito :D")
     else:
         print("Lista não encontrada")
 
 
 def concluir_tarefa() -> None:
-    """ Marca uma tarefa como concluída e, se for repetível, cria uma nova tarefa considerqando o tipo de repetição. """
+    """ Marca uma tarefa como concluída ou, se for repetível, conclui a ocorrência
+    pendente e passa a tarefa para a próxima (uma tarefa atrasada pode ser posta em dia). """
     print(trm.bold("Selecione a tarefa que foi concluída:"))
 
     # Exibe apenas as tarefas não concluídas
-    for l in listas:
+    for l in dados.listas:
         for t in l.tarefas:
             if not t.concluida:
                 print(f"Título: {t.titulo} | ID: {t.id}")
@@ -366,52 +376,182 @@ def concluir_tarefa() -> None:
     if not tarefa or not lista:
         print("Tarefa ou lista não encontrada!")
         return
-    tarefa.concluida = True
 
     # Se a tarefa não for repetível, apenas a marca como concluída
     if tarefa.repeticao == Repeticao.NENHUMA.value:
+        tarefa.concluida = True
+        registrar_tarefa_editada(lista, tarefa)
         print("Tarefa concluída com sucesso!")
         return
-    
-    # Cria uma nova instância da tarefa para a próxima repetição
-    nova_tarefa = Tarefa(
-        titulo=tarefa.titulo,
-        lista_associada=tarefa.lista_associada,
-        nota=tarefa.nota,
-        data=tarefa.data,
-        tags=tarefa.tags.copy(),
-        prioridade=tarefa.prioridade,
-        repeticao=tarefa.repeticao,
-        concluida=False
-    )
-
-    if tarefa.data is None:
-        tarefa.data = date.today()
-    
-    # Define a data da nova tarefa com base na repetição
-    match tarefa.repeticao:
-        case Repeticao.DIARIA.value:
-            nova_tarefa.data = tarefa.data + timedelta(days=1)
-        
-        case Repeticao.SEMANAL.value:
-            nova_tarefa.data = tarefa.data + timedelta(weeks=1)
-        
-        case Repeticao.MENSAL.value:
-            nova_tarefa.data = tarefa.data + timedelta(days=30)
-        
-        case Repeticao.ANUAL.value:
-            try:
-                nova_tarefa.data = tarefa.data.replace(
-                        year=tarefa.data.year + 1)
-            except ValueError:
-                # Caso ano bissexto (29 fev)
-                nova_tarefa.data = tarefa.data.replace(
-                        year=tarefa.data.year + 1) + timedelta(days=-1)
 
+    ate: date | None = None
+    hoje: date = date.today()
+    if tarefa.data is not None and tarefa.data < hoje:
+        while True:
+            c = input(f"A tarefa está atrasada desde {tarefa.data.strftime('%d/%m/%Y')}. "
+                      "Concluir todas as ocorrências até hoje? (S/N): ")
+            if c in ("S", "s", "N", "n"):
+                break
+            print("Digite S ou N")
+        if c in ("S", "s"):
+            ate = hoje
     if not salvar_mudanças():
         return
-    
-    lista.adicionar_tarefa(nova_tarefa)
-    print(f"Tarefa concluída! Nova tarefa criada para {nova_tarefa.data.strftime('%d/%m/%Y')}")
 
-    salvar_dados()
\ No newline at end of file
+    concluidas: int = avancar_serie(tarefa, ate)
+    registrar_tarefa_editada(lista, tarefa)
+    print(f"{concluidas} ocorrência(s) concluída(s)! Próxima repetição em {tarefa.data.strftime('%d/%m/%Y')}")
+
+
+# Quantas tarefas afetadas são listadas antes de pedir confirmação
+MOSTRAR_AFETADAS: int = 20
+
+
+def separar_busca(args: tuple) -> tuple[str, list[str], bool]:
+    """ Separa os argumentos de um comando em massa na busca (os filtros de
+    "buscar tarefas"), nos campos `campo=valor` e na opção --simular. """
+    busca: list[str] = []
+    campos: list[str] = []
+    simular: bool = False
+    for palavra in PALAVRA.findall(" ".join(args)):
+        if palavra == "--simular":
+            simular = True
+        elif (nome := palavra.partition("=")[0]) != palavra and not any(c in nome for c in ':"\''):
+            campos.extend(separar_palavras(palavra))
+        else:
+            busca.append(palavra)
+    return " ".join(busca), campos, simular
+
+
+def tarefas_da_busca(consulta: str, uso: str) -> list[tuple[Tarefa, ListaDeTarefas]] | None:
+    """ As tarefas encontradas pela busca, cada uma com a sua lista. """
+    plano: PlanoDeBusca | None = None
+    if '"' in consulta:
+        palavras: list[str] = consulta.split('"')
+        if any(tipo.strip(" :").upper() in ("LIMITE", "PAGINA", "PÁGINA") for tipo in palavras[::2]):
+            # Um comando em massa afeta todas as tarefas da busca, nunca só uma página
+            print("LIMITE e PAGINA não podem ser usados em comandos em massa.")
+            return None
+        plano = gerar_busca(palavras)
+        if plano is None:
+            return None
+    if plano is None or not plano.filtros:
+        print("Uso:", uso)
+        print('Os filtros são os mesmos do comando "buscar tarefas", e ao menos um é necessário.')
+        print("Com --simular, só mostra quantas tarefas seriam afetadas.")
+        return None
+    # Todas as encontradas, mesmo numa busca por RELEVANCIA (que mostraria só as melhores)
+    tarefas: list[Tarefa] = plano.executar()
+    return [(tarefa, dados.registro.tarefa(tarefa.id)[1]) for tarefa in tarefas]
+
+
+def confirmar_em_massa(afetadas: list[tuple[Tarefa, ListaDeTarefas]], acao: str,
+                       simular: bool) -> bool:
+    """ Mostra as tarefas afetadas e pede confirmação (ou só as mostra, ao simular). """
+    if not afetadas:
+        print("Nenhuma tarefa encontrada nessa busca. :/")
+        return False
+    for tarefa, _ in afetadas[:MOSTRAR_AFETADAS]:
+        print(f"Título: {tarefa.titulo} | ID: {tarefa.id}")
+    if len(afetadas) > MOSTRAR_AFETADAS:
+        print(f"... e mais {len(afetadas) - MOSTRAR_AFETADAS} tarefa(s)")
+    if simular:
+        print(trm.bold(f"{len(afetadas)} tarefa(s) seriam {acao}s (simulação, nada foi mudado)."))
+        return False
+    print(trm.bold(f"{len(afetadas)} tarefa(s) serão {acao}s."))
+    return salvar_mudanças()
+
+
+def concluir_tarefas(*args) -> None:
+    """ Conclui de uma vez todas as tarefas pendentes encontradas por uma busca.
+
+    Tarefas repetíveis passam para a próxima ocorrência. Com `ate=DD/MM/AAAA`
+    (ou `ate=hoje`), todas as ocorrências até essa data são concluídas de uma
+    vez, e tarefas com data posterior (ou sem data) não são afetadas. """
+    consulta, campos, simular = separar_busca(args)
+    uso: str = 'concluir tarefas FILTRO1:"filtro" ... [ate=DD/MM/AAAA] [--simular]'
+    ate: date | None = None
+    for campo in campos:
+        nome, _, valor = campo.partition("=")
+        if nome.lower() != "ate":
+            print("Uso:", uso)
+            return
+        try:
+            ate = date.today() if valor.lower() == "hoje" else ler_data(valor)
+        except ErroNoLote as erro:
+            print(f"{str(erro).capitalize()}.")
+            return
+    encontradas = tarefas_da_busca(consulta, uso)
+    if encontradas is None:
+        return
+    afetadas = [(tarefa, lista) for tarefa, lista in encontradas if not tarefa.concluida
+                and (ate is None or (tarefa.data is not None and tarefa.data <= ate))]
+    if not confirmar_em_massa(afetadas, "concluída", simular):
+        return
+
+    series: int = 0
+    ocorrencias: int = 0
+    with transacao():
+        for tarefa, lista in afetadas:
+            if tarefa.repeticao != Repeticao.NENHUMA.value:
+                ocorrencias += avancar_serie(tarefa, ate)
+                series += 1
+            else:
+                tarefa.concluida = True
+            registrar_tarefa_editada(lista, tarefa)
+    print(f"{len(afetadas) - series} tarefa(s) concluída(s) e {ocorrencias} ocorrência(s) "
+          f"de {series} tarefa(s) repetível(is) concluída(s). :D")
+
+
+def remover_tarefas(*args) -> None:
+    """ Remove de uma vez todas as tarefas encontradas por uma busca. """
+    consulta, campos, simular = separar_busca(args)
+    uso: str = 'remover tarefas FILTRO1:"filtro" ... [--simular]'
+    if campos:
+        print("Uso:", uso)
+        return
+    afetadas = tarefas_da_busca(consulta, uso)
+    if afetadas is None or not confirmar_em_massa(afetadas, "removida", simular):
+        return
+
+    with transacao():
+        for tarefa, lista in afetadas:
+            registrar_tarefa_removida(lista, tarefa)
+            lista.remover_tarefa(tarefa.id)
+    print(f"{len(afetadas)} tarefa(s) removida(s). :D")
+
+
+def editar_tarefas(*args) -> None:
+    """ Muda os mesmos campos de todas as tarefas encontradas por uma busca. """
+    consulta, pares, simular = separar_busca(args)
+    uso: str = f'editar tarefas FILTRO1:"filtro" ... campo=valor ... [--simular] (campos: {", ".join(CAMPOS)})'
+    if not pares:
+        print("Uso:", uso)
+        return
+    try:
+        campos: dict[str, object] = ler_campos(pares)
+    except ErroNoLote as erro:
+        print(f"{str(erro).capitalize()}.")
+        return
+    if campos.get("titulo") == "":
+        print("O título não pode ser vazio.")
+        return
+    afetadas = tarefas_da_busca(consulta, uso)
+    if afetadas is None or not confirmar_em_massa(afetadas, "editada", simular):
+        return
+
+    nova_lista: ListaDeTarefas | None = campos.pop("lista", None)
+    with transacao():
+        for tarefa, lista in afetadas:
+            for campo, valor in campos.items():
+                setattr(tarefa, campo, valor)
+            if "data" in campos or "repeticao" in campos:
+                tarefa.inicio = None # a série recomeça na nova data
+            registrar_tarefa_editada(lista, tarefa)
+            # Trocar a lista associada move a tarefa para a nova lista
+            if nova_lista is not None and nova_lista is not lista:
+                registrar_tarefa_removida(lista, tarefa)
+                lista.remover_tarefa(tarefa.id)
+                nova_lista.adicionar_tarefa(tarefa)
+                registrar_tarefa_adicionada(nova_lista, tarefa)
+    print(f"{len(afetadas)} tarefa(s) editada(s). :D")
@@ -0,0 +1,330 @@
+"""Modo em lote.
+
+Executa comandos escritos um por linha em um arquivo (ou na entrada
+padrão), sem nenhuma pergunta: os valores vêm na própria linha, como
+campos `nome=valor` (com aspas se o valor tem espaços), por exemplo:
+
+    adicionar lista titulo="Casa"
+    adicionar tarefa titulo="Lavar o carro" lista=Casa data=12/07/2025 tags=carro,limpeza prioridade=3
+    editar tarefa id=12 prioridade=2 nota="Levar ao posto"
+    mover tarefa id=12 lista=Casa
+    concluir tarefa id=7 ate=hoje
+    remover tarefa id=9
+    editar lista lista=Casa titulo="Apartamento"
+    remover lista lista=Trabalho
+
+As tarefas já existentes são indicadas pelo `id`; as listas, pelo ID ou
+pelo título (campo `lista`). Em "concluir tarefa", `ate=DD/MM/AAAA` (ou
+`ate=hoje`) conclui de uma vez as ocorrências de uma tarefa repetível até
+essa data.
+
+Um valor entre aspas duplas pode conter aspas simples, e vice-versa.
+Linhas vazias e começadas por "#" são ignoradas. O lote inteiro é uma só
+transação (veja `transacao`): os dados são salvos uma única vez, no fim,
+e um erro em qualquer linha descarta todas as mudanças do lote.
+"""
+
+from datetime import date
+from typing import Callable, Iterable, TextIO
+import re
+import sys
+import time
+from classes.lista import ListaDeTarefas
+from classes.recorrencia import avancar_serie
+from classes.tarefa import Repeticao, Tarefa, data_de_texto
+from comandos.manipulacao_de_dados import (
+    dados, transacao,
+    registrar_tarefa_adicionada, registrar_tarefa_editada, registrar_tarefa_removida,
+    registrar_lista_adicionada, registrar_lista_renomeada, registrar_lista_removida,
+)
+
+
+# Uma palavra da linha: trechos sem espaço ou entre aspas, sem nada entre eles
+PALAVRA: re.Pattern = re.compile(r"""(?:[^\s"']|"[^"]*"|'[^']*')+""")
+ASPAS: re.Pattern = re.compile(r""""([^"]*)"|'([^']*)'""")
+
+
+class ErroNoLote(Exception):
+    """Erro em uma linha do lote, que interrompe o lote inteiro."""
+
+
+def separar_palavras(linha: str) -> list[str]:
+    """Separa a linha nas suas palavras, tirando as aspas dos valores.
+
+    Faz o mesmo que `shlex.split` (sem escapes com barra invertida), mas
+    bem mais rápido, o que importa em lotes com milhares de linhas.
+    """
+    if PALAVRA.sub("", linha).strip():
+        raise ErroNoLote("linha mal formada (aspas sem fechar)")
+    return [ASPAS.sub(lambda m: m.group(1) if m.group(1) is not None else m.group(2), palavra)
+            if '"' in palavra or "'" in palavra else palavra
+            for palavra in PALAVRA.findall(linha)]
+
+
+def encontrar_lista(valor: str) -> ListaDeTarefas:
+    """A lista com o ID ou o título (sem diferenciar maiúsculas) `valor`."""
+    if valor.isdigit():
+        lista: ListaDeTarefas | None = dados.registro.lista(int(valor))
+        if lista is not None:
+            return lista
+    for lista in dados.listas:
+        if lista.titulo.lower() == valor.lower():
+            return lista
+    raise ErroNoLote(f'lista "{valor}" não encontrada')
+
+
+def encontrar_tarefa(valor: str) -> tuple[Tarefa, ListaDeTarefas]:
+    """A tarefa com o ID `valor` e a lista que a contém."""
+    tarefa, lista = dados.registro.tarefa(int(valor)) if valor.isdigit() else (None, None)
+    if tarefa is None:
+        raise ErroNoLote(f'tarefa de ID "{valor}" não encontrada')
+    return tarefa, lista
+
+
+def ler_numero(nome: str, valor: str, maximo: int) -> int:
+    try:
+        numero: int = int(valor)
+    except ValueError:
+        numero = -1
+    if not 0 <= numero <= maximo:
+        raise ErroNoLote(f"{nome} deve ser um número de 0 a {maximo}")
+    return numero
+
+
+def ler_data(valor: str) -> date | None:
+    if not valor:
+        return None
+    try:
+        return data_de_texto(valor)
+    except (ValueError, TypeError):
+        raise ErroNoLote(f'data inválida: "{valor}" (use DD/MM/AAAA)')
+
+
+def ler_ate(valor: str) -> date | None:
+    return date.today() if valor.lower() == "hoje" else ler_data(valor)
+
+
+# Como converter o valor de cada campo
+CAMPOS: dict[str, Callable[[str], object]] = {
+    "titulo": str,
+    "nota": str,
+    "lista": encontrar_lista,
+    "data": ler_data,
+    "tags": lambda valor: {tag.strip().lower() for tag in valor.split(",") if tag.strip()},
+    "prioridade": lambda valor: ler_numero("prioridade", valor, 3),
+    "repeticao": lambda valor: ler_numero("repeticao", valor, 4),
+}
+# Campos que indicam a tarefa afetada por um comando do lote, e não um
+# valor a ser gravado nela
+REFERENCIAS: dict[str, Callable[[str], object]] = {
+    "id": encontrar_tarefa,
+    "ate": ler_ate,
+}
+
+
+def ler_campos(pares: Iterable[str],
+               aceitos: dict[str, Callable[[str], object]] = CAMPOS) -> dict[str, object]:
+    """Converte os campos `nome=valor` de uma linha, validando cada um."""
+    campos: dict[str, object] = {}
+    for par in pares:
+        nome, igual, valor = par.partition("=")
+        nome = nome.lower()
+        if not igual:
+            raise ErroNoLote(f'"{par}" deveria estar no formato campo=valor')
+        if nome not in aceitos:
+            raise ErroNoLote(f'campo desconhecido: "{nome}" (use {", ".join(aceitos)})')
+        campos[nome] = aceitos[nome](valor)
+    return campos
+
+
+def tarefa_do_comando(campos: dict[str, object], comando: str) -> tuple[Tarefa, ListaDeTarefas]:
+    if "id" not in campos:
+        raise ErroNoLote(f'"{comando}" precisa do id da tarefa')
+    return campos.pop("id")
+
+
+def titulo_de_lista(campos: dict[str, object]) -> str:
+    """O título novo de uma lista, que não pode ser vazio nem repetido."""
+    titulo: str | None = campos.get("titulo")
+    if not titulo:
+        raise ErroNoLote("a lista precisa de um titulo")
+    if any(lista.titulo.lower() == titulo.lower() for lista in dados.listas):
+        raise ErroNoLote(f'já existe uma lista com o título "{titulo}"')
+    return titulo
+
+
+def mover(tarefa: Tarefa, lista: ListaDeTarefas, nova_lista: ListaDeTarefas) -> None:
+    if nova_lista is not lista:
+        registrar_tarefa_removida(lista, tarefa)
+        lista.remover_tarefa(tarefa.id)
+        nova_lista.adicionar_tarefa(tarefa)
+        registrar_tarefa_adicionada(nova_lista, tarefa)
+
+
+def adicionar_tarefa(campos: dict[str, object]) -> int:
+    if not campos.get("titulo"):
+        raise ErroNoLote("a tarefa precisa de um titulo")
+    if "lista" not in campos:
+        raise ErroNoLote("a tarefa precisa de uma lista (ID ou título)")
+    lista: ListaDeTarefas = campos["lista"]
+    tarefa = Tarefa(
+        titulo=campos["titulo"],
+        lista_associada=lista.id,
+        nota=campos.get("nota", ""),
+        data=campos.get("data"),
+        tags=campos.get("tags"),
+        prioridade=campos.get("prioridade", 0),
+        repeticao=campos.get("repeticao", 0),
+        concluida=False,
+    )
+    lista.adicionar_tarefa(tarefa)
+    registrar_tarefa_adicionada(lista, tarefa)
+    return 1
+
+
+def editar_tarefa(campos: dict[str, object]) -> int:
+    tarefa, lista = tarefa_do_comando(campos, "editar tarefa")
+    if not campos:
+        raise ErroNoLote("nenhum campo para editar")
+    if campos.get("titulo") == "":
+        raise ErroNoLote("o titulo não pode ser vazio")
+    nova_lista: ListaDeTarefas | None = campos.pop("lista", None)
+    for campo, valor in campos.items():
+        setattr(tarefa, campo, valor)
+    if "data" in campos or "repeticao" in campos:
+        tarefa.inicio = None # a série recomeça na nova data
+    registrar_tarefa_editada(lista, tarefa)
+    # Trocar a lista associada move a tarefa para a nova lista
+    if nova_lista is not None:
+        mover(tarefa, lista, nova_lista)
+    return 0
+
+
+def mover_tarefa(campos: dict[str, object]) -> int:
+    tarefa, lista = tarefa_do_comando(campos, "mover tarefa")
+    if "lista" not in campos:
+        raise ErroNoLote("indique a lista de destino (ID ou título)")
+    mover(tarefa, lista, campos["lista"])
+    return 0
+
+
+def concluir_tarefa(campos: dict[str, object]) -> int:
+    tarefa, lista = tarefa_do_comando(campos, "concluir tarefa")
+    # Uma tarefa repetível passa para a próxima ocorrência (ou para a
+    # primeira depois de `ate`)
+    if tarefa.repeticao != Repeticao.NENHUMA.value:
+        avancar_serie(tarefa, campos.get("ate"))
+    else:
+        tarefa.concluida = True
+    registrar_tarefa_editada(lista, tarefa)
+    return 0
+
+
+def remover_tarefa(campos: dict[str, object]) -> int:
+    tarefa, lista = tarefa_do_comando(campos, "remover tarefa")
+    registrar_tarefa_removida(lista, tarefa)
+    lista.remover_tarefa(tarefa.id)
+    return 0
+
+
+def adicionar_lista(campos: dict[str, object]) -> int:
+    lista = ListaDeTarefas(titulo_de_lista(campos))
+    dados.listas.append(lista)
+    registrar_lista_adicionada(lista)
+    return 0
+
+
+def editar_lista(campos: dict[str, object]) -> int:
+    if "lista" not in campos:
+        raise ErroNoLote("indique a lista (ID ou título)")
+    lista: ListaDeTarefas = campos["lista"]
+    titulo: str = titulo_de_lista(campos)
+    titulo_antigo: str = lista.titulo
+    lista.titulo = titulo
+    registrar_lista_renomeada(titulo_antigo, lista)
+    return 0
+
+
+def remover_lista(campos: dict[str, object]) -> int:
+    if "lista" not in campos:
+        raise ErroNoLote("indique a lista (ID ou título)")
+    if len(dados.listas) <= 1:
+        raise ErroNoLote("a única lista não pode ser removida")
+    lista: ListaDeTarefas = campos["lista"]
+    registrar_lista_removida(lista)
+    dados.listas.remove(lista)
+    return 0
+
+
+def aceitos(*nomes: str) -> dict[str, Callable[[str], object]]:
+    """Os conversores dos campos que um comando aceita."""
+    conversores = CAMPOS | REFERENCIAS
+    return {nome: conversores[nome] for nome in nomes}
+
+
+# Comandos aceitos no lote, com os campos que cada um aceita; cada um
+# retorna quantas tarefas criou
+COMANDOS: dict[str, tuple[Callable[[dict[str, object]], int], dict[str, Callable[[str], object]]]] = {
+    "adicionar tarefa": (adicionar_tarefa, CAMPOS),
+    "editar tarefa": (editar_tarefa, aceitos("id", *CAMPOS)),
+    "mover tarefa": (mover_tarefa, aceitos("id", "lista")),
+    "concluir tarefa": (concluir_tarefa, aceitos("id", "ate")),
+    "remover tarefa": (remover_tarefa, aceitos("id")),
+    "adicionar lista": (adicionar_lista, aceitos("titulo")),
+    "editar lista": (editar_lista, aceitos("lista", "titulo")),
+    "remover lista": (remover_lista, aceitos("lista")),
+}
+
+
+def executar_linha(linha: str) -> int:
+    """Executa uma linha do lote, retornando quantas tarefas ela criou."""
+    palavras: list[str] = separar_palavras(linha)
+    comando: str = " ".join(palavras[:2]).lower()
+    if comando not in COMANDOS:
+        raise ErroNoLote(f'comando "{comando}" não pode ser usado em lote '
+                         f'(use: {", ".join(COMANDOS)})')
+    executar, campos = COMANDOS[comando]
+    return executar(ler_campos(palavras[2:], campos))
+
+
+def executar_lote(linhas: Iterable[str]) -> bool:
+    """Executa as linhas do lote como uma só transação.
+
+    Mostra quantas tarefas foram criadas por segundo, contando a gravação
+    dos dados no disco. Retorna False se alguma linha falhou (e, nesse
+    caso, nada foi salvo).
+    """
+    inicio: float = time.perf_counter()
+    comandos: int = 0
+    tarefas: int = 0
+    numero: int = 0
+    try:
+        with transacao():
+            for numero, linha in enumerate(linhas, start=1):
+                linha = linha.strip()
+                if not linha or linha.startswith("#"):
+                    continue
+                tarefas += executar_linha(linha)
+                comandos += 1
+    except ErroNoLote as erro:
+        print(f"Linha {numero}: {erro}.")
+        print("O lote foi interrompido, e nenhuma mudança foi salva.")
+        return False
+    dados.armazenamento.descarregar()
+    duracao: float = time.perf_counter() - inicio
+    print(f"{comandos} comando(s) executado(s) e {tarefas} tarefa(s) criada(s) "
+          f"em {duracao:.2f} s ({tarefas / duracao:.0f} tarefas/s).")
+    return True
+
+
+def executar_arquivo(caminho: str) -> bool:
+    """Executa o lote do arquivo `caminho` ("-" para a entrada padrão)."""
+    if caminho == "-":
+        return executar_lote(sys.stdin)
+    try:
+        arquivo: TextIO = open(caminho, "r", encoding="utf-8")
+    except OSError as erro:
+        print(f'Não foi possível abrir "{caminho}": {erro.strerror}')
+        return False
+    with arquivo:
+        return executar_lote(arquivo)
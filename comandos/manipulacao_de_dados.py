@@ -1,72 +1,244 @@
 """Módulo de manipulação de dados.
 
 Mecanismos para salvar e carregar dados.
+
+Os dados só são carregados quando algum comando precisa deles pela
+primeira vez (acessando `dados.listas`), então comandos como "ajuda" e
+"limpar tela" não pagam o custo de ler o arquivo.
+
+O mecanismo de armazenamento é escolhido pela extensão do arquivo de
+dados (variável de ambiente `TAREFAS_ARQUIVO`, "tarefas.json" por padrão):
+".db", ".sqlite" ou ".sqlite3" usam SQLite, ".bin" usa o formato binário
+compacto, uma pasta (ou caminho terminado em "/") usa um arquivo por
+lista e qualquer outra extensão usa JSON.
+
+Com o formato binário, `TAREFAS_COLUNAR=1` guarda as tarefas carregadas
+em colunas compactas (veja `classes.tarefa_store`), usando menos memória.
 """
 
-from datetime import date
-import json
+from __future__ import annotations
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator
+import os
 from classes.lista import ListaDeTarefas
+from classes.registro import RegistroDeIds
 from classes.tarefa import Tarefa
 import terminal_utils as trm
 
-listas: list[ListaDeTarefas] = [] # Inicializa uma lista global para armazenar objetos ListaDeTarefas
-arquivo: str = "tarefas.json"
+if TYPE_CHECKING:
+    from armazenamento.base import Armazenamento
+
+arquivo: str = os.environ.get("TAREFAS_ARQUIVO", "tarefas.json")
+
+def criar_armazenamento(caminho: str) -> Armazenamento:
+    """ Escolhe o mecanismo de armazenamento a partir da extensão do arquivo.
+
+    Cada mecanismo só é importado quando escolhido.
+    """
+    if caminho.endswith(("/", os.sep)) or os.path.isdir(caminho):
+        from armazenamento.fragmentado import ArmazenamentoFragmentado
+        return ArmazenamentoFragmentado(caminho)
+    extensao: str = os.path.splitext(caminho)[1].lower()
+    if extensao in (".db", ".sqlite", ".sqlite3"):
+        from armazenamento.banco_sqlite import ArmazenamentoSQLite
+        return ArmazenamentoSQLite(caminho)
+    if extensao == ".bin":
+        from armazenamento.binario import ArmazenamentoBinario
+        return ArmazenamentoBinario(caminho, colunar=os.environ.get("TAREFAS_COLUNAR") == "1")
+    from armazenamento.arquivo_json import ArmazenamentoJSON
+    return ArmazenamentoJSON(caminho)
+
+
+class Dados:
+    """Ponto de acesso às listas de tarefas e ao seu armazenamento.
+
+    Nada é lido do disco até o primeiro acesso a `listas`.
+    """
+
+    def __init__(self, caminho: str) -> None:
+        self.caminho = caminho
+        self._armazenamento: Armazenamento | None = None
+        self._listas: list[ListaDeTarefas] | None = None
+        self._registro: RegistroDeIds | None = None
+        self._buscas: dict[str, str] | None = None
+        # Incrementada a cada mudança nos dados (invalida o cache de buscas)
+        self.geracao: int = 0
+        # Dentro de `transacao`, as mudanças só chegam ao armazenamento no fim
+        self.em_transacao: bool = False
+
+    @property
+    def armazenamento(self) -> Armazenamento:
+        if self._armazenamento is None:
+            self._armazenamento = criar_armazenamento(self.caminho)
+        return self._armazenamento
+
+    @property
+    def listas(self) -> list[ListaDeTarefas]:
+        if self._listas is None:
+            self.carregar()
+        return self._listas
+
+    @property
+    def registro(self) -> RegistroDeIds:
+        """Índices das listas e tarefas carregadas pelos seus IDs."""
+        if self._registro is None:
+            # IDs repetidos trocados ao indexar são salvos para que não mudem na próxima execução
+            self._registro = RegistroDeIds(self.listas, ao_trocar_ids=self.salvar,
+                                           localizar=self.armazenamento.lista_da_tarefa)
+        return self._registro
+
+    @property
+    def buscas(self) -> dict[str, str]:
+        """Buscas salvas (nome -> texto da busca), lidas do armazenamento."""
+        if self._buscas is None:
+            self._buscas = self.armazenamento.carregar_buscas()
+        return self._buscas
+
+    @property
+    def carregados(self) -> bool:
+        return self._listas is not None
+
+    def carregar(self) -> None:
+        """ Carrega os dados das listas de tarefas do armazenamento. """
+        self._listas = self.armazenamento.carregar()
+        self._registro = None
+        self._buscas = None
+        self.mudou()
+        if self.armazenamento.corrompido:
+            print()
+            print(trm.bold(f'Não foi possível ler "{self.caminho}"!'))
+            print(f'O arquivo foi guardado como "{self.armazenamento.corrompido}".')
+        if self.armazenamento.registros_ignorados:
+            print()
+            print(trm.bold(f"{self.armazenamento.registros_ignorados} mudança(s) do diário "
+                           "não puderam ser reaplicadas e foram ignoradas."))
+            print(f'O diário original foi guardado como "{self.armazenamento.diario_ignorado}".')
+        if self._listas:
+            print()
+            print(trm.bold("Dados carregados"))
+        else:
+            print(trm.bold("Começando com um arquivo vazio"))
+            lista = ListaDeTarefas("Cuba")
+            self._listas.append(lista)
+            self.armazenamento.lista_adicionada(lista)
+
+    def salvar(self) -> None:
+        """ Salva todos os dados das listas de tarefas de uma vez. """
+        self.armazenamento.salvar_tudo(self.listas)
+        self.mudou()
+
+    def salvar_buscas(self) -> None:
+        """ Persiste as buscas salvas junto dos dados. """
+        self.armazenamento.salvar_buscas(self.buscas)
+
+    def mudou(self) -> None:
+        """ Avisa que os dados mudaram, tornando velhos os resultados guardados. """
+        self.geracao += 1
+
+    def encerrar(self) -> None:
+        """ Grava o que estiver pendente e fecha o armazenamento, se foi aberto. """
+        if self._armazenamento is not None:
+            self._armazenamento.fechar()
+
+
+dados: Dados = Dados(arquivo)
 
 def salvar_dados() -> None:
-    """ Salva os dados das listas de tarefas em um arquivo JSON. """
-    dados = {}
-    for l in listas:
-        tarefas_l = []
-        for t in l.tarefas:
-            tarefas_l.append(t.para_dicio()) # Converte cada tarefa em um dicionário
-        dados[l.titulo] = tarefas_l # Armazena as tarefas sob o título da lista
-    
-    with open(arquivo, "w") as f:
-        json.dump(dados, f, indent=4)
+    """ Salva todos os dados das listas de tarefas de uma vez. """
+    dados.salvar()
 
 def carregar_dados() -> None:
-    """ Carrega os dados das listas de tarefas de um arquivo JSON. """
-    global listas
+    """ Carrega (ou recarrega) os dados das listas de tarefas. """
+    dados.carregar()
+
+def registrar_tarefa_adicionada(lista: ListaDeTarefas, tarefa: Tarefa) -> None:
+    """ Persiste uma tarefa recém adicionada ao final de `lista`. """
+    dados.mudou()
+    dados.registro.tarefa_adicionada(lista, tarefa)
+    dados.armazenamento.tarefa_adicionada(lista, tarefa)
+
+def registrar_tarefa_editada(lista: ListaDeTarefas, tarefa: Tarefa) -> None:
+    """ Persiste o novo estado de uma tarefa já existente em `lista`. """
+    tarefa.esquecer_texto()
+    dados.mudou()
+    dados.registro.tarefa_editada(tarefa)
+    dados.armazenamento.tarefa_editada(lista, tarefa)
+
+def registrar_tarefa_removida(lista: ListaDeTarefas, tarefa: Tarefa) -> None:
+    """ Persiste a remoção de uma tarefa. Deve ser chamada antes de removê-la. """
+    dados.mudou()
+    dados.registro.tarefa_removida(tarefa)
+    dados.armazenamento.tarefa_removida(lista, tarefa)
+
+def registrar_lista_adicionada(lista: ListaDeTarefas) -> None:
+    dados.mudou()
+    dados.registro.lista_adicionada(lista)
+    dados.armazenamento.lista_adicionada(lista)
+
+def registrar_lista_renomeada(titulo_antigo: str, lista: ListaDeTarefas) -> None:
+    dados.mudou()
+    dados.armazenamento.lista_renomeada(titulo_antigo, lista)
+
+def registrar_lista_removida(lista: ListaDeTarefas) -> None:
+    """ Persiste a remoção de uma lista. Deve ser chamada antes de removê-la. """
+    dados.mudou()
+    dados.registro.lista_removida(lista)
+    dados.armazenamento.lista_removida(lista)
+
+@contextmanager
+def transacao() -> Iterator[None]:
+    """ Agrupa as mudanças feitas dentro do bloco em uma só gravação.
+
+    Cada mudança passa pelo armazenamento como de costume, mas em um lote
+    (veja `Armazenamento.iniciar_lote`): no fim do bloco, todas são
+    persistidas juntas (um só trecho do diário, ou uma só transação do
+    SQLite). Se o bloco é interrompido por uma exceção, o lote é
+    descartado e os dados são recarregados do armazenamento, depois que
+    tudo o que foi salvo antes do bloco chegou ao disco.
+    """
+    dados.registro # carrega os dados (e corrige IDs repetidos) antes de começar
+    dados.em_transacao = True
+    dados.armazenamento.iniciar_lote()
     try:
-        with open(arquivo, "r") as f:
-            dados_carregados = json.load(f)
-    
-        listas = []
-
-        # Itera sobre os dados carregados para recriar as listas e tarefas
-        for titulo_lista, dados_tarefas in dados_carregados.items():
-            nova_lista = ListaDeTarefas(titulo_lista)
-            for tarefa_dict in dados_tarefas:
-                data_str = tarefa_dict.get("data")
-                data_obj = None
-                if data_str:
-                    dia, mes, ano = map(int, data_str.split("/"))
-                    data_obj = date(ano, mes, dia)
-                
-                # Cria um novo objeto Tarefa com os dados carregados
-                nova_tarefa = Tarefa(
-                    titulo=tarefa_dict["titulo"],
-                    lista_associada=tarefa_dict["lista_associada"],
-                    nota=tarefa_dict["nota"],
-                    data=data_obj,
-                    tags=set(tarefa_dict["tags"]),
-                    prioridade=tarefa_dict["prioridade"],
-                    repeticao=tarefa_dict["repeticao"],
-                    concluida=tarefa_dict["concluida"],
-                )
-
-                nova_lista.adicionar_tarefa(nova_tarefa)
-            
-            listas.append(nova_lista)
-        print()
-        print(trm.bold("Dados carregados"))
-        return nova_lista
-    except FileNotFoundError:
-        print(trm.bold("Começando com um arquivo vazio"))
-        listas = [ListaDeTarefas("Cuba")]
-    except json.JSONDecodeError:
-        print(trm.bold("Começando com um arquivo vazio"))
-        listas = [ListaDeTarefas("Cuba")]
+        yield
+    except BaseException:
+        dados.em_transacao = False
+        dados.armazenamento.descartar_lote()
+        dados.armazenamento.descarregar()
+        dados.carregar()
+        raise
+    dados.em_transacao = False
+    dados.armazenamento.concluir_lote()
+
+def converter_dados(*destino) -> None:
+    """ Salva todos os dados atuais em outro arquivo, no formato indicado
+    pela extensão do destino (por exemplo, de JSON para binário ou vice-versa).
+    """
+    caminho: str = " ".join(destino).strip('"')
+    if not caminho:
+        print('Uso: converter dados "arquivo de destino" (.json, .bin, .db ou "pasta/")')
+        return
+    if os.path.abspath(caminho) == os.path.abspath(dados.caminho):
+        print("O destino deve ser diferente do arquivo de dados atual.")
+        return
+    destino_armazenamento: Armazenamento = criar_armazenamento(caminho)
+    destino_armazenamento.salvar_tudo(dados.listas)
+    destino_armazenamento.salvar_buscas(dados.buscas)
+    destino_armazenamento.fechar()
+    print(f'Dados convertidos para "{caminho}".')
+    print(f'Para usá-lo, inicie o programa com TAREFAS_ARQUIVO="{caminho}".')
+
+def encerrar_dados() -> bool:
+    """ Garante que todos os dados estejam no disco antes de sair.
+
+    Retorna False (e avisa o usuário) se não foi possível gravá-los.
+    """
+    try:
+        dados.encerrar()
+    except OSError as erro:
+        print(trm.bold(f"Erro ao salvar os dados: {erro}"))
+        return False
+    return True
 
 def salvar_mudanças():
     """ Pergunta ao usuário se deseja salvar as mudanças, retornando True ou False.  """
@@ -79,5 +251,3 @@ def salvar_mudanças():
             return False
         else:
             print("Digite S ou N")
-
-carregar_dados()
\ No newline at end of file
@@ -1,22 +1,177 @@
-from comandos.manipulacao_de_dados import listas
+from datetime import date, timedelta
+from itertools import chain, islice
+from typing import Iterable, Iterator
+import heapq
+from classes.indices import IndiceDeDatas
+from classes.lista import ListaDeTarefas
+from classes.recorrencia import ocorrencias_da_tarefa
+from classes.tarefa import Tarefa
+from comandos.manipulacao_de_dados import dados
+import terminal_utils as trm
 
-def ver_lista(*titulo) -> None:
-    titulo: str = " ".join(titulo).strip('"').lower()
+# Tamanho da página quando só --pagina é dada
+LIMITE_PADRAO: int = 20
+# Quantos dias a agenda mostra quando --dias não é dado
+DIAS_DA_AGENDA: int = 7
+DIAS_DA_SEMANA: tuple[str, ...] = ("Segunda", "Terça", "Quarta", "Quinta", "Sexta", "Sábado", "Domingo")
+
+def separar_opcoes(args: tuple, nomes: tuple[str, ...] = ("--pagina", "--limite")) -> tuple | None:
+    """Separa as opções numéricas `nomes` ("--pagina p", "--limite n" ou
+    "--pagina=p") dos demais argumentos.
+
+    Retorna os demais argumentos e o valor de cada opção, na ordem de `nomes`
+    (None se não foi dada), ou None se alguma opção tem um valor inválido.
+    """
+    resto: list[str] = []
+    opcoes: dict[str, int | None] = dict.fromkeys(nomes)
+    palavras: Iterator[str] = iter(args)
+    for palavra in palavras:
+        nome, igual, valor = palavra.partition("=")
+        if nome not in opcoes:
+            resto.append(palavra)
+            continue
+        if not igual:
+            valor = next(palavras, "")
+        try:
+            numero: int = int(valor)
+            if numero < 1:
+                raise ValueError
+        except ValueError:
+            print(f'{nome} deve ser seguido de um número inteiro maior que zero.')
+            return None
+        opcoes[nome] = numero
+    return resto, *opcoes.values()
+
+def trechos_das_listas(listas: Iterable[ListaDeTarefas]) -> Iterator[str]:
+    # O texto de cada tarefa é descartado depois de escrito, para que a
+    # memória usada não cresça com o número de tarefas
+    for i, lista in enumerate(listas):
+        if i:
+            yield "\n\n"
+        yield from lista.trechos(guardar=False)
+
+def trechos_da_pagina(listas: list[ListaDeTarefas], pagina: int, limite: int) -> Iterator[str]:
+    """Gera o texto só das tarefas da página pedida, cada uma sob o título
+    da sua lista. As listas inteiras antes da página não são percorridas."""
+    inicio: int = (pagina - 1) * limite
+    fim: int = inicio + limite
+    posicao: int = 0 # quantas tarefas vêm antes da lista atual
+    primeira: bool = True
+    for lista in listas:
+        quantidade: int = len(lista.tarefas)
+        if posicao + quantidade > inicio:
+            if not primeira:
+                yield "\n\n"
+            primeira = False
+            tarefas = islice(lista.tarefas, max(inicio - posicao, 0), fim - posicao)
+            yield from lista.trechos(tarefas)
+        posicao += quantidade
+        if posicao >= fim:
+            break
+
+def mostrar(listas: list[ListaDeTarefas], pagina: int | None, limite: int | None) -> None:
+    """Escreve as listas no terminal em blocos, à medida que o texto é gerado
+    (ou só uma página das suas tarefas, com `pagina` ou `limite`)."""
+    if pagina is None and limite is None:
+        trm.write_chunked(trechos_das_listas(listas))
+        print()
+        return
+
+    pagina = pagina or 1
+    limite = limite or LIMITE_PADRAO
+    total: int = sum(len(lista.tarefas) for lista in listas)
+    primeira: int = (pagina - 1) * limite + 1
+    if primeira > total:
+        print(f"Há {total} tarefa(s), então a página {pagina} está vazia.")
+        return
+    trm.write_chunked(trechos_da_pagina(listas, pagina, limite))
+    print()
+    print(trm.bold(f"Mostrando {primeira}-{min(primeira + limite - 1, total)} de {total} "
+                   f"tarefas (página {pagina} de {-(-total // limite)})."))
+
+def ver_lista(*args) -> None:
+    opcoes = separar_opcoes(args)
+    if opcoes is None:
+        return
+    palavras, pagina, limite = opcoes
+    titulo: str = " ".join(palavras).strip('"').lower()
     if not titulo:
-        print('Uso: ver lista "Titulo da Lista"')
+        print('Uso: ver lista "Titulo da Lista" [--pagina p] [--limite n]')
         print("Listas disponiveis:", end="\n   ")
-        print(*(f'("{lista.titulo}" - ID: {lista.id})' for lista in listas), sep=" | ")
+        print(*(f'("{lista.titulo}" - ID: {lista.id})' for lista in dados.listas), sep=" | ")
         return
-    
-    for lista in listas:
+
+    for lista in dados.listas:
         if titulo == "".join(lista.titulo).lower():
-            print(lista)
+            mostrar([lista], pagina, limite)
             break
+    else:
+        print(f'Lista "{titulo}" não encontrada.')
 
 def ver_listas() -> None:
     # TODO: make it more robust
-    print(*(f'("{lista.titulo}" - ID: {lista.id})' for lista in listas), sep=" | ")
+    print(*(f'("{lista.titulo}" - ID: {lista.id})' for lista in dados.listas), sep=" | ")
+
+def ver_tudo(*args) -> None:
+    opcoes = separar_opcoes(args)
+    if opcoes is None:
+        return
+    _, pagina, limite = opcoes
+    print()
+    mostrar(dados.listas, pagina, limite)
 
-def ver_tudo() -> None:
+def _com_tarefa(datas: Iterator[date], tarefa: Tarefa) -> Iterator[tuple[date, int, Tarefa]]:
+    for data in datas:
+        yield data, tarefa.id, tarefa
+
+def ocorrencias_da_agenda(inicio: date, fim: date) -> Iterator[tuple[date, int, Tarefa]]:
+    """As ocorrências pendentes até `fim`, em ordem de data (e de ID).
+
+    De uma tarefa atrasada vem a data pendente e, se ela é repetível, as
+    ocorrências de `inicio` até `fim`. As ocorrências das séries não são
+    tarefas: cada uma é calculada só quando chega a vez dela.
+    """
+    registro = dados.registro
+    datas_por_tarefa: list[Iterator[tuple[date, int, Tarefa]]] = []
+    for id_tarefa in registro.indice(IndiceDeDatas).entre(None, fim):
+        tarefa: Tarefa = registro.tarefa(id_tarefa)[0]
+        if tarefa.concluida:
+            continue
+        datas: Iterator[date] = ocorrencias_da_tarefa(tarefa, inicio, fim)
+        if tarefa.data < inicio:
+            datas = chain((tarefa.data,), datas)
+        datas_por_tarefa.append(_com_tarefa(datas, tarefa))
+    return heapq.merge(*datas_por_tarefa)
+
+def trechos_da_agenda(inicio: date, fim: date) -> Iterator[str]:
+    cabecalho_atual: str | None = None
+    for data, _, tarefa in ocorrencias_da_agenda(inicio, fim):
+        if data < inicio:
+            cabecalho: str = "Atrasadas"
+        else:
+            cabecalho = f"{DIAS_DA_SEMANA[data.weekday()]}, {data.strftime('%d/%m/%Y')}"
+        if cabecalho != cabecalho_atual:
+            yield ("\n" if cabecalho_atual else "") + trm.bold(cabecalho + ":") + "\n"
+            cabecalho_atual = cabecalho
+        linha: str = f"   {tarefa.titulo} | ID: {tarefa.id}"
+        if data < inicio:
+            linha += f" (desde {data.strftime('%d/%m/%Y')})"
+        elif data != tarefa.data:
+            linha += " (repetição)"
+        yield linha + "\n"
+
+def ver_agenda(*args) -> None:
+    opcoes = separar_opcoes(args, ("--dias",))
+    if opcoes is None:
+        return
+    _, dias = opcoes
+    hoje: date = date.today()
+    fim: date = hoje + timedelta(days=(dias or DIAS_DA_AGENDA) - 1)
+    trechos: Iterator[str] = trechos_da_agenda(hoje, fim)
+    primeiro: str | None = next(trechos, None)
+    if primeiro is None:
+        print(f"Nenhuma tarefa pendente até {fim.strftime('%d/%m/%Y')}.")
+        return
+    print(trm.bold(f"Agenda de {hoje.strftime('%d/%m/%Y')} a {fim.strftime('%d/%m/%Y')}"))
     print()
-    print("\n\n".join(str(lista) for lista in listas))
+    trm.write_chunked(chain((primeiro,), trechos))
@@ -1,10 +1,22 @@
-"""Arquivo principal, usado para executar o Gerenciador de Tarefas."""
+"""Arquivo principal, usado para executar o Gerenciador de Tarefas.
+
+Uso:
+    python lista_de_tarefas.py              modo interativo
+    python lista_de_tarefas.py ARQUIVO      executa os comandos do arquivo em lote
+    python lista_de_tarefas.py -            executa em lote os comandos da entrada padrão
+
+Veja `comandos.lote` para o formato dos comandos em lote.
+"""
 
 from typing import Callable
+import sys
 import comandos.busca
+import comandos.buscas_salvas
 import comandos.edicao
+import comandos.lote
 import comandos.visualizacao
-from comandos.manipulacao_de_dados import salvar_dados
+import comandos.manipulacao_de_dados
+from comandos.manipulacao_de_dados import encerrar_dados
 import terminal_utils as trm
 
 class UserCommands:
@@ -25,11 +37,20 @@ class UserCommands:
         print(trm.bold("=> Remover lista:"), "remove uma lista e as tarefas que nela residem")
         print(trm.bold("=> Editar tarefa:"), "edita os valores de uma tarefa, à mercê do usuário")
         print(trm.bold("=> Editar lista:"), "edita o título de uma lista")
-        print(trm.bold("=> Concluir tarefa:"), "conclui uma tarefa")
-        print(trm.bold("=> Ver lista:"), "mostra as tarefas presentes em uma lista") # use the ID and title of a list to search
+        print(trm.bold("=> Concluir tarefa:"), "conclui uma tarefa (ou a ocorrência atual de uma tarefa repetível)")
+        print(trm.bold("=> Concluir tarefas:"), 'conclui todas as tarefas de uma busca (concluir tarefas TAGS:"x" [ate=DD/MM/AAAA] [--simular])')
+        print(trm.bold("=> Remover tarefas:"), 'remove todas as tarefas de uma busca (remover tarefas CONCLUIDA:"s" [--simular])')
+        print(trm.bold("=> Editar tarefas:"), 'edita todas as tarefas de uma busca (editar tarefas LISTA_ID:"3" prioridade=2 [--simular])')
+        print(trm.bold("=> Ver lista:"), "mostra as tarefas presentes em uma lista (--pagina p e --limite n mostram só uma página)") # use the ID and title of a list to search
         print(trm.bold("=> Ver listas:"), "mostra o título e o ID de todas as listas existentes")
-        print(trm.bold("=> Ver tudo:"), "mostra todas as listas, as tarefas dentro delas e as propriedades das tarefas")
+        print(trm.bold("=> Ver tudo:"), "mostra todas as listas, as tarefas dentro delas e as propriedades das tarefas (aceita --pagina e --limite)")
+        print(trm.bold("=> Ver agenda:"), "mostra as tarefas pendentes de cada dia, com as repetições, e as atrasadas (--dias n, 7 por padrão)")
         print(trm.bold("=> Buscar tarefas:"), "mostra a lista de comandos disponíveis para encontrar tarefas com certas características")
+        print(trm.bold("=> Salvar busca:"), 'guarda uma busca com um nome (salvar busca "nome" FILTRO:"filtro" ...)')
+        print(trm.bold("=> Ver busca:"), "mostra as tarefas de uma busca salva, mantidas em dia a cada mudança")
+        print(trm.bold("=> Ver buscas:"), "mostra o nome e os filtros de todas as buscas salvas")
+        print(trm.bold("=> Remover busca:"), "apaga uma busca salva")
+        print(trm.bold("=> Converter dados:"), "salva os dados em outro arquivo (.json, .bin, .db ou \"pasta/\"), convertendo o formato")
         print(trm.bold("=> Limpar tela:"), "limpa a tela do terminal")
         print(trm.bold("=> Sair:"), "encerra o programa")
         print()
@@ -62,6 +83,18 @@ class UserCommands:
     def concluir_tarefa(*_) -> None:
         comandos.edicao.concluir_tarefa()
     
+    @staticmethod
+    def concluir_tarefas(*args) -> None:
+        comandos.edicao.concluir_tarefas(*args)
+
+    @staticmethod
+    def remover_tarefas(*args) -> None:
+        comandos.edicao.remover_tarefas(*args)
+
+    @staticmethod
+    def editar_tarefas(*args) -> None:
+        comandos.edicao.editar_tarefas(*args)
+
     @staticmethod
     def ver_lista(*titulo) -> None:
         comandos.visualizacao.ver_lista(*titulo)
@@ -71,13 +104,37 @@ class UserCommands:
         comandos.visualizacao.ver_listas()
     
     @staticmethod
-    def ver_tudo(*_) -> None:
-        comandos.visualizacao.ver_tudo()
+    def ver_tudo(*args) -> None:
+        comandos.visualizacao.ver_tudo(*args)
     
+    @staticmethod
+    def ver_agenda(*args) -> None:
+        comandos.visualizacao.ver_agenda(*args)
+
     @staticmethod
     def buscar_tarefas(*args) -> None:
         comandos.busca.buscar_tarefas(*args)
 
+    @staticmethod
+    def salvar_busca(*args) -> None:
+        comandos.buscas_salvas.salvar_busca(*args)
+
+    @staticmethod
+    def ver_busca(*args) -> None:
+        comandos.buscas_salvas.ver_busca(*args)
+
+    @staticmethod
+    def ver_buscas(*_) -> None:
+        comandos.buscas_salvas.ver_buscas()
+
+    @staticmethod
+    def remover_busca(*args) -> None:
+        comandos.buscas_salvas.remover_busca(*args)
+
+    @staticmethod
+    def converter_dados(*destino) -> None:
+        comandos.manipulacao_de_dados.converter_dados(*destino)
+
     @staticmethod
     def limpar_tela(*_) -> None:
         trm.clear_screen()
@@ -85,48 +142,62 @@ class UserCommands:
     @staticmethod
     def sair() -> None:
         print("Saindo...")
-        salvar_dados()
-        print("Seus dados estão salvos. Até mais!")
+        if encerrar_dados():
+            print("Seus dados estão salvos. Até mais!")
         print()
         exit()
 
 
 def main() -> None:
     """Função principal do programa."""
-    UserCommands.ajuda()
+    with trm.buffered_output():
+        UserCommands.ajuda()
     while True:
-        # recebe o input do usuário e separa suas palavras
+        # recebe o input do usuário e separa suas palavras (só o nome do
+        # comando é convertido para minúsculas; valores como títulos não)
         user_input: str = input(trm.bold("manager") + "> ")
-        words: list[str] = user_input.lower().split()
+        words: list[str] = user_input.split()
 
         if not words:
             continue
 
         if len(words) == 1:
             # comando de uma só palavra
-            command: str = words[0]
+            command: str = words[0].lower()
             args: tuple = tuple()
         else:
             # comando de duas palavras
             c1, c2, *args = words
-            command: str = f"{c1}_{c2}"
+            command: str = f"{c1}_{c2}".lower()
         
-        # checa se o comando existe
-        if hasattr(UserCommands, command):
-            # se sim, extrai o método correspondente ao comando
-            method: Callable = getattr(UserCommands, command)
-            # executa tal método
-            method(*args)
-        else:
-            print(f'Comando "{trm.bold(user_input.lower())}" não encontrado.')
-            print('Digite "ajuda" para ver os comandos disponíveis.')
-        print()
+        # a saída do comando é escrita de uma vez (ou antes de cada pergunta)
+        with trm.buffered_output():
+            # checa se o comando existe
+            if hasattr(UserCommands, command):
+                # se sim, extrai o método correspondente ao comando
+                method: Callable = getattr(UserCommands, command)
+                # executa tal método
+                method(*args)
+            else:
+                print(f'Comando "{trm.bold(user_input.lower())}" não encontrado.')
+                print('Digite "ajuda" para ver os comandos disponíveis.')
+            print()
+
+def main_lote(caminho: str) -> None:
+    """Executa um lote de comandos, saindo com código 1 se ele falhar."""
+    executado: bool = comandos.lote.executar_arquivo(caminho)
+    if not encerrar_dados() or not executado:
+        sys.exit(1)
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main_lote(sys.argv[1])
+        sys.exit()
     try:
         main()
     except KeyboardInterrupt:
         print("\n\nCtrl+C pressionado. Saindo...")
-        print("Seus dados estão salvos. Até mais!")
+        if encerrar_dados():
+            print("Seus dados estão salvos. Até mais!")
         print()
         exit()
\ No newline at end of file
@@ -1,37 +1,126 @@
-"""Módulo para utilidades do terminal."""
-
+"""Módulo para utilidades do terminal.
+
+A saída de cada comando pode ser juntada em um `OutputBuffer` (veja
+`buffered_output`) e escrita de uma vez, em vez de uma escrita por
+`print()`. Os estilos ANSI só são aplicados quando a saída é um terminal
+(e `NO_COLOR` não está definida), e os textos estilizados ficam guardados
+para os próximos usos.
+"""
+
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator, TextIO
+import io
 import os
+import sys
 
-def clear_screen() -> None:
-    if os.name == 'nt':
-        os.system('cls')
-    else:
-        os.system('clear')
+# Quantos caracteres são juntados antes de cada escrita no terminal
+CHUNK_SIZE: int = 64 * 1024
+# Quantos textos estilizados diferentes ficam guardados por estilo
+STYLE_CACHE_SIZE: int = 256
 
+# Se a saída aceita estilos (não é, por exemplo, um arquivo ou um pipe)
+STYLED: bool = sys.stdout.isatty() and "NO_COLOR" not in os.environ
 
-def bold(text: str) -> str:
-    return "\033[1m" + text + "\033[22m"
+CLEAR_SCREEN: str = "\033[H\033[2J\033[3J" # cursor no início, apaga a tela e o histórico
 
 
-def italic(text: str) -> str:
-    return "\033[3m" + text + "\033[23m"
+class OutputBuffer(io.TextIOBase):
+    """Junta o que é escrito e só repassa à saída original em `flush`
+    (ou quando passa de `CHUNK_SIZE` caracteres).
 
+    `input()` chama `flush` antes de mostrar a pergunta, então o texto
+    anterior a ela sempre aparece antes.
+    """
 
-def underline(text: str) -> str:
-    return "\033[4m" + text + "\033[24m"
+    def __init__(self, output: TextIO) -> None:
+        self.output = output
+        self.pieces: list[str] = []
+        self.size: int = 0
 
+    def writable(self) -> bool:
+        return True
 
-def blinking(text: str) -> str:
-    return "\033[5m" + text + "\033[25m"
+    def write(self, text: str) -> int:
+        self.pieces.append(text)
+        self.size += len(text)
+        if self.size >= CHUNK_SIZE:
+            self.flush()
+        return len(text)
 
+    def flush(self) -> None:
+        if self.pieces:
+            self.output.write("".join(self.pieces))
+            self.pieces = []
+            self.size = 0
+        self.output.flush()
 
-def inverse(text: str) -> str:
-    return "\033[7m" + text + "\033[27m"
+    def fileno(self) -> int:
+        # Permite que `input()` continue usando o terminal (e o readline)
+        return self.output.fileno()
 
+    def isatty(self) -> bool:
+        return self.output.isatty()
 
-def hidden(text: str) -> str:
-    return "\033[8m" + text + "\033[28m"
 
+@contextmanager
+def buffered_output() -> Iterator[OutputBuffer]:
+    """Junta tudo que é impresso dentro do bloco e escreve de uma vez no fim."""
+    original: TextIO = sys.stdout
+    buffer = OutputBuffer(original)
+    sys.stdout = buffer
+    try:
+        yield buffer
+    finally:
+        sys.stdout = original
+        buffer.flush()
 
-def strikethrough(text: str) -> str:
-    return "\033[9m" + text + "\033[29m"
+
+def clear_screen() -> None:
+    if STYLED:
+        sys.stdout.write(CLEAR_SCREEN)
+        sys.stdout.flush()
+
+
+def write_chunked(pieces: Iterable[str], chunk_size: int = CHUNK_SIZE) -> None:
+    """Escreve `pieces` no terminal em blocos de ~`chunk_size` caracteres.
+
+    Só um bloco fica na memória por vez, e o primeiro aparece assim que
+    fica cheio, não importa quanto texto ainda falta gerar.
+    """
+    chunk: list[str] = []
+    size: int = 0
+    for piece in pieces:
+        chunk.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            sys.stdout.write("".join(chunk))
+            sys.stdout.flush()
+            chunk = []
+            size = 0
+    sys.stdout.write("".join(chunk))
+    sys.stdout.flush()
+
+
+def _unstyled(text: str) -> str:
+    return text
+
+
+def _style(start: str, end: str) -> Callable[[str], str]:
+    """Função que envolve um texto nos códigos ANSI `start` e `end`."""
+    if not STYLED:
+        return _unstyled
+
+    @lru_cache(maxsize=STYLE_CACHE_SIZE)
+    def style(text: str) -> str:
+        return start + text + end
+    return style
+
+
+bold = _style("\033[1m", "\033[22m")
+italic = _style("\033[3m", "\033[23m")
+underline = _style("\033[4m", "\033[24m")
+blinking = _style("\033[5m", "\033[25m")
+inverse = _style("\033[7m", "\033[27m")
+hidden = _style("\033[8m", "\033[28m")
+strikethrough = _style("\033[9m", "\033[29m")
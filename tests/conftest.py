@@ -0,0 +1,7 @@
+"""Configuração dos testes: permite importar os módulos do projeto
+rodando o pytest a partir de qualquer pasta."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,165 @@
+"""Testes de equivalência dos caminhos do planejador de busca.
+
+Buscas aleatórias são resolvidas pelo `PlanoDeBusca` (a partir de um
+índice, das colunas do `IndiceVetorial` ou do cache de buscas) e
+comparadas com o resultado de testar todos os filtros em todas as
+tarefas, inclusive depois de mudanças nos dados.
+"""
+
+from datetime import date, timedelta
+import random
+import pytest
+from armazenamento.arquivo_json import ArmazenamentoJSON
+from classes.indice_vetorial import DISPONIVEL as VETORIAL_DISPONIVEL
+from classes.lista import ListaDeTarefas
+from classes.tarefa import Tarefa
+from comandos.manipulacao_de_dados import (
+    dados, registrar_tarefa_adicionada, registrar_tarefa_editada, registrar_tarefa_removida,
+)
+import comandos.busca as busca
+
+PALAVRAS: list[str] = ["comprar", "pagar", "ligar", "conta", "mercado", "relatório", "carro"]
+TAGS: list[str] = ["casa", "trabalho", "urgente", "saúde"]
+HOJE: date = date(2025, 3, 15)
+
+
+def data_aleatoria(aleatorio: random.Random) -> date | None:
+    if aleatorio.random() < 0.15:
+        return None
+    return HOJE + timedelta(days=aleatorio.randrange(-120, 120))
+
+
+def nova_tarefa(aleatorio: random.Random, lista: ListaDeTarefas) -> Tarefa:
+    return Tarefa(
+        titulo=" ".join(aleatorio.choices(PALAVRAS, k=2)),
+        lista_associada=lista.id,
+        nota=" ".join(aleatorio.choices(PALAVRAS, k=aleatorio.randrange(4))),
+        data=data_aleatoria(aleatorio),
+        tags=aleatorio.sample(TAGS, aleatorio.randrange(3)),
+        prioridade=aleatorio.randrange(4),
+        repeticao=aleatorio.choice([0, 0, 0, 1, 2, 3, 4]),
+        concluida=aleatorio.random() < 0.3,
+    )
+
+
+def filtro_aleatorio(aleatorio: random.Random) -> str:
+    match aleatorio.randrange(6):
+        case 0:
+            return f'TEXTO:"{aleatorio.choice(PALAVRAS)[:4]}"'
+        case 1:
+            return f'LISTA_ID:"{aleatorio.choice(dados.listas).id}"'
+        case 2:
+            return f'TAGS:"{",".join(aleatorio.sample(TAGS, aleatorio.randrange(1, 3)))}"'
+        case 3:
+            return f'ATE:"{data_aleatoria(aleatorio) or HOJE:%d/%m/%Y}"'
+        case 4:
+            inicio = HOJE + timedelta(days=aleatorio.randrange(-150, 100))
+            fim = inicio + timedelta(days=aleatorio.randrange(40))
+            return f'ENTRE:"{inicio:%d/%m/%Y}-{fim:%d/%m/%Y}"'
+        case _:
+            return f'CONCLUIDA:"{aleatorio.choice("sn")}"'
+
+
+def busca_aleatoria(aleatorio: random.Random) -> str:
+    partes: list[str] = [filtro_aleatorio(aleatorio) for _ in range(aleatorio.randrange(1, 4))]
+    if aleatorio.random() < 0.5:
+        partes.append(f'ORDENAR:"{aleatorio.choice(["data", "prioridade"])}"')
+    if aleatorio.random() < 0.3:
+        partes.append(f'LIMITE:"{aleatorio.randrange(1, 15)}" PAGINA:"{aleatorio.randrange(1, 4)}"')
+    return " ".join(partes)
+
+
+def esperado(plano: busca.PlanoDeBusca) -> tuple[list[int], int]:
+    """O resultado da busca testando todos os filtros em todas as tarefas."""
+    encontradas = sorted((tarefa for lista in dados.listas for tarefa in lista.tarefas
+                          if all(filtro(tarefa) for filtro in plano.filtros)),
+                         key=plano.sorting_key)
+    pagina = encontradas
+    if plano.limite is not None:
+        fim: int = plano.pagina * plano.limite
+        pagina = encontradas[fim - plano.limite:fim]
+    return [tarefa.id for tarefa in pagina], len(encontradas)
+
+
+def executar(consulta: str, cache: bool) -> tuple[busca.PlanoDeBusca, list[int], int]:
+    plano = busca.gerar_busca(consulta.split('"'))
+    assert plano is not None, consulta
+    if not cache:
+        plano.chave = None
+    tarefas, total = plano.executar_pagina()
+    return plano, [tarefa.id for tarefa in tarefas], total
+
+
+def mudar_dados(aleatorio: random.Random) -> None:
+    """Adiciona, edita e remove algumas tarefas, como os comandos fazem."""
+    for _ in range(10):
+        lista: ListaDeTarefas = aleatorio.choice(dados.listas)
+        tarefa: Tarefa = nova_tarefa(aleatorio, lista)
+        lista.adicionar_tarefa(tarefa)
+        registrar_tarefa_adicionada(lista, tarefa)
+    for _ in range(10):
+        lista = aleatorio.choice(dados.listas)
+        tarefa = aleatorio.choice(list(lista.tarefas))
+        tarefa.data = data_aleatoria(aleatorio)
+        tarefa.inicio = None
+        tarefa.concluida = not tarefa.concluida
+        tarefa.tags = aleatorio.sample(TAGS, aleatorio.randrange(3))
+        registrar_tarefa_editada(lista, tarefa)
+    for _ in range(5):
+        lista = aleatorio.choice(dados.listas)
+        tarefa = aleatorio.choice(list(lista.tarefas))
+        registrar_tarefa_removida(lista, tarefa)
+        lista.remover_tarefa(tarefa.id)
+
+
+@pytest.fixture
+def tarefas_aleatorias(tmp_path, monkeypatch):
+    """Listas com tarefas aleatórias em `dados`, salvas em um JSON temporário."""
+    aleatorio = random.Random(1234)
+    listas: list[ListaDeTarefas] = [ListaDeTarefas(f"Lista {i}") for i in range(4)]
+    for _ in range(800):
+        lista = aleatorio.choice(listas)
+        lista.adicionar_tarefa(nova_tarefa(aleatorio, lista))
+    armazenamento = ArmazenamentoJSON(str(tmp_path / "tarefas.json"), em_segundo_plano=False)
+    monkeypatch.setattr(dados, "_armazenamento", armazenamento)
+    monkeypatch.setattr(dados, "_listas", listas)
+    monkeypatch.setattr(dados, "_registro", None)
+    monkeypatch.setattr(busca, "processos_paralelos", 0)
+    yield aleatorio
+    armazenamento.fechar()
+
+
+def test_indices_e_cache_concordam_com_testar_todas_as_tarefas(tarefas_aleatorias, monkeypatch):
+    aleatorio = tarefas_aleatorias
+    monkeypatch.setattr(busca, "usar_vetorial", False)
+    for rodada in range(4):
+        for _ in range(60):
+            consulta: str = busca_aleatoria(aleatorio)
+            plano, ids, total = executar(consulta, cache=False)
+            assert (ids, total) == esperado(plano), consulta
+            # A primeira execução com a chave guarda o resultado, e a segunda o reaproveita
+            executar(consulta, cache=True)
+            plano, ids, total = executar(consulta, cache=True)
+            assert plano.acesso == "cache"
+            assert (ids, total) == esperado(plano), consulta
+        mudar_dados(aleatorio)
+
+
+@pytest.mark.skipif(not VETORIAL_DISPONIVEL, reason="NumPy não está instalado")
+def test_busca_vetorial_concorda_com_a_busca_comum(tarefas_aleatorias, monkeypatch):
+    aleatorio = tarefas_aleatorias
+    # Sem o limite de seletividade, toda busca com máscaras usa as colunas
+    monkeypatch.setattr(busca, "FRACAO_VETORIAL", 0.0)
+    vetoriais: int = 0
+    for rodada in range(4):
+        for _ in range(60):
+            consulta: str = busca_aleatoria(aleatorio)
+            monkeypatch.setattr(busca, "usar_vetorial", False)
+            _, comum_ids, comum_total = executar(consulta, cache=False)
+            monkeypatch.setattr(busca, "usar_vetorial", True)
+            plano, ids, total = executar(consulta, cache=False)
+            assert (ids, total) == (comum_ids, comum_total), consulta
+            assert (ids, total) == esperado(plano), consulta
+            vetoriais += plano.acesso.startswith("vetorial")
+        mudar_dados(aleatorio)
+    assert vetoriais
@@ -0,0 +1,133 @@
+"""Testes das janelas de queda do armazenamento JSON (e binário).
+
+Simulam um programa que caiu no meio de uma gravação: um registro do
+diário cortado ao meio e uma compactação interrompida entre apagar o
+diário e trocar o arquivo de dados (veja `gravar_atomicamente`).
+"""
+
+import os
+import pytest
+from armazenamento.arquivo_json import ArmazenamentoJSON
+from armazenamento.binario import ArmazenamentoBinario
+import armazenamento.escritor as escritor
+from classes.lista import ListaDeTarefas
+from classes.tarefa import Tarefa
+
+FORMATOS = {".json": ArmazenamentoJSON, ".bin": ArmazenamentoBinario}
+
+
+class Queda(Exception):
+    """O programa "caiu" neste ponto da gravação."""
+
+
+@pytest.fixture(params=list(FORMATOS))
+def abrir(request, tmp_path):
+    """Abre (ou reabre, como um novo início do programa) o armazenamento."""
+    caminho: str = str(tmp_path / ("tarefas" + request.param))
+    abertos: list[ArmazenamentoJSON] = []
+
+    def abrir_armazenamento() -> ArmazenamentoJSON:
+        armazenamento = FORMATOS[request.param](caminho, em_segundo_plano=False)
+        abertos.append(armazenamento)
+        return armazenamento
+
+    yield abrir_armazenamento
+    for armazenamento in abertos:
+        armazenamento.fechar()
+
+
+def titulos(listas: list[ListaDeTarefas]) -> dict[str, list[str]]:
+    return {lista.titulo: [tarefa.titulo for tarefa in lista.tarefas] for lista in listas}
+
+
+def dados_iniciais(armazenamento: ArmazenamentoJSON) -> list[ListaDeTarefas]:
+    """Salva uma lista com uma tarefa e anexa mais duas pelo diário."""
+    lista = ListaDeTarefas("Casa")
+    lista.adicionar_tarefa(Tarefa("Lavar louça", lista.id))
+    listas: list[ListaDeTarefas] = [lista]
+    armazenamento.carregar()
+    armazenamento.salvar_tudo(listas)
+    for titulo in ("Regar plantas", "Varrer"):
+        tarefa = Tarefa(titulo, lista.id)
+        lista.adicionar_tarefa(tarefa)
+        armazenamento.tarefa_adicionada(lista, tarefa)
+    return listas
+
+
+REGISTRO: bytes = b'{"op":"adicionar_tarefa","lista":"Casa","tarefa":{"titulo":"Secar","nota":"",' \
+                  b'"data":null,"tags":[],"lista_associada":0,"prioridade":0,"repeticao":0,"concluida":false}}'
+
+
+# A queda cortou o próximo registro no meio, ou antes da quebra de linha
+@pytest.mark.parametrize("corte", [REGISTRO[:40], REGISTRO], ids=["no meio", "sem quebra de linha"])
+def test_registro_cortado_e_descartado(abrir, corte):
+    armazenamento = abrir()
+    dados_iniciais(armazenamento)
+    armazenamento.fechar()
+    caminho_diario: str = armazenamento.diario.caminho
+    tamanho_valido: int = os.path.getsize(caminho_diario)
+    with open(caminho_diario, "ab") as f:
+        f.write(corte)
+
+    armazenamento = abrir()
+    listas = armazenamento.carregar()
+    assert titulos(listas) == {"Casa": ["Lavar louça", "Regar plantas", "Varrer"]}
+    assert armazenamento.registros_ignorados == 0
+    # O pedaço foi cortado do diário, e os próximos registros entram depois dele
+    assert os.path.getsize(caminho_diario) == tamanho_valido
+
+
+def test_registros_depois_do_corte_continuam_valendo(abrir):
+    armazenamento = abrir()
+    dados_iniciais(armazenamento)
+    armazenamento.fechar()
+    with open(armazenamento.diario.caminho, "ab") as f:
+        f.write(b'{"op":"remover_tarefa","lis')
+
+    armazenamento = abrir()
+    listas = armazenamento.carregar()
+    lista: ListaDeTarefas = listas[0]
+    tarefa = Tarefa("Passar roupa", lista.id)
+    lista.adicionar_tarefa(tarefa)
+    armazenamento.tarefa_adicionada(lista, tarefa)
+    armazenamento.fechar()
+
+    assert titulos(abrir().carregar()) == {
+        "Casa": ["Lavar louça", "Regar plantas", "Varrer", "Passar roupa"],
+    }
+
+
+def test_compactacao_interrompida_depois_de_apagar_o_diario(abrir, monkeypatch):
+    armazenamento = abrir()
+    listas = dados_iniciais(armazenamento)
+    esperado = titulos(listas)
+
+    def cair(origem: str, destino: str) -> None:
+        raise Queda
+
+    # O diário é apagado, mas o programa cai antes de trocar os arquivos
+    monkeypatch.setattr(escritor.os, "replace", cair)
+    with pytest.raises(Queda):
+        armazenamento.salvar_tudo(listas)
+    monkeypatch.undo()
+    assert not os.path.exists(armazenamento.diario.caminho)
+    assert os.path.exists(armazenamento.caminho + ".tmp")
+
+    # No próximo início, o temporário completo vira o arquivo de dados
+    assert titulos(abrir().carregar()) == esperado
+    assert not os.path.exists(armazenamento.caminho + ".tmp")
+    assert titulos(abrir().carregar()) == esperado
+
+
+def test_compactacao_interrompida_antes_de_apagar_o_diario(abrir):
+    armazenamento = abrir()
+    listas = dados_iniciais(armazenamento)
+    esperado = titulos(listas)
+    armazenamento.fechar()
+    # A queda aconteceu com o temporário ainda pela metade
+    with open(armazenamento.caminho + ".tmp", "wb") as f:
+        f.write(b'{"Casa": {"id": 0, "tare')
+
+    # O temporário é descartado, e os dados vêm do arquivo antigo mais o diário
+    assert titulos(abrir().carregar()) == esperado
+    assert not os.path.exists(armazenamento.caminho + ".tmp")
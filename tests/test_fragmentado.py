@@ -0,0 +1,94 @@
+"""Testes do armazenamento fragmentado (um arquivo por lista).
+
+Achar uma tarefa pelo ID deve ler só o arquivo da lista que a contém,
+usando os IDs de cada lista guardados no manifesto.
+"""
+
+import json
+import os
+from armazenamento.fragmentado import MANIFESTO, ArmazenamentoFragmentado
+from classes.lista import ListaDeTarefas
+from classes.registro import RegistroDeIds
+from classes.tarefa import Tarefa
+
+
+def salvar_listas(pasta: str, quantas: int) -> list[int]:
+    """Salva `quantas` listas com três tarefas cada; retorna o ID de uma tarefa por lista."""
+    armazenamento = ArmazenamentoFragmentado(pasta, em_segundo_plano=False)
+    listas: list[ListaDeTarefas] = []
+    for n in range(quantas):
+        lista = ListaDeTarefas(f"Lista {n}")
+        for i in range(3):
+            lista.adicionar_tarefa(Tarefa(f"Tarefa {n}.{i}", lista.id))
+        listas.append(lista)
+    armazenamento.carregar()
+    armazenamento.salvar_tudo(listas)
+    return [list(lista.tarefas)[1].id for lista in listas]
+
+
+def abrir(pasta: str) -> tuple[ArmazenamentoFragmentado, list[str]]:
+    """Abre o armazenamento anotando o título de cada lista lida do disco."""
+    armazenamento = ArmazenamentoFragmentado(pasta, em_segundo_plano=False)
+    lidas: list[str] = []
+    ler = armazenamento._ler_fragmento
+
+    def ler_e_anotar(lista: ListaDeTarefas) -> list[Tarefa]:
+        lidas.append(lista.titulo)
+        return ler(lista)
+
+    armazenamento._ler_fragmento = ler_e_anotar
+    return armazenamento, lidas
+
+
+def test_tarefa_pelo_id_le_so_a_lista_dela(tmp_path):
+    pasta: str = str(tmp_path / "pasta")
+    ids: list[int] = salvar_listas(pasta, 4)
+    armazenamento, lidas = abrir(pasta)
+    listas = armazenamento.carregar()
+    registro = RegistroDeIds(listas, localizar=armazenamento.lista_da_tarefa)
+
+    tarefa, lista = registro.tarefa(ids[2])
+    assert (tarefa.titulo, lista.titulo) == ("Tarefa 2.1", "Lista 2")
+    assert lidas == ["Lista 2"]
+
+    # Uma tarefa que não existe ainda é procurada em todas as listas
+    assert registro.tarefa(max(ids) + 100) == (None, None)
+    # (cada lista é lida uma vez só)
+    assert sorted(lidas) == ["Lista 0", "Lista 1", "Lista 2", "Lista 3"]
+
+
+def test_tarefa_movida_e_achada_na_lista_nova(tmp_path):
+    pasta: str = str(tmp_path / "pasta")
+    ids: list[int] = salvar_listas(pasta, 3)
+    armazenamento, _ = abrir(pasta)
+    origem, _, destino = armazenamento.carregar()
+    tarefa = origem.tarefa(ids[0])
+    armazenamento.tarefa_removida(origem, tarefa)
+    origem.remover_tarefa(tarefa)
+    tarefa.lista_associada = destino.id
+    destino.adicionar_tarefa(tarefa)
+    armazenamento.tarefa_adicionada(destino, tarefa)
+
+    armazenamento, lidas = abrir(pasta)
+    listas = armazenamento.carregar()
+    registro = RegistroDeIds(listas, localizar=armazenamento.lista_da_tarefa)
+    assert registro.tarefa(ids[0])[1].titulo == "Lista 2"
+    assert lidas == ["Lista 2"]
+
+
+def test_manifesto_antigo_ganha_os_ids_das_listas(tmp_path):
+    pasta: str = str(tmp_path / "pasta")
+    ids: list[int] = salvar_listas(pasta, 2)
+    caminho: str = os.path.join(pasta, MANIFESTO)
+    with open(caminho) as f:
+        manifesto = json.load(f)
+    for entrada in manifesto["listas"]:
+        del entrada["ids"]
+    with open(caminho, "w") as f:
+        json.dump(manifesto, f)
+
+    armazenamento, _ = abrir(pasta)
+    listas = armazenamento.carregar()
+    assert armazenamento.lista_da_tarefa(ids[1]) == listas[1].id
+    with open(caminho) as f:
+        assert all(entrada["ids"] for entrada in json.load(f)["listas"])
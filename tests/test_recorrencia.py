@@ -0,0 +1,125 @@
+"""Testes das regras de repetição (`classes.recorrencia`)."""
+
+from datetime import date, timedelta
+import random
+import pytest
+from armazenamento.banco_sqlite import ArmazenamentoSQLite
+from classes.lista import ListaDeTarefas
+from classes.recorrencia import (
+    avancar_serie, concluir_ate, ocorrencia, ocorrencias, ocorrencias_da_tarefa, ocorre_entre, posicao,
+)
+from classes.tarefa import Repeticao, Tarefa
+
+DIARIA: int = Repeticao.DIARIA.value
+SEMANAL: int = Repeticao.SEMANAL.value
+MENSAL: int = Repeticao.MENSAL.value
+ANUAL: int = Repeticao.ANUAL.value
+
+
+def test_mensal_do_dia_31_cai_no_fim_de_fevereiro():
+    inicio = date(2023, 1, 31)
+    assert ocorrencia(inicio, MENSAL, 1) == date(2023, 2, 28)
+    assert ocorrencia(inicio, MENSAL, 2) == date(2023, 3, 31)
+    assert ocorrencia(inicio, MENSAL, 3) == date(2023, 4, 30)
+    assert ocorrencia(inicio, MENSAL, 13) == date(2024, 2, 29) # ano bissexto
+
+
+def test_mensal_volta_ao_dia_original_depois_de_um_mes_curto():
+    datas = list(ocorrencias(date(2024, 1, 31), MENSAL, date(2024, 1, 1), date(2024, 5, 31)))
+    assert datas == [date(2024, 1, 31), date(2024, 2, 29), date(2024, 3, 31),
+                     date(2024, 4, 30), date(2024, 5, 31)]
+
+
+def test_anual_de_29_de_fevereiro():
+    inicio = date(2024, 2, 29)
+    assert [ocorrencia(inicio, ANUAL, n) for n in range(5)] == [
+        date(2024, 2, 29), date(2025, 2, 28), date(2026, 2, 28),
+        date(2027, 2, 28), date(2028, 2, 29),
+    ]
+
+
+@pytest.mark.parametrize("repeticao", [DIARIA, SEMANAL, MENSAL, ANUAL])
+def test_posicao_e_a_primeira_ocorrencia_a_partir_do_dia(repeticao):
+    aleatorio = random.Random(repeticao)
+    for _ in range(500):
+        inicio = date(2000, 1, 1) + timedelta(days=aleatorio.randrange(10_000))
+        dia = inicio + timedelta(days=aleatorio.randrange(-30, 5_000))
+        n = posicao(inicio, repeticao, dia)
+        assert ocorrencia(inicio, repeticao, n) >= dia
+        assert n == 0 or ocorrencia(inicio, repeticao, n - 1) < dia
+
+
+@pytest.mark.parametrize("repeticao", [DIARIA, SEMANAL, MENSAL, ANUAL])
+def test_por_em_dia_muitas_ocorrencias_atrasadas(repeticao):
+    inicio = date(1990, 1, 31)
+    dia = date(2025, 6, 15)
+    proxima, concluidas = concluir_ate(inicio, repeticao, inicio, dia)
+    # O mesmo que concluir as ocorrências uma a uma
+    atrasadas = list(ocorrencias(inicio, repeticao, inicio, dia))
+    assert concluidas == len(atrasadas)
+    assert proxima > dia
+    assert proxima == ocorrencia(inicio, repeticao, len(atrasadas))
+
+
+def test_avancar_serie_ate_um_dia_conclui_todas_as_ocorrencias_ate_ele():
+    tarefa = Tarefa("Pagar aluguel", 0, data=date(2015, 1, 31), repeticao=MENSAL)
+    concluidas = avancar_serie(tarefa, date(2025, 2, 28))
+    assert concluidas == 10 * 12 + 2 # de 31/01/2015 até 28/02/2025
+    assert tarefa.inicio == date(2015, 1, 31)
+    assert tarefa.data == date(2025, 3, 31)
+
+
+def test_avancar_serie_sem_atraso_conclui_so_a_pendente():
+    tarefa = Tarefa("Regar", 0, data=date(2025, 3, 1), repeticao=SEMANAL)
+    assert avancar_serie(tarefa) == 1
+    assert tarefa.data == date(2025, 3, 8)
+
+
+def tarefas_aleatorias(aleatorio: random.Random, lista: ListaDeTarefas, quantidade: int) -> None:
+    for _ in range(quantidade):
+        data = date(2024, 1, 1) + timedelta(days=aleatorio.randrange(-400, 400))
+        repeticao = aleatorio.choice([0, DIARIA, SEMANAL, MENSAL, ANUAL])
+        inicio = None
+        if repeticao and aleatorio.random() < 0.7:
+            # Série que já avançou algumas ocorrências desde o seu início
+            inicio = data
+            data = ocorrencia(inicio, repeticao, aleatorio.randrange(5))
+        lista.adicionar_tarefa(Tarefa(
+            "Tarefa", lista.id,
+            data=data if aleatorio.random() < 0.9 else None,
+            repeticao=repeticao,
+            concluida=aleatorio.random() < 0.2,
+            inicio=inicio,
+        ))
+
+
+def test_entre_em_sql_concorda_com_ocorrencias_da_tarefa(tmp_path):
+    aleatorio = random.Random(2025)
+    lista = ListaDeTarefas("Aleatória")
+    tarefas_aleatorias(aleatorio, lista, 600)
+    armazenamento = ArmazenamentoSQLite(str(tmp_path / "tarefas.db"))
+    try:
+        armazenamento.salvar_tudo([lista])
+        armazenamento.carregar()
+        encontradas: int = 0
+        for _ in range(50):
+            de = date(2024, 1, 1) + timedelta(days=aleatorio.randrange(-500, 500))
+            ate = de + timedelta(days=aleatorio.randrange(0, 120))
+            em_sql = {tarefa.id for tarefa in armazenamento.buscar([("ENTRE", (de, ate))])}
+            em_python = {tarefa.id for tarefa in lista.tarefas if ocorre_entre(tarefa, de, ate)}
+            assert em_sql == em_python, (de, ate)
+            encontradas += len(em_sql)
+        assert encontradas
+    finally:
+        armazenamento.fechar()
+
+
+def test_ocorre_entre_concorda_com_as_ocorrencias():
+    aleatorio = random.Random(7)
+    lista = ListaDeTarefas("Aleatória")
+    tarefas_aleatorias(aleatorio, lista, 300)
+    de, ate = date(2024, 2, 1), date(2024, 2, 29)
+    for tarefa in lista.tarefas:
+        datas = list(ocorrencias_da_tarefa(tarefa, de, ate))
+        assert ocorre_entre(tarefa, de, ate) == bool(datas)
+        assert all(de <= dia <= ate for dia in datas)